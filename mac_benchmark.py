@@ -0,0 +1,495 @@
+#!/usr/bin/env python3
+"""
+MAC Address Spoofer - backend benchmark
+Creates N throwaway interfaces inside a private network namespace and times
+every operation (list interfaces, read MAC, read IP, change MAC, restore)
+through each backend the project has: the `ip` and `ifconfig` subprocess
+fallbacks, the native netlink/sysfs path and the event-fed interface registry
+With --wifi, times association on two mac80211_hwsim radios (hostapd AP +
+station) with and without Wi-Fi mode, to show what the swaps add
+Results are printed as a table and written as JSON for regression tracking
+Must run as root (Linux only):  sudo python3 mac_benchmark.py -n 64 -o bench.json
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import ctypes
+import shutil
+import socket
+import argparse
+import platform
+import queue
+import tempfile
+import subprocess
+import contextlib
+
+import mac_core
+import mac_netlink
+import mac_spoofer
+import mac_generator
+
+# unshare(2) / mount(2) flags
+CLONE_NEWNS = 0x00020000
+CLONE_NEWNET = 0x40000000
+MS_REC = 0x4000
+MS_PRIVATE = 0x40000
+MNT_DETACH = 2
+
+OPERATIONS = ("list", "read_mac", "read_ip", "change", "restore")
+PREFIX = "mb"  # Benchmark interface names: mb0, mb1, ...
+WIFI_SSID = "mac-bench"
+WIFI_TIMEOUT = 10.0  # Seconds to wait for hostapd or an association before counting an error
+
+# Cumulative import time allowed for the headless entry points (ms, median of fresh interpreters).
+# About twice the usual ~35 ms, so a busy CI runner doesn't fail it - GUI_ONLY_MODULES catches
+# the regressions that matter (tkinter & co. pulled in) regardless of timing
+IMPORT_BUDGET_MS = {"mac_core": 100, "mac_spoofer": 125}
+IMPORT_RUNS = 11
+GUI_ONLY_MODULES = ("tkinter", "ctypes", "winreg")  # Must not be pulled in by a headless import
+
+
+def enter_throwaway_netns():
+    """Move this process into a fresh network namespace (gone when it exits)
+
+    A private mount namespace with /sys remounted is needed as well, so
+    sysfs shows the new namespace's interfaces (what `ip netns exec` does).
+    """
+    libc = ctypes.CDLL(None, use_errno=True)
+
+    def check(result, what):
+        if result != 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"{what}: {os.strerror(err)}")
+
+    check(libc.unshare(CLONE_NEWNET | CLONE_NEWNS), "unshare")
+    check(libc.mount(None, b"/", None, MS_REC | MS_PRIVATE, None), "make / private")
+    check(libc.umount2(b"/sys", MNT_DETACH), "umount /sys")
+    check(libc.mount(b"sysfs", b"/sys", b"sysfs", 0, None), "mount /sys")
+    subprocess.run(["ip", "link", "set", "lo", "up"], check=True)
+
+
+def create_interfaces(count):
+    """Create `count` up interfaces with one IPv4 address each; returns (names, kind)"""
+    names = [f"{PREFIX}{i}" for i in range(count)]
+    for kind in ("dummy", "veth"):
+        if kind == "dummy":
+            commands = [f"link add {name} type dummy" for name in names]
+        else:
+            commands = [f"link add {name} type veth peer name {PREFIX}p{i}" for i, name in enumerate(names)]
+        commands += [f"link set {name} up" for name in names]
+        commands += [f"addr add 198.18.{i // 256}.{i % 256}/32 dev {name}" for i, name in enumerate(names)]
+        result = subprocess.run(["ip", "-batch", "-"], input="\n".join(commands) + "\n",
+                                capture_output=True, text=True)
+        if result.returncode == 0:
+            return names, kind
+        # Undo a partial batch (e.g. no dummy module) before trying the next kind
+        subprocess.run(["ip", "-batch", "-"], input="".join(f"link del {name}\n" for name in names),
+                       capture_output=True, text=True)
+    raise OSError(f"Could not create benchmark interfaces: {result.stderr.strip()}")
+
+
+def sudo_shim():
+    """Make `sudo` resolvable when running as root without it installed
+
+    Both subprocess backends call `sudo ...`; as root that is just an exec,
+    so a pass-through script keeps those code paths measurable here.
+    """
+    if shutil.which("sudo"):
+        return "sudo"
+    folder = tempfile.mkdtemp(prefix="mac-bench-")
+    path = os.path.join(folder, "sudo")
+    with open(path, "w") as f:
+        f.write('#!/bin/sh\nexec "$@"\n')
+    os.chmod(path, 0o755)
+    os.environ["PATH"] = folder + os.pathsep + os.environ.get("PATH", "")
+    return "shim"
+
+
+def quiet(func):
+    """Wrap func so anything it prints is discarded"""
+    def call(*args):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func(*args)
+    return call
+
+
+def netlink_backend(store_path):
+    """CLI/GUI default on Linux: netlink dumps/changes, sysfs MAC reads"""
+    # The change alone is timed, not waiting for the link to come back
+    spoofer = mac_spoofer.MACSpoofer(store_path, ready_timeout=0)
+    if not spoofer.netlink:
+        return None
+    return {
+        "list": lambda interface, mac: quiet(spoofer.list_interfaces)(),
+        "read_mac": lambda interface, mac: spoofer.get_current_mac(interface),
+        "read_ip": lambda interface, mac: mac_netlink.read_interfaces(spoofer.netlink)[interface]["ipv4"],
+        "change": lambda interface, mac: spoofer.set_mac_linux(interface, mac, quiet=True),
+    }
+
+
+def registry_backend(store_path):
+    """GUI on Linux: interface registry kept current by netlink events, reads are lookups"""
+    spoofer = mac_spoofer.MACSpoofer(store_path, ready_timeout=0)
+    if not spoofer.netlink or not spoofer.watch_interfaces():
+        return None
+    return {
+        "list": lambda interface, mac: spoofer.get_interfaces(),
+        "read_mac": lambda interface, mac: spoofer.get_interface_states()[interface]["mac"],
+        "read_ip": lambda interface, mac: spoofer.get_interface_states()[interface]["ipv4"],
+        "change": lambda interface, mac: spoofer.set_mac_linux(interface, mac, quiet=True),
+    }
+
+
+def list_with(tool):
+    """Interface names from `ip -o link show` or `ifconfig -a` output
+
+    The core lists with if_nameindex() even without netlink, which would
+    time no subprocess at all - this is what the tool itself costs.
+    """
+    if tool == "ip":
+        output = subprocess.run(["ip", "-o", "link", "show"], capture_output=True, text=True, check=True).stdout
+        # "2: eth0@if3: <BROADCAST,...> ..." - the peer suffix is not part of the name
+        return [line.split(": ")[1].split("@")[0] for line in output.splitlines() if ": " in line]
+    output = subprocess.run(["ifconfig", "-a"], capture_output=True, text=True, check=True).stdout
+    return [line.split()[0].rstrip(":") for line in output.splitlines() if line and not line[0].isspace()]
+
+
+def subprocess_backend(tool):
+    """Core without netlink: `ip` or `ifconfig` subprocesses for reads and changes"""
+    def backend(store_path):
+        core = mac_core.SpooferCore(store_path)
+        core.netlink = None
+        core.link_tool = tool
+        core.log = lambda message: None
+        return {
+            "list": lambda interface, mac: list_with(tool),
+            "read_mac": lambda interface, mac: core.get_current_mac(interface),
+            "read_ip": lambda interface, mac: core.get_ip_address(interface),
+            "change": lambda interface, mac: core.set_mac_linux(interface, mac, quiet=True),
+        }
+    return backend
+
+
+BACKENDS = {
+    "ip": subprocess_backend("ip"),
+    "ifconfig": subprocess_backend("ifconfig"),
+    "netlink": netlink_backend,
+    "registry": registry_backend,
+}
+
+
+def summarize(backend, op, samples, errors):
+    """Latency/throughput record for one backend + operation"""
+    samples.sort()
+    elapsed = sum(samples)
+    return {
+        "backend": backend,
+        "op": op,
+        "count": len(samples),
+        "errors": errors,
+        "p50_ms": round(mac_spoofer.percentile(samples, 50) * 1000, 4),
+        "p99_ms": round(mac_spoofer.percentile(samples, 99) * 1000, 4),
+        "mean_ms": round(elapsed / len(samples) * 1000, 4) if samples else 0.0,
+        "max_ms": round(samples[-1] * 1000, 4) if samples else 0.0,
+        "ops_per_s": round(len(samples) / elapsed, 1) if elapsed else 0.0,  # One at a time
+    }
+
+
+def run_backend(name, ops, interfaces, rounds):
+    """Time every operation the backend has
+
+    Each round of "change" is followed by an untimed restore, and each
+    timed "restore" by an untimed change first, so both always move the
+    address and the interfaces end up with their original MACs.
+    """
+    originals = {interface: mac_netlink.read_sysfs_mac(interface) for interface in interfaces}
+    generator = mac_generator.MACGenerator()
+    change = ops["change"]
+    results = []
+    for op in OPERATIONS:
+        func = ops.get("change" if op == "restore" else op)
+        if func is None:
+            continue
+        samples, errors = [], 0
+        for _ in range(rounds):
+            new_macs = mac_generator.format_macs(generator.generate(len(interfaces))).split("\n")
+            for interface, new_mac in zip(interfaces, new_macs):
+                mac = new_mac
+                if op == "restore":
+                    mac = originals[interface]
+                    with contextlib.suppress(Exception):
+                        change(interface, new_mac)
+                start = time.perf_counter()
+                try:
+                    func(interface, mac)
+                except Exception:
+                    errors += 1
+                    continue
+                samples.append(time.perf_counter() - start)
+            if op == "change":
+                for interface in interfaces:
+                    with contextlib.suppress(Exception):
+                        change(interface, originals[interface])
+        results.append(summarize(name, op, samples, errors))
+    return results
+
+
+def metadata(args, kind, sudo):
+    """Environment details stored next to the numbers"""
+    folder = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(["git", "-C", folder, "rev-parse", "--short", "HEAD"],
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": commit,
+        "kernel": platform.release(),
+        "python": platform.python_version(),
+        "interfaces": args.interfaces,
+        "kind": kind,
+        "rounds": args.rounds,
+        "sudo": sudo,
+    }
+
+
+def print_table(results):
+    print(f"{'backend':<14} {'op':<9} {'count':>6} {'err':>4} {'p50 ms':>9} {'p99 ms':>9} {'ops/s':>10}")
+    for r in results:
+        print(f"{r['backend']:<14} {r['op']:<9} {r['count']:>6} {r['errors']:>4} "
+              f"{r['p50_ms']:>9.3f} {r['p99_ms']:>9.3f} {r['ops_per_s']:>10,.1f}")
+
+
+def compare(results, baseline_path, tolerance):
+    """Print p50/p99 regressions against a previous run; returns how many"""
+    with open(baseline_path) as f:
+        baseline = {(r["backend"], r["op"]): r for r in json.load(f)["results"]}
+    regressions = 0
+    for r in results:
+        old = baseline.get((r["backend"], r["op"]))
+        if not old:
+            continue
+        for key in ("p50_ms", "p99_ms"):
+            if old[key] and r[key] > old[key] * (1 + tolerance):
+                regressions += 1
+                print(f"[-] {r['backend']} {r['op']} {key}: {old[key]:.3f} -> {r[key]:.3f} "
+                      f"(+{(r[key] / old[key] - 1) * 100:.0f}%)")
+    print(f"[*] {regressions} regression(s) beyond {tolerance:.0%} vs {baseline_path}")
+    return regressions
+
+
+def hwsim_interfaces():
+    """Names of the interfaces backed by mac80211_hwsim radios, sorted"""
+    return sorted(name for name in os.listdir("/sys/class/net")
+                  if "mac80211_hwsim" in os.path.realpath(f"/sys/class/net/{name}/device"))
+
+
+def start_hostapd(interface, folder):
+    """Open AP on `interface`; returns the hostapd process once it is beaconing"""
+    config = os.path.join(folder, "hostapd.conf")
+    with open(config, "w") as f:
+        f.write(f"interface={interface}\ndriver=nl80211\nssid={WIFI_SSID}\nhw_mode=g\nchannel=1\n")
+    log = os.path.join(folder, "hostapd.log")  # A file, not a pipe: nobody drains it during the rounds
+    with open(log, "wb") as f:
+        process = subprocess.Popen(["hostapd", config], stdout=f, stderr=subprocess.STDOUT)
+    deadline = time.monotonic() + WIFI_TIMEOUT
+    while time.monotonic() < deadline and process.poll() is None:
+        with open(log, "rb") as f:
+            if b"AP-ENABLED" in f.read():
+                return process
+        time.sleep(0.05)
+    process.kill()
+    raise OSError(f"hostapd did not start an AP on {interface}")
+
+
+def associate_rounds(station, events, rounds):
+    """Connect/disconnect `station` `rounds` times; returns (seconds per association, errors, MACs)
+
+    Each association is timed from `iw connect` to the nl80211 connect
+    event, and the next one starts as soon as the disconnect is reported,
+    so a swap made in between is on the clock if it runs late.
+    """
+    index = socket.if_nametoindex(station)
+
+    def wait_for(action):
+        deadline = time.monotonic() + WIFI_TIMEOUT
+        while time.monotonic() < deadline:
+            try:
+                event = events.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if event["index"] == index and event["action"] == action:
+                return event
+        return None
+
+    samples, errors, macs = [], 0, []
+    for _ in range(rounds):
+        macs.append(mac_netlink.read_sysfs_mac(station))
+        start = time.time()
+        subprocess.run(["iw", "dev", station, "connect", WIFI_SSID], check=True)
+        event = wait_for("connect")
+        if event is None or event["status"]:
+            errors += 1
+        else:
+            samples.append(event["time"] - start)
+        subprocess.run(["iw", "dev", station, "disconnect"], capture_output=True)
+        wait_for("disconnect")
+    return samples, errors, macs
+
+
+def run_wifi(rounds, folder):
+    """Association latency without and with Wi-Fi mode on mac80211_hwsim; returns result records"""
+    import mac_nl80211
+
+    loaded = False
+    if len(hwsim_interfaces()) < 2:
+        subprocess.run(["modprobe", "mac80211_hwsim", "radios=2"], check=True)
+        loaded = True
+        time.sleep(0.5)  # Radios register asynchronously
+    ap, station = hwsim_interfaces()[:2]
+    core = mac_core.SpooferCore(os.path.join(folder, "originals.jsonl"))
+    core.log = lambda message: None
+    original = mac_netlink.read_sysfs_mac(station)
+    events = queue.SimpleQueue()
+    monitor = mac_nl80211.WifiMonitor(events.put)
+    monitor.start()
+    hostapd = start_hostapd(ap, folder)
+    results = []
+    try:
+        subprocess.run(["ip", "link", "set", station, "up"], check=True)
+        print(f"[*] wifi: {station} -> {ap} ({WIFI_SSID}) x {rounds} associations", file=sys.stderr)
+        samples, errors, _ = associate_rounds(station, events, rounds)
+        results.append(summarize("hwsim", "associate", samples, errors))
+
+        print(f"[*] wifi: same with Wi-Fi mode on {station}", file=sys.stderr)
+        randomizer = core.watch_wifi([station])
+        try:
+            samples, errors, macs = associate_rounds(station, events, rounds)
+        finally:
+            randomizer.stop()
+        results.append(summarize("hwsim+wifi", "associate", samples, errors))
+        swaps = [r for r in randomizer.swaps if r["result"] == "ok"]
+        results.append(summarize("hwsim+wifi", "swap", [r["swap_ms"] / 1000 for r in swaps],
+                                 len(randomizer.swaps) - len(swaps)))
+        results.append(summarize("hwsim+wifi", "added", [r["added_ms"] / 1000 for r in swaps
+                                                         if r["added_ms"] is not None], 0))
+        added = results[1]["p50_ms"] - results[0]["p50_ms"]
+        print(f"[*] wifi: {len(set(macs))}/{len(macs)} associations on a fresh MAC, "
+              f"p50 association {added:+.3f} ms with Wi-Fi mode", file=sys.stderr)
+    finally:
+        monitor.stop()
+        hostapd.terminate()
+        hostapd.wait()
+        with contextlib.suppress(Exception):
+            core.set_mac_linux(station, original, quiet=True)
+        if loaded:
+            subprocess.run(["rmmod", "mac80211_hwsim"])
+    return results
+
+
+def measure_import(module, runs=IMPORT_RUNS):
+    """Median cumulative import time of `module` in fresh interpreters (ms)
+
+    One untimed run comes first, so writing .pyc files and a cold page
+    cache don't count. Also returns which GUI-only modules the import loaded.
+    """
+    folder = os.path.dirname(os.path.abspath(__file__))
+    code = f"import sys, {module}; print(*[m for m in {GUI_ONLY_MODULES!r} if m in sys.modules])"
+    subprocess.run([sys.executable, "-c", f"import {module}"], cwd=folder, capture_output=True)
+    times = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=folder,
+                                capture_output=True, text=True, check=True)
+        # -X importtime lines: "import time: self | cumulative | package" (microseconds)
+        for line in result.stderr.splitlines():
+            fields = line.split("|")
+            if len(fields) == 3 and fields[2].strip() == module:
+                times.append(int(fields[1]) / 1000)
+    times.sort()
+    return times[len(times) // 2], result.stdout.split()
+
+
+def check_imports(runs=IMPORT_RUNS):
+    """Print import time against IMPORT_BUDGET_MS; returns how many budgets were broken"""
+    broken = 0
+    for module, budget in IMPORT_BUDGET_MS.items():
+        elapsed, loaded = measure_import(module, runs)
+        ok = elapsed <= budget and not loaded
+        broken += not ok
+        extra = f"  loads {', '.join(loaded)}" if loaded else ""
+        print(f"[{'+' if ok else '-'}] import {module:<12} {elapsed:7.1f} ms  (budget {budget} ms){extra}")
+    return broken
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MAC spoofer backend benchmark (root, Linux)")
+    parser.add_argument("-n", "--interfaces", type=int, default=32, help="Interfaces to create (default 32)")
+    parser.add_argument("-r", "--rounds", type=int, default=3, help="Passes over every interface per operation (3)")
+    parser.add_argument("-b", "--backend", action="append", choices=list(BACKENDS),
+                        help="Backend to run (repeatable, default all)")
+    parser.add_argument("-o", "--output", help="Write JSON results to this file ('-' = stdout)")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON from an earlier run to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Compare: allowed slowdown before a p50/p99 counts as a regression (0.25)")
+    parser.add_argument("--imports", action="store_true",
+                        help="Only check import time of the headless modules against their budget (no root needed)")
+    parser.add_argument("--wifi", type=int, nargs="?", const=20, metavar="N",
+                        help="Only time N hwsim associations without/with Wi-Fi mode (20; needs iw and hostapd)")
+    args = parser.parse_args()
+
+    if args.imports:
+        return 1 if check_imports() else 0
+
+    if platform.system() != "Linux" or os.geteuid() != 0:
+        print("[-] The benchmark needs root on Linux (it creates a network namespace)")
+        return 2
+
+    results = []
+    if args.wifi:
+        # hwsim radios live in the initial namespace - no throwaway one here
+        missing = [tool for tool in ("iw", "hostapd", "modprobe") if not shutil.which(tool)]
+        if missing:
+            print(f"[-] --wifi needs {', '.join(missing)}")
+            return 2
+        kind, sudo = "mac80211_hwsim", None
+        try:
+            results += run_wifi(args.wifi, tempfile.mkdtemp(prefix="mac-bench-"))
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"[-] Wi-Fi benchmark failed: {e}")
+            return 2
+    else:
+        enter_throwaway_netns()
+        interfaces, kind = create_interfaces(args.interfaces)
+        sudo = sudo_shim()
+        store_path = os.path.join(tempfile.mkdtemp(prefix="mac-bench-"), "originals.jsonl")
+
+        for name in args.backend or list(BACKENDS):
+            ops = BACKENDS[name](store_path)
+            if ops is None:
+                print(f"[!] Skipping {name}: backend not available here", file=sys.stderr)
+                continue
+            print(f"[*] {name}: {len(interfaces)} {kind} interfaces x {args.rounds} rounds", file=sys.stderr)
+            results += run_backend(name, ops, interfaces, args.rounds)
+
+    report = {"meta": metadata(args, kind, sudo), "results": results}
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print_table(results)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(report, f, indent=2)
+            print(f"[+] Results written to {args.output}")
+
+    if args.compare and compare(results, args.compare, args.tolerance):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
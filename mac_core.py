@@ -0,0 +1,770 @@
+#!/usr/bin/env python3
+"""
+MAC Address Spoofer - headless core
+Interface discovery, MAC reads, changes and restores for Windows, Linux
+and macOS, shared by the CLI and the GUI. Nothing here needs a display:
+tkinter is never imported, and ctypes/winreg only on the Windows paths
+that use them, so scripts and services can import it cheaply
+"""
+
+import os
+import re
+import time
+import socket
+import fnmatch
+import platform
+import threading
+import subprocess
+
+import mac_netlink
+import mac_netns
+import mac_store
+import mac_metrics
+import mac_generator
+
+READY_TIMEOUT = 10  # Seconds to wait for an adapter to come back after a change
+
+# How set_mac_linux applied a change
+MODE_NOTES = {
+    "live": "live change, no link flap",
+    "down": "link was down",
+    "cycle": "link cycled down/up",
+    "ip": "via ip link",
+    "ifconfig": "via ifconfig",
+}
+
+
+# ifconfig -a block header: "en0: flags=8863<UP,BROADCAST,SMART,RUNNING,...> mtu 1500"
+MAC_ADDRESS = re.compile(r"^([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})$")
+IFCONFIG_HEADER = re.compile(r"^(\S+?):? flags=\w+<([^>]*)>")
+WIRELESS_PREFIXES = ("wlan", "wlp", "wl", "ath", "iwn", "iwm", "wi")
+PHYSICAL_PREFIXES = ("en", "eth", "em", "eno", "ens", "enp", "igb", "ix", "ixl", "re", "bge", "fxp")
+
+
+def guess_kind(name):
+    """Interface kind from its name, where there is no netlink to ask"""
+    prefix = name.rstrip("0123456789")
+    if prefix in ("bridge", "br"):
+        return "bridge"
+    if prefix == "vlan" or "." in name:
+        return "vlan"
+    if prefix in WIRELESS_PREFIXES:
+        return "wireless"
+    if prefix in PHYSICAL_PREFIXES:
+        return "physical"  # macOS names Wi-Fi en0 too - ifconfig can't tell them apart
+    return "virtual"
+
+
+def parse_ifconfig(text):
+    """Turn one `ifconfig -a` run (BSD/macOS or net-tools style) into interface entries
+
+    Same keys as the netlink snapshot, so callers don't care where the
+    state came from.
+    """
+    interfaces = {}
+    entry = None
+    for line in text.splitlines():
+        header = IFCONFIG_HEADER.match(line)
+        if header:
+            name, flags = header.group(1), header.group(2).split(",")
+            try:
+                index = socket.if_nametoindex(name)
+            except OSError:
+                index = 0
+            entry = interfaces[name] = {
+                "index": index, "name": name, "mac": None, "perm_mac": None,
+                "up": "UP" in flags, "carrier": "RUNNING" in flags, "operstate": "unknown",
+                "info_kind": None, "kind": guess_kind(name), "ipv4": [], "ipv6": [],
+            }
+            continue
+        fields = line.split()
+        if entry is None or len(fields) < 2:
+            continue
+        if fields[0] in ("ether", "lladdr"):
+            entry["mac"] = fields[1].lower()
+        elif fields[0] == "inet":
+            entry["ipv4"].append(fields[1].removeprefix("addr:"))
+        elif fields[0] == "inet6":
+            entry["ipv6"].append(fields[1].split("%")[0])
+        elif fields[0] == "status:":
+            entry["carrier"] = fields[1] == "active"  # BSD/macOS media status
+    for entry in interfaces.values():
+        entry["operstate"] = "up" if entry["up"] and entry["carrier"] else "down"
+    return interfaces
+
+
+class OperationCancelled(Exception):
+    """Raised inside a change when the caller cancels it at a safe point"""
+
+
+def is_admin():
+    """Whether this process may change adapters (Administrator/root)"""
+    if platform.system() == "Windows":
+        import ctypes  # Windows only - not loaded on Linux/macOS
+        return bool(ctypes.windll.shell32.IsUserAnAdmin())
+    return os.geteuid() == 0
+
+
+class SpooferCore:
+    """MAC spoofing and restoring without any user interface
+
+    Front ends subclass it and override log() and progress() (both may be
+    called from worker threads) and alert() for errors the user must see.
+    Long changes check cancel_event at safe points and raise
+    OperationCancelled there.
+    """
+
+    def __init__(self, store_path=None, metrics=None, ready_timeout=READY_TIMEOUT):
+        self.os_type = platform.system()
+        # Native rtnetlink socket (Linux only), reused for every change
+        self.netlink = mac_netlink.open_backend()
+        # Tool for the subprocess fallback (no netlink, or netlink refused the change)
+        self.link_tool = "ip" if self.os_type == "Linux" else "ifconfig"
+        self.used_macs = None  # Local + neighbor MACs, loaded on first random pick
+        self.deriver = None  # mac_generator.MACDeriver: keyed, reproducible MACs instead of random ones
+        # Every interface's state from one dump; kept current by watch_interfaces(), else re-dumped per read
+        self.interfaces = mac_netlink.InterfaceRegistry()
+        # Netlink clients inside other namespaces, for "<netns>/<interface>" names (Linux only)
+        self.netns = mac_netns.NamespacePool()
+        self.netns_patterns = ()  # Namespaces whose interfaces get_interfaces() lists too
+        # Hardware MACs journaled on disk before the first change (survive crashes/reboots)
+        self.original_macs = mac_store.OriginalMACStore(store_path)
+        self.metrics = metrics or mac_metrics.Metrics()  # Per-step timings
+        self.ready_timeout = ready_timeout  # Seconds to wait for the link to come back (0 = don't wait)
+        self.cancel_event = threading.Event()
+        # Without root, Linux/macOS changes go through the privileged helper (mac_helper.py) if one runs
+        self.helper = None
+        if self.os_type != "Windows" and not is_admin():
+            import mac_helper  # Small, but only needed without root
+            if os.path.exists(mac_helper.default_socket_path()):
+                self.helper = mac_helper.HelperClient()
+
+    def log(self, message):
+        """Report what is happening (any thread)"""
+        print(message)
+
+    def progress(self, message):
+        """Report the current step of a long change (any thread)"""
+
+    def alert(self, title, message):
+        """Report an error the user has to act on (any thread)"""
+        self.log(f"{title}: {message}")
+
+    def check_cancelled(self):
+        """Abort the running operation at a safe point if the user cancelled"""
+        if self.cancel_event.is_set():
+            raise OperationCancelled()
+
+    def wait_adapter(self, interface, connected, timeout=READY_TIMEOUT, fallback=3):
+        """Wait until netsh reports the adapter (dis)connected; returns seconds or None
+
+        Polls every 250 ms instead of sleeping a fixed time, and wakes up
+        early if cancelled. If the connect state can't be read (e.g. a
+        localized netsh), sleeps `fallback` seconds like before.
+        """
+        start = time.perf_counter()
+        wanted = "Connected" if connected else "Disconnected"
+        while True:
+            result = subprocess.run(f'netsh interface show interface name="{interface}"',
+                                    shell=True, capture_output=True, text=True)
+            state = re.search(r"Connect state:\s*(\w+)", result.stdout)
+            if state is None:
+                self.cancel_event.wait(fallback)
+                return None
+            if state.group(1) == wanted:
+                return time.perf_counter() - start
+            if time.perf_counter() - start >= timeout or self.cancel_event.wait(0.25):
+                return None
+
+    def get_interface_states(self):
+        """Get index/kind/MAC/state/addresses of every interface in one call, keyed by name
+
+        Linux: the interface registry (one netlink dump, or no dump at
+        all while watch_interfaces() keeps it current). macOS/BSD: one
+        `ifconfig -a`. Windows: {} - callers fall back to netsh/PowerShell.
+        """
+        try:
+            if self.netlink:
+                return self.interfaces.read(self.netlink)
+            if self.os_type != "Windows" and self.link_tool == "ifconfig":
+                return parse_ifconfig(subprocess.check_output(["ifconfig", "-a"], text=True,
+                                                              stderr=subprocess.DEVNULL))
+        except (OSError, subprocess.CalledProcessError) as e:
+            self.log(f"Interface snapshot failed: {e}")
+        return {}
+
+    def watch_interfaces(self, callback=None, groups=mac_netlink.DEFAULT_GROUPS):
+        """Keep the interface registry current from netlink events; returns the monitor (or None)
+
+        Every link/address event is applied to the registry before
+        callback(event) runs (monitor thread), so reads made from the
+        callback already see the change. Stop the returned monitor when done.
+        """
+        if not self.netlink:
+            return None
+
+        def on_event(event):
+            if event["kind"] == "resync":
+                try:
+                    self.interfaces.load(self.netlink)
+                except OSError as e:
+                    self.log(f"Interface resync failed: {e}")
+            elif event["kind"] != "neigh":
+                self.interfaces.apply(event)
+            if callback:
+                callback(event)
+
+        monitor = mac_netlink.start_monitor(on_event, groups | mac_netlink.DEFAULT_GROUPS)
+        self.interfaces.live = monitor is not None
+        return monitor
+
+    def watch_wifi(self, interfaces, on_swap=None):
+        """Give wireless interfaces a new MAC between associations; returns the running randomizer
+
+        See mac_nl80211.WifiRandomizer - swaps follow nl80211 disconnect
+        and scan notifications and never take the link down. New MACs
+        are random, or derived per swap (epoch = swap count) with a
+        deriver. Raises OSError without netlink or nl80211.
+        """
+        import mac_nl80211  # Generic netlink is only needed for Wi-Fi mode
+
+        if not self.netlink:
+            raise OSError("Wi-Fi mode needs netlink (Linux)")
+        pick = None
+        if self.deriver is not None:
+            counts = {}
+
+            def pick(interface):
+                counts[interface] = counts.get(interface, 0) + 1
+                return self.derive_mac(interface, counts[interface])
+        return mac_nl80211.WifiRandomizer(self, interfaces, pick, on_swap).start()
+
+    def get_interfaces(self):
+        """Get list of network interfaces (only connected/active ones on Windows)"""
+        interfaces = []
+        try:
+            if self.netlink:
+                interfaces = list(self.get_interface_states())
+            elif self.os_type == "Windows":
+                result = subprocess.check_output("netsh interface show interface",
+                                                shell=True, stderr=subprocess.DEVNULL).decode()
+                lines = result.split('\n')[3:]  # Skip header
+                for line in lines:
+                    if line.strip():
+                        parts = line.split()
+                        # Only include connected interfaces (filter out disconnected Wintun, etc.)
+                        if len(parts) >= 4 and parts[1] == "Connected":
+                            interface_name = ' '.join(parts[3:])
+                            interfaces.append(interface_name)
+            else:
+                # if_nameindex() asks the kernel directly - no process needed
+                interfaces = [name for _, name in socket.if_nameindex()]
+        except Exception as e:
+            self.log(f"Error getting interfaces: {e}")
+        if self.netns_patterns and self.os_type == "Linux":
+            interfaces += self.namespaced_interfaces(self.netns_patterns)
+        return interfaces
+
+    def netns_link(self, interface):
+        """(netlink client, name) for a "<netns>/<interface>" name, else (None, interface)"""
+        namespace, _, name = interface.rpartition("/")
+        if not namespace or self.os_type != "Linux":
+            return None, interface
+        return self.netns.get(namespace), name
+
+    def find_namespaces(self, patterns):
+        """Names of network namespaces matching any glob ("pid:*" patterns add process namespaces)"""
+        pids = any(pattern.startswith("pid:") for pattern in patterns)
+        return [namespace for namespace in mac_netns.list_namespaces(pids)
+                if any(fnmatch.fnmatchcase(namespace, pattern) for pattern in patterns)]
+
+    def namespace_states(self, namespaces, jobs=16):
+        """{namespace: (interface states, error)} - one dump per namespace, `jobs` at a time"""
+        return self.netns.map(lambda namespace, client: client.snapshot(), namespaces, jobs)
+
+    def namespaced_interfaces(self, patterns):
+        """"<netns>/<interface>" names of every interface in namespaces matching patterns"""
+        names = []
+        for namespace, (states, error) in self.namespace_states(self.find_namespaces(patterns)).items():
+            if error:
+                self.log(f"Namespace {namespace}: {error}")
+            else:
+                names += [f"{namespace}/{name}" for name in states]
+        return names
+
+    def get_current_mac(self, interface):
+        """Get the current MAC address of an interface"""
+        try:
+            client, name = self.netns_link(interface)
+            if client:
+                return client.get_link(name)["mac"]
+            if self.os_type == "Windows":
+                # Use PowerShell Get-NetAdapter to get actual active MAC (including spoofed)
+                cmd = f'powershell "Get-NetAdapter -Name \'{interface}\' | Select-Object -ExpandProperty MacAddress"'
+                result = subprocess.check_output(cmd, shell=True, stderr=subprocess.DEVNULL).decode().strip()
+                # PowerShell returns MAC in format: XX-XX-XX-XX-XX-XX
+                if result and MAC_ADDRESS.match(result):
+                    # Convert to colon format for consistency
+                    return result.replace('-', ':')
+            elif self.netlink:
+                # The kernel already exposes the MAC in sysfs - no process needed
+                return mac_netlink.read_sysfs_mac(interface)
+            elif self.link_tool == "ip":
+                result = subprocess.check_output(["ip", "link", "show", interface]).decode()
+                mac_match = re.search(r"link/ether\s+([0-9A-Fa-f]{2}:){5}([0-9A-Fa-f]{2})", result)
+                if mac_match:
+                    return mac_match.group(0).split()[-1]
+            else:
+                result = subprocess.check_output(["ifconfig", interface]).decode()
+                mac_match = re.search(r"([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})", result)
+                if mac_match:
+                    return mac_match.group(0)
+        except Exception as e:
+            self.log(f"Error getting MAC: {e}")
+        return None
+
+    def get_ip_address(self, interface):
+        """Get the current IP address of an interface"""
+        try:
+            client, name = self.netns_link(interface)
+            if client:
+                index = client.get_link(name)["index"]
+                addresses = client.dump_addresses(socket.AF_INET, index).get(index)
+                return addresses["ipv4"][0] if addresses else "N/A"
+            if self.os_type == "Windows":
+                cmd = f'netsh interface ip show addresses "{interface}"'
+                result = subprocess.check_output(cmd, shell=True, stderr=subprocess.DEVNULL).decode()
+                ip_match = re.search(r"IP Address:\s+(\d+\.\d+\.\d+\.\d+)", result)
+                if ip_match:
+                    return ip_match.group(1)
+            elif self.netlink:
+                state = self.get_interface_states().get(interface)
+                if state and state["ipv4"]:
+                    return state["ipv4"][0]
+            else:
+                cmd = ["ip", "addr", "show", interface] if self.link_tool == "ip" else ["ifconfig", interface]
+                result = subprocess.check_output(cmd, stderr=subprocess.DEVNULL).decode()
+                ip_match = re.search(r"inet\s+(?:addr:)?(\d+\.\d+\.\d+\.\d+)", result)
+                if ip_match:
+                    return ip_match.group(1)
+        except Exception as e:
+            pass  # Silently fail for IP
+        return "N/A"
+
+    def hardware_mac(self, interface, current_mac):
+        """Permanent (burned-in) MAC where the kernel reports one, else current_mac"""
+        if self.netlink:
+            try:
+                client, name = self.netns_link(interface)
+                return (client or self.netlink).get_link(name)["perm_mac"] or current_mac
+            except OSError:
+                pass
+        return current_mac
+
+    def remember_originals(self, interfaces):
+        """Journal the hardware MAC of interfaces before their first change
+
+        Uses the permanent (burned-in) address where the kernel reports
+        one, else the MAC the interface has right now. One journal write
+        covers all of them.
+        """
+        new = [interface for interface in interfaces if interface not in self.original_macs]
+        if not new:
+            return
+        links = self.get_interface_states() if self.netlink else {}
+        originals = {}
+        for interface in new:
+            link = links.get(interface, {})
+            mac = link.get("perm_mac") or link.get("mac")
+            if not mac:
+                mac = self.hardware_mac(interface, self.get_current_mac(interface))
+            if mac:
+                originals[interface] = mac.lower()
+        try:
+            self.original_macs.record_many(originals)
+        except OSError as e:
+            self.log(f"WARNING: Could not save original MACs to {self.original_macs.path}: {e}")
+
+    def remember_original(self, interface):
+        """Journal one interface's hardware MAC before its first change"""
+        self.remember_originals([interface])
+
+    def load_used_macs(self, reload=False):
+        """MACs of local interfaces and ARP/NDP neighbors, loaded on first use (netlink only)"""
+        if (self.used_macs is None or reload) and self.netlink:
+            try:
+                self.used_macs = mac_netlink.UsedMACs().load(self.netlink)
+            except OSError as e:
+                self.log(f"Collision check unavailable: {e}")
+        return self.used_macs
+
+    def generate_random_mac(self, prefix=None, upper=False, claim=False):
+        """Generate a random MAC address not already in use on this host or segment
+
+        A vendor prefix (if any) is made locally administered for Intel
+        compatibility; random octets come from os.urandom. With claim=True
+        the MAC is reserved so parallel picks never hand it out twice.
+        """
+        return mac_netlink.pick_unused_mac(lambda: mac_generator.random_mac(prefix, upper=upper),
+                                           self.load_used_macs(), claim=claim)
+
+    def derive_mac(self, interface, epoch=0, upper=False):
+        """The deriver's MAC for an interface in an epoch
+
+        The interface is identified by its journaled hardware MAC, so the
+        result survives renames and reboots and is the same whichever
+        tool or node computes it. Derived MACs are not collision-checked:
+        re-picking would make them depend on local state.
+        """
+        if self.deriver is None:
+            raise ValueError("No derivation key configured")
+        self.remember_original(interface)
+        return self.deriver.mac(self.original_macs.get(interface) or interface, epoch, upper)
+
+    def get_adapter_guid(self, interface_name):
+        """Get the adapter GUID from the interface name"""
+        try:
+            # Use PowerShell to get adapter GUID
+            cmd = f'powershell "Get-NetAdapter | Where-Object {{$_.Name -eq \'{interface_name}\' -or $_.InterfaceDescription -like \'*{interface_name}*\'}} | Select-Object -ExpandProperty InterfaceGuid"'
+            result = subprocess.check_output(cmd, shell=True, stderr=subprocess.DEVNULL).decode().strip()
+            if result:
+                return result
+        except:
+            pass
+        return None
+
+    def find_adapter_registry_key(self, interface_name):
+        """Find the adapter registry key path"""
+        import winreg  # Windows only - loaded on first use
+        try:
+            # Network adapters registry path
+            adapters_path = r"SYSTEM\CurrentControlSet\Control\Class\{4D36E972-E325-11CE-BFC1-08002BE10318}"
+
+            # Open the network adapters key
+            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, adapters_path, 0, winreg.KEY_READ) as adapters_key:
+                # Enumerate all subkeys
+                i = 0
+                while True:
+                    try:
+                        subkey_name = winreg.EnumKey(adapters_key, i)
+                        i += 1
+
+                        # Skip non-numeric keys
+                        if not subkey_name.isdigit():
+                            continue
+
+                        # Open each adapter subkey
+                        subkey_path = f"{adapters_path}\\{subkey_name}"
+                        try:
+                            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, subkey_path, 0, winreg.KEY_READ) as adapter_key:
+                                try:
+                                    # Get DriverDesc (adapter description)
+                                    desc, _ = winreg.QueryValueEx(adapter_key, "DriverDesc")
+
+                                    # Check if this matches our interface
+                                    if interface_name.lower() in desc.lower() or desc.lower() in interface_name.lower():
+                                        return subkey_path
+
+                                    # Also check NetCfgInstanceId
+                                    try:
+                                        instance_id, _ = winreg.QueryValueEx(adapter_key, "NetCfgInstanceId")
+                                        guid = self.get_adapter_guid(interface_name)
+                                        if guid and instance_id.lower() == guid.lower():
+                                            return subkey_path
+                                    except:
+                                        pass
+                                except:
+                                    pass
+                        except:
+                            pass
+                    except OSError:
+                        break
+        except Exception as e:
+            self.log(f"Registry search error: {e}")
+        return None
+
+    def change_mac_windows(self, interface, new_mac):
+        """Change MAC address on Windows using registry method"""
+        import winreg  # Windows only - loaded on first use
+        try:
+            # Clean MAC address (remove colons/dashes)
+            new_mac_clean = new_mac.replace(':', '').replace('-', '').upper()
+
+            self.log(f"Attempting to change MAC to {new_mac}")
+            self.log("Finding adapter in registry...")
+            self.progress("Finding adapter in registry...")
+
+            # Find the adapter's registry key
+            with self.metrics.time("registry_lookup", interface):
+                registry_path = self.find_adapter_registry_key(interface)
+
+            if not registry_path:
+                self.log("ERROR: Could not find adapter in registry!")
+                self.log("Try selecting a different network adapter.")
+                return False
+
+            self.log(f"Found adapter at: {registry_path}")
+
+            # STEP 1: First restore original MAC (delete registry override)
+            # This ensures Intel adapters fully reset before applying new spoof
+            self.check_cancelled()
+            self.progress("Step 1/4: Clearing previous override")
+            self.log("Clearing previous MAC override...")
+            try:
+                with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, registry_path, 0,
+                                   winreg.KEY_SET_VALUE) as key:
+                    try:
+                        winreg.DeleteValue(key, "NetworkAddress")
+                        self.log("Previous override cleared")
+                    except FileNotFoundError:
+                        self.log("No previous override found")
+            except PermissionError:
+                self.log("ERROR: Permission denied! Run as Administrator.")
+                self.alert("Permission Denied",
+                    "Administrator privileges required to modify registry.\n"
+                    "Please run this application as Administrator.")
+                return False
+
+            # STEP 2: Restart adapter to apply original MAC
+            self.progress("Step 2/4: Resetting adapter to hardware MAC")
+            self.log("Resetting adapter to hardware MAC...")
+            try:
+                disable_cmd = f'netsh interface set interface "{interface}" disable'
+                with self.metrics.time("adapter_disable", interface):
+                    result = subprocess.run(disable_cmd, shell=True, capture_output=True, text=True)
+                if result.returncode != 0:
+                    self.log(f"Warning: Could not disable adapter: {result.stderr}")
+                else:
+                    self.wait_adapter(interface, connected=False)
+                    self.log("Adapter disabled")
+
+                enable_cmd = f'netsh interface set interface "{interface}" enable'
+                with self.metrics.time("adapter_enable", interface):
+                    result = subprocess.run(enable_cmd, shell=True, capture_output=True, text=True)
+                if result.returncode != 0:
+                    self.log(f"Warning: Could not enable adapter: {result.stderr}")
+                else:
+                    self.wait_adapter(interface, connected=True)
+                    self.log("Adapter reset to hardware MAC")
+            except Exception as e:
+                self.log(f"Error resetting adapter: {e}")
+
+            # STEP 3: Now apply the new spoofed MAC
+            # Last safe point to cancel - the adapter is back up on its hardware MAC
+            self.check_cancelled()
+            self.progress("Step 3/4: Writing new MAC to registry")
+            self.log(f"Applying new MAC: {new_mac}")
+            try:
+                with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, registry_path, 0,
+                                   winreg.KEY_SET_VALUE | winreg.KEY_READ) as key:
+                    with self.metrics.time("address_set", interface):
+                        winreg.SetValueEx(key, "NetworkAddress", 0, winreg.REG_SZ, new_mac_clean)
+                    self.log(f"Registry updated with new MAC: {new_mac_clean}")
+            except PermissionError:
+                self.log("ERROR: Permission denied! Run as Administrator.")
+                return False
+
+            # STEP 4: Restart adapter again to apply new spoofed MAC
+            self.progress("Step 4/4: Restarting adapter with new MAC")
+            self.log("Restarting adapter with new MAC...")
+            try:
+                disable_cmd = f'netsh interface set interface "{interface}" disable'
+                with self.metrics.time("adapter_disable", interface):
+                    result = subprocess.run(disable_cmd, shell=True, capture_output=True, text=True)
+                if result.returncode != 0:
+                    self.log(f"Warning: Could not disable adapter: {result.stderr}")
+                else:
+                    self.wait_adapter(interface, connected=False)
+                    self.log("Adapter disabled")
+
+                enable_cmd = f'netsh interface set interface "{interface}" enable'
+                with self.metrics.time("adapter_enable", interface):
+                    result = subprocess.run(enable_cmd, shell=True, capture_output=True, text=True)
+                if result.returncode != 0:
+                    self.log(f"Warning: Could not enable adapter: {result.stderr}")
+                else:
+                    ready = self.wait_adapter(interface, connected=True)
+                    if ready is None:
+                        self.metrics.timeout("carrier_regained", interface)
+                        self.log("Adapter enabled (not connected yet)")
+                    else:
+                        self.metrics.observe("carrier_regained", ready, interface)
+                        self.log(f"Adapter enabled, connected after {ready:.1f}s")
+                    self.log("✓ MAC address changed successfully!")
+                    return True
+            except Exception as e:
+                self.log(f"Error restarting adapter: {e}")
+                self.log("Please manually disable/enable the adapter in Network Settings.")
+                return True  # Registry was set, just adapter restart failed
+
+            return True
+        except OperationCancelled:
+            raise
+        except Exception as e:
+            self.log(f"Error: {e}")
+            return False
+
+    def set_mac_linux(self, interface, new_mac, quiet=False):
+        """Change MAC on Linux/macOS, netlink first then ip/ifconfig; raises on failure
+
+        Returns (mode, ready): how the change was made (see MODE_NOTES)
+        and the seconds until the link carried traffic again (None if not
+        measured or it did not come back within ready_timeout).
+        """
+        try:
+            return self.apply_mac_linux(interface, new_mac, quiet)
+        finally:
+            self.metrics.flush()
+
+    def apply_mac_linux(self, interface, new_mac, quiet=False):
+        """The change itself for set_mac_linux, each step timed"""
+        if self.helper:
+            try:
+                with self.metrics.time("helper_request", interface):
+                    result = self.helper.request("set", interface=interface, mac=new_mac)
+            except (ConnectionError, FileNotFoundError, PermissionError) as e:
+                if not quiet:
+                    self.log(f"Helper unreachable ({e}), changing directly")
+                self.helper = None
+            else:
+                return result["mode"], result["ready"]
+
+        client, name = self.netns_link(interface)
+        if client:
+            # Inside another namespace netlink is the only way in - no ip/ifconfig fallback
+            namespace = interface.rpartition("/")[0]
+            return mac_netlink.change_and_wait(client, name, new_mac, self.ready_timeout, self.metrics,
+                                               self.cancel_event, lambda: self.netns.waiter(namespace))
+
+        netlink_error = None
+        if self.netlink:
+            try:
+                return mac_netlink.change_and_wait(self.netlink, interface, new_mac, self.ready_timeout,
+                                                   self.metrics, self.cancel_event)
+            except (OSError, ValueError) as e:
+                netlink_error = e
+                if not quiet:
+                    self.log(f"Netlink change failed ({e}), falling back to {self.link_tool}")
+
+        try:
+            if self.link_tool == "ip":
+                self.set_mac_ip(interface, new_mac, quiet)
+            else:
+                self.set_mac_ifconfig(interface, new_mac, quiet)
+        except (subprocess.CalledProcessError, OSError) as e:
+            if netlink_error is None:
+                raise
+            # Report why both backends failed, not just the fallback
+            detail = (getattr(e, "stderr", None) or b"").decode(errors="replace").strip() or str(e)
+            raise OSError(f"netlink: {netlink_error}; {self.link_tool}: {detail}") from e
+        return self.link_tool, None
+
+    def set_mac_ip(self, interface, new_mac, quiet=False):
+        """down -> address -> up with iproute2 (Linux)"""
+        with self.metrics.time("adapter_disable", interface):
+            subprocess.run(["sudo", "ip", "link", "set", interface, "down"], check=True, capture_output=quiet)
+        with self.metrics.time("address_set", interface):
+            subprocess.run(["sudo", "ip", "link", "set", interface, "address", new_mac],
+                           check=True, capture_output=quiet)
+        with self.metrics.time("adapter_enable", interface):
+            subprocess.run(["sudo", "ip", "link", "set", interface, "up"], check=True, capture_output=quiet)
+
+    def set_mac_ifconfig(self, interface, new_mac, quiet=False):
+        """down -> hw ether -> up with ifconfig"""
+        with self.metrics.time("adapter_disable", interface):
+            subprocess.run(["sudo", "ifconfig", interface, "down"], check=True, capture_output=quiet)
+        with self.metrics.time("address_set", interface):
+            subprocess.run(["sudo", "ifconfig", interface, "hw", "ether", new_mac],
+                           check=True, capture_output=quiet)
+        with self.metrics.time("adapter_enable", interface):
+            subprocess.run(["sudo", "ifconfig", interface, "up"], check=True, capture_output=quiet)
+
+    def change_mac_linux(self, interface, new_mac):
+        """Change MAC address on Linux/macOS and log how it went; True on success
+
+        With netlink, returns once the link carries traffic again (or
+        ready_timeout passes), woken by link/address notifications.
+        """
+        self.progress(f"Setting {interface} to {new_mac}")
+        try:
+            mode, ready = self.set_mac_linux(interface, new_mac)
+        except (subprocess.CalledProcessError, OSError, ValueError) as e:
+            self.log(f"Error: {e}")
+            return False
+        self.log(f"MAC changed to {new_mac} ({MODE_NOTES[mode]})")
+        if ready is not None:
+            self.log(f"Link ready after {ready * 1000:.0f} ms")
+        elif mode == "cycle" and self.ready_timeout and not self.cancel_event.is_set():
+            self.log(f"Link not back within {self.ready_timeout:g}s")
+        return True
+
+    def spoof(self, interface, new_mac):
+        """Give an interface new_mac, journaling its original first; True on success"""
+        self.check_cancelled()
+        self.remember_original(interface)
+        try:
+            if self.os_type == "Windows":
+                return self.change_mac_windows(interface, new_mac)
+            return self.change_mac_linux(interface, new_mac)
+        finally:
+            self.metrics.flush()
+
+    def restore_original_windows(self, interface):
+        """Restore original MAC on Windows by removing registry override"""
+        import winreg  # Windows only - loaded on first use
+        try:
+            self.log("Restoring original MAC address...")
+            self.progress("Step 1/2: Removing registry override")
+
+            # Find the adapter's registry key
+            registry_path = self.find_adapter_registry_key(interface)
+
+            if not registry_path:
+                self.log("ERROR: Could not find adapter in registry!")
+                return False
+
+            self.log(f"Found adapter at: {registry_path}")
+
+            # Delete the NetworkAddress registry value
+            try:
+                with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, registry_path, 0,
+                                   winreg.KEY_SET_VALUE) as key:
+                    try:
+                        winreg.DeleteValue(key, "NetworkAddress")
+                        self.log("Registry override removed")
+                    except FileNotFoundError:
+                        self.log("No registry override found (already using original MAC)")
+            except PermissionError:
+                self.log("ERROR: Permission denied! Run as Administrator.")
+                return False
+
+            # Restart adapter
+            self.progress("Step 2/2: Restarting network adapter")
+            self.log("Restarting network adapter...")
+            try:
+                disable_cmd = f'netsh interface set interface "{interface}" disable'
+                subprocess.run(disable_cmd, shell=True, capture_output=True)
+                self.wait_adapter(interface, connected=False, fallback=1)
+                self.log("Adapter disabled")
+
+                enable_cmd = f'netsh interface set interface "{interface}" enable'
+                subprocess.run(enable_cmd, shell=True, capture_output=True)
+                self.wait_adapter(interface, connected=True, fallback=2)
+                self.log("Adapter enabled")
+                self.log("✓ Original MAC address restored!")
+                return True
+            except Exception as e:
+                self.log(f"Error restarting adapter: {e}")
+                return True
+
+        except Exception as e:
+            self.log(f"Error: {e}")
+            return False
+
+    def restore_one(self, interface, mac):
+        """Put one interface back to its original MAC; raises on failure"""
+        if self.os_type == "Windows":
+            if not self.restore_original_windows(interface):
+                raise OSError(f"Could not restore {interface}")
+        else:
+            self.set_mac_linux(interface, mac, quiet=True)
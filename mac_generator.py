@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+MAC Address Spoofer - bulk MAC generator
+Generates locally administered unicast MAC addresses (fully random or
+under a vendor prefix) from a buffered os.urandom pool, whole batches
+at a time, without duplicates within a run. Also derives MACs from a
+secret key with HMAC-SHA256, so a MAC can be recomputed anywhere from
+the same inputs without storing it
+Run directly for a MACs/second benchmark
+"""
+
+import os
+import sys
+import time
+import struct
+import argparse
+
+MIN_KEY_BYTES = 16  # Shorter derivation keys are refused
+POOL_SIZE = 1 << 16  # Bytes drawn from os.urandom per refill
+BATCH_SIZE = 65536   # MACs built per pass
+
+# First octet fix-up for fully random MACs: set locally administered, clear multicast
+LOCAL_UNICAST = bytes((b & 0xFE) | 0x02 for b in range(256))
+
+
+def parse_prefix(prefix):
+    """Raw octets of a vendor prefix like '00:1A:11', '00-1a-11' or '001A11' (at most 5)"""
+    try:
+        prefix_bytes = bytes.fromhex(prefix.replace(':', '').replace('-', '')) if prefix else b""
+    except ValueError:
+        raise ValueError(f"Invalid prefix: {prefix}") from None
+    if len(prefix_bytes) > 5:
+        raise ValueError(f"Prefix too long: {prefix}")
+    return prefix_bytes
+
+
+class MACGenerator:
+    """Bulk generator of locally administered unicast MACs
+
+    Random bytes come from a buffered os.urandom pool. Each batch is
+    assembled with slice assignments (prefix octets, random octets and
+    the first-octet fix-up are all applied to the whole batch at once),
+    and addresses already handed out are skipped, so a generator never
+    returns the same MAC twice.
+    """
+
+    def __init__(self, prefix=None, unique=True):
+        prefix_bytes = parse_prefix(prefix)
+        if prefix_bytes:
+            # Vendor prefix stays recognisable but becomes locally administered
+            prefix_bytes = bytes([LOCAL_UNICAST[prefix_bytes[0]]]) + prefix_bytes[1:]
+        self.prefix = prefix_bytes
+        self.host_len = 6 - len(prefix_bytes)
+        # Two bits of the first octet are fixed when it is random
+        self.space = 1 << (8 * self.host_len - (0 if prefix_bytes else 2))
+        self.seen = set() if unique else None
+        self.pool = b""
+        self.pool_pos = 0
+
+    def random_bytes(self, n):
+        """Take n bytes from the urandom pool, refilling it as needed"""
+        if self.pool_pos + n > len(self.pool):
+            self.pool = self.pool[self.pool_pos:] + os.urandom(max(n, POOL_SIZE))
+            self.pool_pos = 0
+        chunk = self.pool[self.pool_pos:self.pool_pos + n]
+        self.pool_pos += n
+        return chunk
+
+    def build_batch(self, count):
+        """Return `count` raw 6-byte MACs (duplicates not yet removed)"""
+        raw = self.random_bytes(count * self.host_len)
+        buf = bytearray(count * 6)
+        offset = len(self.prefix)
+        for i, octet in enumerate(self.prefix):
+            buf[i::6] = bytes([octet]) * count
+        for i in range(self.host_len):
+            buf[offset + i::6] = raw[i::self.host_len]
+        if not self.prefix:
+            buf[0::6] = bytes(buf[0::6]).translate(LOCAL_UNICAST)
+        data = bytes(buf)
+        return [data[i:i + 6] for i in range(0, len(data), 6)]
+
+    def generate(self, count):
+        """Return `count` new raw MACs, never repeating one from this generator"""
+        if self.seen is not None and count > self.space - len(self.seen):
+            raise ValueError(f"Only {self.space - len(self.seen)} unused addresses left under this prefix")
+        macs = []
+        seen = self.seen
+        while len(macs) < count:
+            batch = self.build_batch(min(BATCH_SIZE, count - len(macs)))
+            if seen is not None:
+                # set.add returns None, so this keeps first sightings only
+                batch = [mac for mac in batch if not (mac in seen or seen.add(mac))]
+            macs += batch
+        return macs
+
+    def stream(self, count, out, upper=False):
+        """Write `count` MACs to a text stream, one per line, batch by batch"""
+        written = 0
+        while written < count:
+            batch = self.generate(min(BATCH_SIZE, count - written))
+            out.write(format_macs(batch, upper))
+            out.write("\n")
+            written += len(batch)
+        return written
+
+
+def format_macs(macs, upper=False):
+    """Format raw MACs as newline-separated 'aa:bb:cc:dd:ee:ff' text"""
+    text = b"".join(macs).hex(':')
+    if upper:
+        text = text.upper()
+    # Every MAC is 17 characters followed by one separator
+    return "\n".join([text[i:i + 17] for i in range(0, len(text), 18)])
+
+
+def build_mac(prefix, filler, upper=False):
+    """One locally administered unicast MAC: the vendor prefix (if any), then bytes of filler
+
+    Without a prefix the first filler byte is fixed up like a random
+    first octet; with one, the prefix's first octet is. Raises ValueError
+    for a malformed prefix or one of more than 5 octets.
+    """
+    prefix_bytes = parse_prefix(prefix)
+    if prefix_bytes:
+        raw = bytes([LOCAL_UNICAST[prefix_bytes[0]]]) + prefix_bytes[1:] + filler[:6 - len(prefix_bytes)]
+    else:
+        raw = bytes([LOCAL_UNICAST[filler[0]]]) + filler[1:6]
+    mac = raw.hex(':')
+    return mac.upper() if upper else mac
+
+
+def random_mac(prefix=None, upper=False):
+    """Generate a single locally administered unicast MAC from os.urandom"""
+    return build_mac(prefix, os.urandom(6), upper)
+
+
+def load_key(path):
+    """Derivation key from a file (e.g. `head -c 32 /dev/urandom > key`); a trailing newline is ignored"""
+    with open(path, "rb") as f:
+        key = f.read().rstrip(b"\r\n")
+    if len(key) < MIN_KEY_BYTES:
+        raise ValueError(f"{path}: derivation key must be at least {MIN_KEY_BYTES} bytes")
+    return key
+
+
+def current_epoch(interval, now=None):
+    """Number of whole `interval`-second periods since the Unix epoch (wall clock, same on every node)"""
+    if not interval > 0:
+        raise ValueError(f"epoch interval must be above 0 seconds, not {interval}")
+    return int((time.time() if now is None else now) // interval)
+
+
+class MACDeriver:
+    """Deterministic MACs: HMAC-SHA256(key, identity, context, epoch)
+
+    identity names the interface (its hardware MAC, say), context the
+    network it is used on (an SSID, a VLAN) and epoch counts rotations.
+    Anyone holding the key computes the same MAC from the same inputs -
+    no table of past MACs to store or share - while without the key the
+    MACs of different contexts or epochs can't be linked. Fields are
+    length-prefixed, so ("ab", "c") and ("a", "bc") never collide, and
+    the vendor prefix is hashed too, so switching prefix doesn't keep the
+    same host bytes.
+    """
+
+    def __init__(self, key, context="", prefix=None):
+        if len(key) < MIN_KEY_BYTES:
+            raise ValueError(f"derivation key must be at least {MIN_KEY_BYTES} bytes")
+        self.key = key
+        self.context = context
+        # Checked now rather than on the first MAC; kept as "00:1a:11" whatever form it was given in
+        self.prefix = parse_prefix(prefix).hex(':') or None
+
+    def mac(self, identity, epoch=0, upper=False):
+        """The MAC for one interface identity in one epoch"""
+        import hmac  # hmac/hashlib load OpenSSL (~3 ms) - only derivation needs them
+        import hashlib
+
+        fields = [b"mac-spoofer-derive-v1", identity.lower().encode(), self.context.encode(),
+                  (self.prefix or "").encode(), struct.pack(">q", epoch)]
+        message = b"".join(struct.pack(">I", len(field)) + field for field in fields)
+        return build_mac(self.prefix, hmac.new(self.key, message, hashlib.sha256).digest(), upper)
+
+
+def benchmark(counts=(10_000, 100_000, 1_000_000), prefixes=(None, "00:1A:11")):
+    """Print MACs/second for generating (and formatting) different batch sizes"""
+    print(f"{'prefix':<10} {'count':>10} {'generate/s':>14} {'+format/s':>14}")
+    for prefix in prefixes:
+        for count in counts:
+            generator = MACGenerator(prefix)
+            start = time.perf_counter()
+            macs = generator.generate(count)
+            generated = time.perf_counter() - start
+            format_macs(macs)
+            formatted = time.perf_counter() - start
+            print(f"{prefix or 'random':<10} {count:>10} {count / generated:>14,.0f} {count / formatted:>14,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk MAC generator benchmark")
+    parser.add_argument("-n", "--count", type=int, action="append",
+                        help="Batch size to benchmark (repeatable, default 10k/100k/1M)")
+    args = parser.parse_args()
+    benchmark(tuple(args.count) if args.count else (10_000, 100_000, 1_000_000))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+MAC Address Spoofer - privileged helper
+A small root process, started once, that makes MAC changes for the
+unprivileged CLI and GUI over a Unix socket - no sudo, PAM or fork per
+change. One JSON object per line in each direction:
+
+    {"id": 1, "op": "set", "interface": "eth0", "mac": "02:00:00:00:00:01"}
+    {"id": 1, "ok": true, "result": {"mac": "...", "mode": "live", "ready": 0.0004}, "ms": 0.52}
+
+Ops: list, get, set (random MAC if none given), restore (one interface, or
+all the caller changed - root: all), batch (several requests in one round
+trip, run in parallel). Interface names are checked before anything runs;
+"<netns>/<interface>" only reaches /run/netns names and pid:<pid>. Every
+response carries the time the helper spent on it in "ms".
+Linux/macOS, run as root:  sudo python3 mac_helper.py   (socket group = the sudo user's group)
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import socket
+import signal
+import struct
+import argparse
+import threading
+
+import mac_netns
+
+DEFAULT_SOCKET = "/run/mac-spoofer/helper.sock"
+UCRED = struct.Struct("=iII")  # pid, uid, gid (SO_PEERCRED)
+INTERFACE_NAME = re.compile(r"[A-Za-z0-9_.:@-]{1,15}")  # IFNAMSIZ - 1, no "/" or whitespace
+PID_NAMESPACE = re.compile(r"pid:[0-9]+")
+
+
+def default_socket_path():
+    """Where the helper listens (MAC_SPOOFER_HELPER overrides)"""
+    return os.environ.get("MAC_SPOOFER_HELPER") or DEFAULT_SOCKET
+
+
+class HelperError(OSError):
+    """A request the helper refused or could not carry out"""
+
+
+class HelperClient:
+    """Requests to a running helper, one persistent connection per thread
+
+    Connections are opened on a thread's first request and reopened once
+    if the helper restarted in between, so parallel callers (fleet
+    workers, parallel restores) never queue behind each other.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_socket_path()
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.connections = []
+        self.last_ms = None  # Helper-side time of the most recent request
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.path)
+        except OSError:
+            sock.close()
+            raise
+        self.local.sock, self.local.reader = sock, sock.makefile("rb")
+        self.local.next_id = 0
+        with self.lock:
+            self.connections.append(sock)
+
+    def disconnect(self):
+        sock = getattr(self.local, "sock", None)
+        if sock is not None:
+            self.local.sock = None
+            self.local.reader.close()
+            sock.close()
+            with self.lock:
+                self.connections.remove(sock)
+
+    def request(self, op, **params):
+        """Send one request and wait for its response; returns its result
+
+        Raises HelperError if the helper answered with an error and
+        OSError if it could not be reached.
+        """
+        for attempt in range(2):
+            try:
+                if getattr(self.local, "sock", None) is None:
+                    self.connect()
+                self.local.next_id += 1
+                message = {"id": self.local.next_id, "op": op, **params}
+                self.local.sock.sendall(json.dumps(message, separators=(",", ":")).encode() + b"\n")
+                line = self.local.reader.readline()
+                if not line:
+                    raise ConnectionResetError("helper closed the connection")
+                break
+            except (BrokenPipeError, ConnectionResetError):
+                self.disconnect()
+                if attempt:
+                    raise
+        response = json.loads(line)
+        self.last_ms = response.get("ms")
+        if not response["ok"]:
+            raise HelperError(response["error"])
+        return response["result"]
+
+    def close(self):
+        """Close every thread's connection"""
+        with self.lock:
+            connections, self.connections = self.connections, []
+        for sock in connections:
+            sock.close()
+
+
+def check_interface(name):
+    """Raise ValueError unless name is a plain interface name, or one in a known namespace
+
+    Names come from unprivileged clients and end up in sysfs paths,
+    netlink requests and ip/ifconfig arguments run as root.
+    """
+    if not isinstance(name, str):
+        raise ValueError(f"invalid interface name {name!r}")
+    namespace, _, interface = name.rpartition("/")
+    if not INTERFACE_NAME.fullmatch(interface) or interface in (".", ".."):
+        raise ValueError(f"invalid interface name {name!r}")
+    # Never a path of the client's choosing: setns() would follow it as root
+    if namespace and not PID_NAMESPACE.fullmatch(namespace) and namespace not in mac_netns.list_namespaces():
+        raise ValueError(f"unknown network namespace {namespace!r}")
+
+
+def check_request(request):
+    """Raise ValueError unless every field of a request has the type its op needs
+
+    Runs before the op, so a malformed request gets an error response
+    instead of failing halfway (or taking the connection thread down).
+    """
+    import mac_core  # Not at the top: mac_core imports this module for HelperClient
+
+    if "interface" in request:
+        check_interface(request["interface"])
+    mac = request.get("mac")
+    # "" or no MAC: the helper picks a random one
+    if mac is not None and not (isinstance(mac, str) and (not mac or mac_core.MAC_ADDRESS.match(mac))):
+        raise ValueError(f"invalid MAC {mac!r}")
+    jobs = request.get("jobs")
+    if jobs is not None and (type(jobs) is not int or jobs < 1):
+        raise ValueError(f"jobs must be a positive integer, not {jobs!r}")
+    deadline = request.get("deadline")
+    if deadline is not None and (type(deadline) not in (int, float) or not deadline > 0):
+        raise ValueError(f"deadline must be a positive number of seconds, not {deadline!r}")
+    if request.get("op") == "batch":
+        requests = request.get("requests")
+        if not isinstance(requests, list) or not all(isinstance(sub, dict) for sub in requests):
+            raise ValueError("requests must be a list of JSON objects")
+
+
+def peer_uid(sock):
+    """uid of the process on the other end (None where SO_PEERCRED is missing)"""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    _, uid, _ = UCRED.unpack(sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, UCRED.size))
+    return uid
+
+
+def open_listener(path, gid):
+    """Bound, listening Unix socket that only root and group `gid` may connect to"""
+    os.makedirs(os.path.dirname(path), mode=0o755, exist_ok=True)
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except FileNotFoundError:
+        pass
+    except ConnectionRefusedError:
+        os.unlink(path)  # Left behind by a helper that died
+    else:
+        raise OSError(f"a helper is already listening on {path}")
+    finally:
+        probe.close()
+
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)  # Never reachable by others, not even between bind() and chmod()
+    try:
+        listener.bind(path)
+    finally:
+        os.umask(old_umask)
+    os.chown(path, 0, gid)
+    os.chmod(path, 0o660)
+    listener.listen(64)
+    return listener
+
+
+def serve(helper, listener):
+    """Accept connections until interrupted; one daemon thread per connection"""
+    def handle(conn):
+        uid = peer_uid(conn)
+        with conn, conn.makefile("rb") as reader:
+            for line in reader:
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("request must be a JSON object")
+                except ValueError as e:
+                    response = {"id": None, "ok": False, "error": f"bad request: {e}", "ms": 0.0}
+                else:
+                    response = helper.handle(request, uid)
+                try:
+                    conn.sendall(json.dumps(response, separators=(",", ":")).encode() + b"\n")
+                except OSError:
+                    return  # Client went away
+
+    while True:
+        conn, _ = listener.accept()
+        threading.Thread(target=handle, args=(conn,), name="helper-conn", daemon=True).start()
+
+
+def make_helper(store_path=None, metrics=None, ready_timeout=None, quiet=False):
+    """The request handler: a SpooferCore that answers list/get/set/restore/batch"""
+    import mac_core  # Not at the top: mac_core imports this module for HelperClient
+    import mac_store
+
+    owners = {}  # interface -> uid of the client that last changed it
+    owners_lock = threading.Lock()
+
+    class Helper(mac_core.SpooferCore):
+        def log(self, message):
+            if not quiet:
+                print(f"[*] {message}", flush=True)
+
+        def handle(self, request, uid=None, nested=False):
+            """Run one request dict; returns its response dict"""
+            start = time.perf_counter()
+            op = request.get("op")
+            try:
+                method = getattr(self, f"op_{op}", None) if isinstance(op, str) else None
+                if method is None or (nested and op == "batch"):
+                    raise ValueError(f"unknown op {op!r}")
+                check_request(request)
+                response = {"ok": True, "result": method(request, uid)}
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                response = {"ok": False, "error": str(e) or repr(e)}
+            response["id"] = request.get("id")
+            response["ms"] = round((time.perf_counter() - start) * 1000, 3)
+            outcome = "ok" if response["ok"] else f"failed: {response['error']}"
+            self.log(f"uid {uid} {op} {request.get('interface') or ''} {outcome} ({response['ms']:.2f} ms)")
+            return response
+
+        def op_list(self, request, uid):
+            return {name: dict(state) for name, state in self.get_interface_states().items()}
+
+        def op_get(self, request, uid):
+            interface = request["interface"]
+            return {"mac": self.get_current_mac(interface), "ip": self.get_ip_address(interface),
+                    "original": self.original_macs.get(interface)}
+
+        def op_set(self, request, uid):
+            interface = request["interface"]
+            mac = request.get("mac") or self.generate_random_mac(claim=True)
+            self.remember_original(interface)
+            with owners_lock:
+                owners[interface] = uid
+            mode, ready = self.set_mac_linux(interface, mac, quiet=True)
+            return {"mac": mac, "mode": mode, "ready": ready}
+
+        def op_restore(self, request, uid):
+            interface = request.get("interface")
+            if interface is None:
+                # Root restores everything; anyone else only what they changed through this helper
+                with owners_lock:
+                    mine = None if uid == 0 else {name for name, owner in owners.items() if owner == uid}
+                return mac_store.restore_all(self.original_macs, self.restore_one,
+                                             request.get("deadline", 10.0), request.get("jobs", 16), mine)
+            mac = self.original_macs.get(interface)
+            if mac is None:
+                raise ValueError(f"no original MAC stored for {interface}")
+            self.restore_one(interface, mac)
+            self.original_macs.forget(interface)
+            return {"mac": mac}
+
+        def op_batch(self, request, uid):
+            from concurrent.futures import ThreadPoolExecutor  # Only batches need a pool
+
+            requests = request["requests"]
+            jobs = max(1, min(request.get("jobs", 16), len(requests) or 1))
+            with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="helper-batch") as pool:
+                return list(pool.map(lambda sub: self.handle(sub, uid, nested=True), requests))
+
+    kwargs = {} if ready_timeout is None else {"ready_timeout": ready_timeout}
+    return Helper(store_path, metrics, **kwargs)
+
+
+def resolve_group(group):
+    """gid from a group name or number; default: the group of the user who ran sudo"""
+    if group is None:
+        return int(os.environ.get("SUDO_GID", 0))
+    if group.isdigit():
+        return int(group)
+    import grp
+    return grp.getgrnam(group).gr_gid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MAC Address Spoofer privileged helper")
+    parser.add_argument("--socket", default=default_socket_path(), help=f"Unix socket path ({DEFAULT_SOCKET})")
+    parser.add_argument("--group", help="Group allowed to connect (default: the sudo user's group, else root only)")
+    parser.add_argument("--store", help="Journal of original MACs (default: root's)")
+    parser.add_argument("--metrics", metavar="PATH", help="Export per-step timings (.prom or JSON lines)")
+    parser.add_argument("--ready-timeout", type=float, help="Seconds to wait for the link after a change (10)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Don't log every request")
+    args = parser.parse_args()
+
+    if os.name == "nt" or os.geteuid() != 0:
+        print("[-] The helper must run as root (Linux/macOS)")
+        return 1
+    import mac_metrics
+    helper = make_helper(args.store, mac_metrics.Metrics(args.metrics), args.ready_timeout, args.quiet)
+    monitor = helper.watch_interfaces()  # "list" is then a registry read, no dump per request
+    try:
+        gid = resolve_group(args.group)
+        listener = open_listener(args.socket, gid)
+    except (OSError, KeyError) as e:
+        print(f"[-] Cannot listen on {args.socket}: {e}")
+        return 1
+    print(f"[*] Listening on {args.socket} (root and gid {gid})", flush=True)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))  # Clean up like Ctrl+C
+    try:
+        serve(helper, listener)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        listener.close()
+        os.unlink(args.socket)
+        if monitor:
+            monitor.stop()
+        helper.metrics.flush(force=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+MAC Address Spoofer - structured log file
+Writes every log message as one JSON object to a size-rotated file from a
+background thread, so callers (the Tk thread included) never wait on disk
+"""
+
+import os
+import json
+import queue
+import logging
+import logging.handlers
+
+MAX_BYTES = 1 << 20  # Rotate once the file passes 1 MiB
+BACKUPS = 3  # Rotated files kept: <path>.1 (newest) .. <path>.3
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record: time, level, thread, message and any extra fields"""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        return json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+
+
+class JSONLog:
+    """JSON lines log file with size-based rotation, written off the caller's thread
+
+    log() only puts the record on a queue. A QueueListener thread formats
+    and appends it, rolling the file over to <path>.1 .. <path>.N once it
+    passes max_bytes. close() writes whatever is still queued.
+    """
+
+    def __init__(self, path, max_bytes=MAX_BYTES, backups=BACKUPS):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups,
+                                                       encoding="utf-8", delay=True)
+        handler.setFormatter(JSONFormatter())
+        self.path = path
+        self.queue = queue.SimpleQueue()
+        self.listener = logging.handlers.QueueListener(self.queue, handler)
+        # A private logger, so nothing else in the process writes into this file
+        self.logger = logging.getLogger(f"mac_spoofer.{id(self):x}")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.addHandler(logging.handlers.QueueHandler(self.queue))
+        self.listener.start()
+
+    def log(self, message, level=logging.INFO, **fields):
+        """Queue one message (any thread); extra keyword fields go into the JSON object"""
+        self.logger.log(level, message, extra={"fields": fields})
+
+    def close(self):
+        """Stop the writer thread once everything queued is on disk"""
+        self.listener.stop()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+MAC Address Spoofer - step timing metrics
+Every phase of a MAC change (registry lookup, adapter disable, address set,
+adapter enable, carrier regained, first IP back) is recorded in a
+histogram and exported as a Prometheus node-exporter textfile (*.prom) or
+appended to a JSON lines file (anything else)
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+import contextlib
+
+STEPS = ("registry_lookup", "adapter_disable", "address_set", "adapter_enable",
+         "carrier_regained", "first_ip")
+
+# Histogram bucket upper bounds in seconds (netlink changes land in the first few,
+# Windows adapter restarts and DHCP in the last ones)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+           1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+PREFIX = "mac_spoofer_step"
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense"""
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += seconds
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            total += count
+            yield bound, total
+
+
+class Metrics:
+    """Per-step duration histograms plus an optional export file
+
+    With a `.prom` path the whole registry is rewritten atomically (temp
+    file + rename, as node-exporter's textfile collector expects), at most
+    once per `min_interval` seconds unless flushed with force=True. Any
+    other path gets one JSON object per observation appended. Without a
+    path the histograms are only kept in memory. Export errors are passed
+    to `log` (stderr by default) once per distinct error and never raised:
+    a MAC change must not fail because its timings could not be written.
+    """
+
+    def __init__(self, path=None, min_interval=1.0, log=None):
+        self.path = path
+        self.log = log or (lambda message: print(f"[-] {message}", file=sys.stderr))
+        self.last_error = None
+        self.prometheus = bool(path) and path.endswith(".prom")
+        self.min_interval = min_interval
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()  # One writer of the export file at a time
+        self.histograms = {}
+        self.timeouts = {}
+        self.pending = []  # JSON lines not written yet
+        self.last_write = 0.0
+
+    def observe(self, step, seconds, interface=None):
+        """Record one step duration (any thread)"""
+        with self.lock:
+            self.histograms.setdefault(step, Histogram()).observe(seconds)
+            if self.path and not self.prometheus:
+                self.pending.append({"ts": round(time.time(), 3), "step": step,
+                                     "seconds": round(seconds, 6), "interface": interface})
+
+    def timeout(self, step, interface=None):
+        """Record a step that never completed (e.g. no carrier within the timeout)"""
+        with self.lock:
+            self.timeouts[step] = self.timeouts.get(step, 0) + 1
+            if self.path and not self.prometheus:
+                self.pending.append({"ts": round(time.time(), 3), "step": step,
+                                     "timeout": True, "interface": interface})
+
+    @contextlib.contextmanager
+    def time(self, step, interface=None):
+        """Context manager that observes how long its block took"""
+        start = time.perf_counter()
+        yield
+        self.observe(step, time.perf_counter() - start, interface)
+
+    def render_prometheus(self):
+        """Registry in the Prometheus text exposition format"""
+        lines = [f"# HELP {PREFIX}_duration_seconds Duration of each MAC change step.",
+                 f"# TYPE {PREFIX}_duration_seconds histogram"]
+        with self.lock:
+            # Every known step is exported, even before its first observation
+            for step in sorted(set(STEPS) | set(self.histograms)):
+                histogram = self.histograms.get(step) or Histogram()
+                for bound, total in histogram.cumulative():
+                    lines.append(f'{PREFIX}_duration_seconds_bucket{{step="{step}",le="{bound:g}"}} {total}')
+                lines.append(f'{PREFIX}_duration_seconds_bucket{{step="{step}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{PREFIX}_duration_seconds_sum{{step="{step}"}} {histogram.sum:.6f}')
+                lines.append(f'{PREFIX}_duration_seconds_count{{step="{step}"}} {histogram.count}')
+            lines += [f"# HELP {PREFIX}_timeouts_total Steps that did not complete within the timeout.",
+                      f"# TYPE {PREFIX}_timeouts_total counter"]
+            for step, count in sorted(self.timeouts.items()):
+                lines.append(f'{PREFIX}_timeouts_total{{step="{step}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def flush(self, force=False):
+        """Write what was observed so far to the export file"""
+        if not self.path:
+            return
+        with self.write_lock:
+            try:
+                self.write(force)
+            except OSError as e:
+                if str(e) != self.last_error:
+                    self.last_error = str(e)
+                    self.log(f"Could not write metrics to {self.path}: {e}")
+
+    def write(self, force):
+        """flush() without the error handling (called under write_lock)"""
+        if self.prometheus:
+            now = time.monotonic()
+            if not force and now - self.last_write < self.min_interval:
+                return
+            self.last_write = now
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            try:
+                with open(tmp, "w") as f:
+                    f.write(self.render_prometheus())
+                os.replace(tmp, self.path)
+            except OSError:
+                with contextlib.suppress(OSError):
+                    os.unlink(tmp)
+                raise
+            return
+        with self.lock:
+            pending, self.pending = self.pending, []
+        if pending:
+            # Dropped if the write fails - the histograms still have them
+            with open(self.path, "a") as f:
+                f.write("".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in pending))
+
+
+def untimed(step, interface=None):
+    """Stand-in for Metrics.time when no metrics are collected"""
+    return contextlib.nullcontext()
@@ -0,0 +1,867 @@
+#!/usr/bin/env python3
+"""
+MAC Address Spoofer - rtnetlink backend
+Talks to the Linux kernel over a NETLINK_ROUTE socket so MAC changes
+don't need to fork `ip`/`ifconfig` (or `sudo`) for every step
+Linux only - callers keep the subprocess path as a fallback
+"""
+
+import os
+import errno
+import select
+import socket
+import time
+import types
+import struct
+import platform
+import threading
+from collections import Counter
+
+import mac_metrics
+
+# Netlink message types and flags (linux/netlink.h, linux/rtnetlink.h)
+NETLINK_ROUTE = 0
+SOL_NETLINK = 270
+NETLINK_GET_STRICT_CHK = 12  # Lets dumps be filtered by the kernel (4.20+)
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+NLM_F_REQUEST = 0x01
+NLM_F_ACK = 0x04
+NLM_F_DUMP = 0x300
+
+RTM_NEWLINK = 16
+RTM_DELLINK = 17
+RTM_GETLINK = 18
+RTM_NEWADDR = 20
+RTM_DELADDR = 21
+RTM_GETADDR = 22
+RTM_NEWNEIGH = 28
+RTM_DELNEIGH = 29
+RTM_GETNEIGH = 30
+
+# Multicast group bits for bind() (legacy RTMGRP_* masks of RTNLGRP_LINK,
+# RTNLGRP_NEIGH, RTNLGRP_IPV4_IFADDR and RTNLGRP_IPV6_IFADDR)
+RTMGRP_LINK = 0x1
+RTMGRP_NEIGH = 0x4
+RTMGRP_IPV4_IFADDR = 0x10
+RTMGRP_IPV6_IFADDR = 0x100
+DEFAULT_GROUPS = RTMGRP_LINK | RTMGRP_IPV4_IFADDR | RTMGRP_IPV6_IFADDR
+
+# Link attributes (linux/if_link.h)
+IFLA_ADDRESS = 1
+IFLA_IFNAME = 3
+IFLA_OPERSTATE = 16
+IFLA_LINKINFO = 18
+IFLA_PERM_ADDRESS = 54  # Burned-in address (kernel 5.6+, physical NICs only)
+IFLA_INFO_KIND = 1  # Nested inside IFLA_LINKINFO
+
+# Address attributes (linux/if_addr.h)
+IFA_ADDRESS = 1
+IFA_LOCAL = 2
+
+# Neighbor attributes (linux/neighbour.h)
+NDA_DST = 1
+NDA_LLADDR = 2
+
+# Interface flags (linux/if.h)
+IFF_UP = 0x1
+IFF_LOOPBACK = 0x8
+IFF_LOWER_UP = 0x10000  # Carrier (RFC 2863 "lower layer up")
+
+# IFLA_OPERSTATE values (RFC 2863)
+OPERSTATES = ("unknown", "notpresent", "down", "lowerlayerdown", "testing", "dormant", "up")
+
+NLMSGHDR = struct.Struct("=IHHII")   # len, type, flags, seq, pid
+IFINFOMSG = struct.Struct("=BxHiII")  # family, type, index, flags, change
+IFADDRMSG = struct.Struct("=BBBBI")   # family, prefixlen, flags, scope, index
+NDMSG = struct.Struct("=BxxxiHBB")    # family, ifindex, state, flags, type
+RTATTR = struct.Struct("=HH")         # len, type
+NLMSGERR = struct.Struct("=i")        # error (followed by the offending header)
+
+RECV_BUFFER = 65536
+MONITOR_RCVBUF = 1 << 20  # Room for bursts when hundreds of links change at once
+SYSFS_NET = "/sys/class/net"
+
+# Whether a driver accepts an address change while the link is up
+# (IFF_LIVE_ADDR_CHANGE in the kernel, e.g. veth/bridge/macvlan/dummy).
+# Learned per driver and shared by all sockets: driver -> (changes refused
+# live in a row, monotonic time until which changes go straight to cycling).
+# A single EBUSY proves little - mac80211 answers it while scanning or
+# associating - so only CYCLE_AFTER refusals in a row skip the live
+# attempt, and only for CYCLE_FOR seconds.
+live_addr_change = {}
+LIVE_ATTEMPTS = 2  # Live tries per change before cycling the link
+LIVE_RETRY_DELAY = 0.05  # Seconds between them - transient EBUSY windows are short
+CYCLE_AFTER = 3
+CYCLE_FOR = 300.0
+
+
+def is_available():
+    """Check if an rtnetlink backend can be used on this system"""
+    return platform.system() == "Linux" and hasattr(socket, "AF_NETLINK")
+
+
+def _align(length):
+    """Round a length up to the 4-byte netlink alignment"""
+    return (length + 3) & ~3
+
+
+def pack_attr(attr_type, data):
+    """Pack a single rtattr with padding"""
+    length = RTATTR.size + len(data)
+    return RTATTR.pack(length, attr_type) + data + b"\0" * (_align(length) - length)
+
+
+def iter_messages(data):
+    """Yield (msg_type, flags, seq, body) for each netlink message in a datagram"""
+    offset = 0
+    while offset + NLMSGHDR.size <= len(data):
+        length, msg_type, flags, seq, _ = NLMSGHDR.unpack_from(data, offset)
+        if length < NLMSGHDR.size:
+            break
+        yield msg_type, flags, seq, data[offset + NLMSGHDR.size:offset + length]
+        offset += _align(length)
+
+
+def parse_attrs(data, offset=0):
+    """Parse a run of rtattrs into a {type: bytes} dict"""
+    attrs = {}
+    while offset + RTATTR.size <= len(data):
+        length, attr_type = RTATTR.unpack_from(data, offset)
+        if length < RTATTR.size:
+            break
+        # Strip NLA_F_NESTED / NLA_F_NET_BYTEORDER from the type
+        attrs[attr_type & 0x3FFF] = data[offset + RTATTR.size:offset + length]
+        offset += _align(length)
+    return attrs
+
+
+def mac_to_bytes(mac):
+    """Convert 'aa:bb:cc:dd:ee:ff' (or dash separated) to 6 raw bytes"""
+    raw = bytes.fromhex(mac.replace(':', '').replace('-', ''))
+    if len(raw) != 6:
+        raise ValueError(f"Invalid MAC address: {mac}")
+    return raw
+
+
+def bytes_to_mac(raw):
+    """Convert raw address bytes to 'aa:bb:cc:dd:ee:ff'"""
+    return ':'.join(f"{b:02x}" for b in raw)
+
+
+def read_sysfs_mac(interface):
+    """Read the current MAC straight from /sys/class/net/<if>/address"""
+    if "/" in interface or interface in ("", ".", ".."):
+        return None  # Not an interface name - never a path outside SYSFS_NET
+    try:
+        with open(os.path.join(SYSFS_NET, interface, "address")) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def parse_link(body):
+    """Decode an RTM_NEWLINK payload into a link dict"""
+    _, _, index, flags, _ = IFINFOMSG.unpack_from(body)
+    attrs = parse_attrs(body, IFINFOMSG.size)
+    operstate = attrs.get(IFLA_OPERSTATE, b"\0")[0]
+    linkinfo = parse_attrs(attrs.get(IFLA_LINKINFO, b""))
+    perm = attrs.get(IFLA_PERM_ADDRESS)
+    return {
+        "index": index,
+        "name": attrs.get(IFLA_IFNAME, b"").rstrip(b"\0").decode(),
+        "mac": bytes_to_mac(attrs[IFLA_ADDRESS]) if IFLA_ADDRESS in attrs else None,
+        "perm_mac": bytes_to_mac(perm) if perm and any(perm) else None,
+        "flags": flags,
+        "up": bool(flags & IFF_UP),
+        "carrier": bool(flags & IFF_LOWER_UP),
+        "operstate": OPERSTATES[operstate] if operstate < len(OPERSTATES) else "unknown",
+        "info_kind": linkinfo.get(IFLA_INFO_KIND, b"").rstrip(b"\0").decode() or None,
+    }
+
+
+def classify_link(link, sysfs=True):
+    """physical, wireless, bridge, vlan or virtual - from the link kind, else sysfs
+
+    Pass sysfs=False for links in another network namespace: our /sys
+    shows our own interfaces, so those are told apart by flags only.
+    """
+    if link["info_kind"] in ("bridge", "vlan"):
+        return link["info_kind"]
+    if link["info_kind"]:
+        return "virtual"  # veth, dummy, bond, macvlan, tun, wireguard...
+    if not sysfs:
+        return "virtual" if link["flags"] & IFF_LOOPBACK else "physical"
+    path = os.path.join(SYSFS_NET, link["name"])
+    if os.path.exists(os.path.join(path, "wireless")) or os.path.exists(os.path.join(path, "phy80211")):
+        return "wireless"
+    if os.path.exists(os.path.join(path, "device")):
+        return "physical"
+    return "virtual"  # Loopback and other device-less links
+
+
+def driver_key(interface, kind=None):
+    """Name the driver behind an interface (sysfs driver, else link kind)"""
+    try:
+        return os.path.basename(os.readlink(os.path.join(SYSFS_NET, interface, "device", "driver")))
+    except OSError:
+        return kind or "unknown"
+
+
+def parse_addr(body):
+    """Decode an RTM_NEWADDR payload into (index, family, address, prefixlen)"""
+    family, prefixlen, _, _, index = IFADDRMSG.unpack_from(body)
+    attrs = parse_attrs(body, IFADDRMSG.size)
+    # IFA_LOCAL is the interface's own address on point-to-point links
+    raw = attrs.get(IFA_LOCAL) or attrs.get(IFA_ADDRESS)
+    if raw is None:
+        return index, family, None, prefixlen
+    return index, family, socket.inet_ntop(family, raw), prefixlen
+
+
+def parse_neigh(body):
+    """Decode an RTM_NEWNEIGH payload into (index, family, dst, mac)"""
+    family, index, _, _, _ = NDMSG.unpack_from(body)
+    attrs = parse_attrs(body, NDMSG.size)
+    dst = attrs.get(NDA_DST)
+    if dst is not None and family in (socket.AF_INET, socket.AF_INET6):
+        dst = socket.inet_ntop(family, dst)
+    lladdr = attrs.get(NDA_LLADDR)
+    # Incomplete/failed entries have no link-layer address yet
+    mac = bytes_to_mac(lladdr) if lladdr is not None and len(lladdr) == 6 else None
+    return index, family, dst, mac
+
+
+class RTNetlink:
+    """Minimal rtnetlink client - one socket, reused for every request
+
+    Requests are serialized with a lock so worker threads and the UI
+    thread can share one client without stealing each other's replies.
+    A socket stays in the network namespace it was created in; clients
+    for other namespaces (see mac_netns) carry its path in `namespace`.
+    """
+
+    def __init__(self, namespace=None):
+        self.namespace = namespace  # None = this process's namespace
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+        try:
+            self.sock.setsockopt(SOL_NETLINK, NETLINK_GET_STRICT_CHK, 1)
+        except OSError:
+            pass  # Older kernel - filtered dumps just return everything
+        self.sock.bind((0, 0))
+        self.seq = 0
+        self.lock = threading.Lock()
+
+    def close(self):
+        """Close the netlink socket"""
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def request(self, msg_type, payload, flags=0):
+        """Send a request and collect the replies until ACK/DONE
+
+        Returns a list of (msg_type, payload) tuples. Kernel errors are
+        raised as OSError with the matching errno.
+        """
+        with self.lock:
+            return self._request(msg_type, payload, flags)
+
+    def _request(self, msg_type, payload, flags):
+        self.seq += 1
+        seq = self.seq
+        flags |= NLM_F_REQUEST | NLM_F_ACK
+        header = NLMSGHDR.pack(NLMSGHDR.size + len(payload), msg_type, flags, seq, 0)
+        self.sock.sendto(header + payload, (0, 0))
+
+        replies = []
+        while True:
+            for reply_type, _, reply_seq, body in iter_messages(self.sock.recv(RECV_BUFFER)):
+                if reply_seq != seq:
+                    continue  # Stale reply from an earlier, interrupted request
+                if reply_type == NLMSG_ERROR:
+                    error, = NLMSGERR.unpack_from(body)
+                    if error:
+                        raise OSError(-error, os.strerror(-error))
+                    return replies  # Plain ACK
+                if reply_type == NLMSG_DONE:
+                    return replies
+                replies.append((reply_type, body))
+
+    def link_header(self, interface, flags=0, change=0):
+        """ifinfomsg selecting one link
+
+        if_nametoindex() only sees this process's namespace, so links in
+        another namespace are selected by IFLA_IFNAME and looked up by
+        the kernel instead.
+        """
+        if self.namespace is None:
+            return IFINFOMSG.pack(socket.AF_UNSPEC, 0, socket.if_nametoindex(interface), flags, change)
+        return (IFINFOMSG.pack(socket.AF_UNSPEC, 0, 0, flags, change)
+                + pack_attr(IFLA_IFNAME, interface.encode() + b"\0"))
+
+    def set_link(self, interface, address=None, up=None):
+        """Change link address and/or administrative state in one request"""
+        flags = change = 0
+        if up is not None:
+            change = IFF_UP
+            flags = IFF_UP if up else 0
+        payload = self.link_header(interface, flags, change)
+        if address is not None:
+            payload += pack_attr(IFLA_ADDRESS, mac_to_bytes(address))
+        self.request(RTM_NEWLINK, payload)
+
+    def get_link(self, interface):
+        """Return the link dict of a single interface"""
+        for msg_type, body in self.request(RTM_GETLINK, self.link_header(interface)):
+            if msg_type == RTM_NEWLINK:
+                return parse_link(body)
+        raise OSError(errno.ENODEV, os.strerror(errno.ENODEV), interface)
+
+    def dump_links(self):
+        """Return every link in one RTM_GETLINK dump"""
+        payload = IFINFOMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0)
+        return [parse_link(body) for msg_type, body in self.request(RTM_GETLINK, payload, NLM_F_DUMP)
+                if msg_type == RTM_NEWLINK]
+
+    def dump_neighbors(self):
+        """Return (index, family, dst, mac) for every ARP/NDP entry in one dump"""
+        payload = NDMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0)
+        return [parse_neigh(body) for msg_type, body in self.request(RTM_GETNEIGH, payload, NLM_F_DUMP)
+                if msg_type == RTM_NEWNEIGH]
+
+    def dump_addresses(self, family=socket.AF_UNSPEC, index=0):
+        """Return {ifindex: {"ipv4": [...], "ipv6": [...]}} from one RTM_GETADDR dump
+
+        A non-zero index limits the dump to that interface where the
+        kernel supports strict checking (otherwise all are returned).
+        """
+        payload = IFADDRMSG.pack(family, 0, 0, 0, index)
+        addresses = {}
+        for msg_type, body in self.request(RTM_GETADDR, payload, NLM_F_DUMP):
+            if msg_type != RTM_NEWADDR:
+                continue
+            index, addr_family, address, _ = parse_addr(body)
+            if address is None:
+                continue
+            key = "ipv4" if addr_family == socket.AF_INET else "ipv6"
+            addresses.setdefault(index, {"ipv4": [], "ipv6": []})[key].append(address)
+        return addresses
+
+    def snapshot(self):
+        """Return the state of every interface at once, keyed by name
+
+        Two dumps (links + addresses) answer MAC, state, kind and IP
+        queries for all interfaces without spawning a single process.
+        """
+        addresses = self.dump_addresses()
+        interfaces = {}
+        for link in self.dump_links():
+            link_addresses = addresses.get(link["index"], {"ipv4": [], "ipv6": []})
+            link.update(link_addresses)
+            link["kind"] = classify_link(link, sysfs=self.namespace is None)
+            interfaces[link["name"]] = link
+        return interfaces
+
+    def change_mac(self, interface, new_mac, metrics=None):
+        """Change MAC address with as little disruption as the driver allows
+
+        A link that is down just gets the new address. A link that is up
+        gets an RTM_NEWLINK with the address, retried once on EBUSY;
+        if it is still refused the link goes down -> set address -> up.
+        Drivers that refuse CYCLE_AFTER changes in a row are cycled
+        straight away for the next CYCLE_FOR seconds (see live_addr_change).
+        Returns "live", "down" or "cycle" to say which path was taken.
+        Steps are timed into `metrics` (a mac_metrics.Metrics) if given.
+        """
+        timed = metrics.time if metrics else mac_metrics.untimed
+        link = self.get_link(interface)
+        if not link["up"]:
+            with timed("address_set", interface):
+                self.set_link(interface, address=new_mac)
+            return "down"
+
+        if self.namespace is None:
+            driver = driver_key(interface, link["info_kind"])
+        else:
+            driver = link["info_kind"] or "unknown"  # Our sysfs can't see into other namespaces
+        refused, cycle_until = live_addr_change.get(driver, (0, 0.0))
+        if time.monotonic() >= cycle_until:
+            for attempt in range(LIVE_ATTEMPTS):
+                if attempt:
+                    time.sleep(LIVE_RETRY_DELAY)
+                try:
+                    with timed("address_set", interface):
+                        self.set_link(interface, address=new_mac)
+                    live_addr_change[driver] = (0, 0.0)
+                    return "live"
+                except OSError as e:
+                    if e.errno != errno.EBUSY:
+                        raise
+            refused += 1
+            live_addr_change[driver] = (refused, time.monotonic() + CYCLE_FOR if refused >= CYCLE_AFTER else 0.0)
+
+        with timed("adapter_disable", interface):
+            self.set_link(interface, up=False)
+        try:
+            with timed("address_set", interface):
+                self.set_link(interface, address=new_mac)
+        finally:
+            # Always try to bring the link back, even if the address was rejected
+            with timed("adapter_enable", interface):
+                self.set_link(interface, up=True)
+        return "cycle"
+
+    def readiness(self, interface):
+        """(link usable, address family to wait for) right now
+
+        The family is "ipv4" if the interface has an IPv4 address, else
+        "ipv6" if it has an IPv6 one, else None.
+        """
+        link = self.get_link(interface)
+        addresses = self.dump_addresses(index=link["index"]).get(link["index"], {})
+        family = "ipv4" if addresses.get("ipv4") else "ipv6" if addresses.get("ipv6") else None
+        return link_usable(link), family
+
+
+def link_usable(link):
+    """Up, with carrier and an operstate that lets traffic through"""
+    return link["up"] and link["carrier"] and link["operstate"] in ("up", "unknown")
+
+
+def parse_event(msg_type, body):
+    """Turn a multicast notification into an event dict (None if not interesting)"""
+    if msg_type in (RTM_NEWLINK, RTM_DELLINK):
+        event = parse_link(body)
+        event["kind"] = "link"
+        event["action"] = "new" if msg_type == RTM_NEWLINK else "del"
+        return event
+    if msg_type in (RTM_NEWADDR, RTM_DELADDR):
+        index, family, address, prefixlen = parse_addr(body)
+        try:
+            name = socket.if_indextoname(index)
+        except OSError:
+            name = None  # Link already gone
+        return {
+            "kind": "addr",
+            "action": "new" if msg_type == RTM_NEWADDR else "del",
+            "index": index,
+            "name": name,
+            "family": "ipv4" if family == socket.AF_INET else "ipv6",
+            "address": address,
+            "prefixlen": prefixlen,
+        }
+    if msg_type in (RTM_NEWNEIGH, RTM_DELNEIGH):
+        index, family, dst, mac = parse_neigh(body)
+        return {
+            "kind": "neigh",
+            "action": "new" if msg_type == RTM_NEWNEIGH else "del",
+            "index": index,
+            "name": None,  # Not resolved - neighbor churn can be heavy
+            "family": family,
+            "dst": dst,
+            "mac": mac,
+        }
+    return None
+
+
+class UsedMACs:
+    """In-memory set of MACs already in use on this host and its segment
+
+    Filled from one link dump and one ARP/NDP neighbor dump, then kept
+    current by feeding NetlinkMonitor events (link and neigh groups) to
+    apply(). Checking a candidate is a dict lookup, so it stays O(1)
+    with tens of thousands of neighbors.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.links = {}         # ifindex -> mac
+        self.neighbors = {}     # (ifindex, family, dst) -> mac
+        self.refs = Counter()   # mac -> how many links/neighbors use it
+
+    def load(self, netlink):
+        """(Re)build the snapshot from a link dump and a neighbor dump"""
+        links = {link["index"]: link["mac"] for link in netlink.dump_links() if link["mac"]}
+        neighbors = {(index, family, dst): mac for index, family, dst, mac in netlink.dump_neighbors() if mac}
+        refs = Counter(links.values())
+        refs.update(neighbors.values())
+        with self.lock:
+            self.links, self.neighbors, self.refs = links, neighbors, refs
+        return self
+
+    def _set(self, table, key, mac):
+        old = table.pop(key, None)
+        if old is not None:
+            self.refs[old] -= 1
+            if self.refs[old] <= 0:
+                del self.refs[old]
+        if mac is not None:
+            table[key] = mac
+            self.refs[mac] += 1
+
+    def apply(self, event):
+        """Update the snapshot from one monitor event (any thread)"""
+        with self.lock:
+            if event["kind"] == "link":
+                self._set(self.links, event["index"], event["mac"] if event["action"] == "new" else None)
+            elif event["kind"] == "neigh":
+                key = (event["index"], event["family"], event["dst"])
+                self._set(self.neighbors, key, event["mac"] if event["action"] == "new" else None)
+
+    def claim(self, mac):
+        """Atomically mark an unused MAC as taken; False if it was in use
+
+        Claims are held until release() - they keep concurrent pickers
+        (e.g. a fleet run) from handing the same address to two interfaces.
+        """
+        mac = mac.lower().replace('-', ':')
+        with self.lock:
+            if mac in self.refs:
+                return False
+            self.refs[mac] += 1
+            return True
+
+    def release(self, mac):
+        """Drop a claim() once link events track the address themselves"""
+        mac = mac.lower().replace('-', ':')
+        with self.lock:
+            self.refs[mac] -= 1
+            if self.refs[mac] <= 0:
+                del self.refs[mac]
+
+    def __contains__(self, mac):
+        return mac.lower().replace('-', ':') in self.refs
+
+    def __len__(self):
+        return len(self.refs)
+
+
+class InterfaceRegistry:
+    """Index, name, kind, MAC, operstate and addresses of every interface
+
+    Filled by one snapshot (a link dump and an address dump), then kept
+    current by feeding NetlinkMonitor link/address events to apply().
+    snapshot() hands out a read-only {name: entry} view that is rebuilt
+    only after something changed, so listing thousands of veths is a
+    plain read. Entries are never modified in place - a change replaces
+    the entry, so views already handed out stay consistent.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.load_lock = threading.Lock()  # One dump at a time
+        self.links = {}       # ifindex -> entry
+        self.view = None      # Cached {name: entry} view, None after a change
+        self.loaded = False
+        self.backlog = None   # Events that arrived during load(), replayed onto its result
+        self.live = False     # A monitor feeds apply(); otherwise read() re-dumps every time
+        self.sysfs = True     # Our sysfs describes these links (False for another namespace)
+
+    def load(self, netlink):
+        """(Re)build the registry from one snapshot"""
+        with self.load_lock:
+            self.sysfs = netlink.namespace is None
+            with self.lock:
+                self.backlog = []
+            try:
+                links = {link["index"]: link for link in netlink.snapshot().values()}
+            except BaseException:
+                with self.lock:
+                    self.backlog = None
+                raise
+            with self.lock:
+                backlog, self.backlog = self.backlog, None
+                self.links = links
+                # Changes that raced the dump; re-applying what it already saw is harmless
+                for event in backlog:
+                    self._apply(event)
+                self.view = None
+                self.loaded = True
+        return self
+
+    def _apply(self, event):
+        index = event["index"]
+        old = self.links.get(index)
+        if event["kind"] == "link":
+            if event["action"] == "del":
+                if self.links.pop(index, None) is None:
+                    return
+            else:
+                entry = {key: value for key, value in event.items() if key not in ("kind", "action")}
+                entry["ipv4"], entry["ipv6"] = (old["ipv4"], old["ipv6"]) if old else ([], [])
+                entry["kind"] = (old["kind"] if old and old["name"] == entry["name"]
+                                 else classify_link(entry, sysfs=self.sysfs))
+                self.links[index] = entry
+        elif event["kind"] == "addr":
+            if old is None or event["address"] is None:
+                return
+            addresses = old[event["family"]]
+            if event["action"] == "new":
+                if event["address"] in addresses:
+                    return
+                addresses = addresses + [event["address"]]
+            else:
+                if event["address"] not in addresses:
+                    return
+                addresses = [address for address in addresses if address != event["address"]]
+            self.links[index] = {**old, event["family"]: addresses}
+        else:
+            return
+        self.view = None
+
+    def apply(self, event):
+        """Update from one monitor event (any thread); "resync" needs a fresh load() instead"""
+        with self.lock:
+            if self.backlog is not None:
+                self.backlog.append(event)
+            self._apply(event)
+
+    def snapshot(self):
+        """Read-only {name: entry} of every interface"""
+        with self.lock:
+            if self.view is None:
+                self.view = types.MappingProxyType({entry["name"]: entry for entry in self.links.values()})
+            return self.view
+
+    def read(self, netlink):
+        """snapshot(), loading it first unless a monitor keeps the registry current"""
+        if not (self.live and self.loaded):
+            self.load(netlink)
+        return self.snapshot()
+
+
+class SocketMonitor(threading.Thread):
+    """Reader thread for a subscribed netlink socket, stoppable from any thread
+
+    callback(event) is called from the reader thread for every event
+    that events() makes of a received datagram; when the kernel drops
+    notifications (socket overrun) it gets resync_event() instead. The
+    thread sleeps in select() on the socket and a wake-up pipe, so an
+    idle system costs no wakeups at all. The socket is closed when the
+    thread ends.
+    """
+
+    def __init__(self, name, callback, sock):
+        super().__init__(name=name, daemon=True)
+        self.callback = callback
+        self.sock = sock
+        self._wake_read, self._wake_write = os.pipe()
+        self._stopping = False
+        self._closed = False
+        self._close_lock = threading.Lock()  # stop() never writes to a pipe run() already closed
+
+    def stop(self):
+        """Ask the reader thread to exit (returns immediately)"""
+        with self._close_lock:
+            if not self._stopping and not self._closed:
+                self._stopping = True
+                os.write(self._wake_write, b"x")
+
+    def events(self, data):
+        """Event dicts for one received datagram (subclasses decode their protocol)"""
+        return ()
+
+    def resync_event(self):
+        """What callback gets when notifications were lost"""
+        return {"kind": "resync", "action": "resync", "index": 0, "name": None}
+
+    def run(self):
+        try:
+            while not self._stopping:
+                ready, _, _ = select.select([self.sock, self._wake_read], [], [])
+                if self._wake_read in ready:
+                    break
+                try:
+                    data = self.sock.recv(RECV_BUFFER)
+                except OSError as e:
+                    if e.errno == errno.ENOBUFS:
+                        self.callback(self.resync_event())
+                        continue
+                    raise
+                for event in self.events(data):
+                    self.callback(event)
+        finally:
+            with self._close_lock:
+                self._closed = True
+                self.sock.close()
+                os.close(self._wake_read)
+                os.close(self._wake_write)
+
+
+class NetlinkMonitor(SocketMonitor):
+    """Background reader for rtnetlink link/address notifications
+
+    callback(event) is called from the reader thread for each change.
+    Events are dicts with "kind" ("link", "addr" or "resync"), "action"
+    and the interface "index"/"name". A "resync" event means the kernel
+    dropped notifications (socket overrun) and callers should re-read
+    their state with a fresh snapshot.
+    """
+
+    def __init__(self, callback, groups=DEFAULT_GROUPS):
+        sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, MONITOR_RCVBUF)
+        sock.bind((0, groups))
+        super().__init__("netlink-monitor", callback, sock)
+
+    def events(self, data):
+        for msg_type, _, _, body in iter_messages(data):
+            event = parse_event(msg_type, body)
+            if event is not None:
+                yield event
+
+
+class LinkWaiter:
+    """Waits for a link to be usable again, driven by netlink notifications
+
+    Create it *before* changing the link: it subscribes to link and
+    address notifications right away, so nothing that happens during the
+    change is missed. wait() checks the current state once, then sleeps
+    in select() until a notification says the link is up with carrier
+    and, optionally, has an address of the wanted family again.
+    """
+
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, MONITOR_RCVBUF)
+        self.sock.bind((0, DEFAULT_GROUPS))
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def wait(self, netlink, interface, family=None, timeout=10.0, cancel=None):
+        """Return (seconds until usable, seconds until an address is back)
+
+        `family` is "ipv4", "ipv6" or None for carrier only. Either time
+        is None if it did not happen within `timeout` seconds (or before
+        the optional threading.Event `cancel` was set).
+        """
+        start = time.perf_counter()
+        index = netlink.get_link(interface)["index"]  # Via netlink - the link may be in another namespace
+        carrier = address = None
+
+        def check_now():
+            nonlocal carrier, address
+            elapsed = time.perf_counter() - start
+            if carrier is None and link_usable(netlink.get_link(interface)):
+                carrier = elapsed
+            if family and address is None and netlink.dump_addresses(index=index).get(index, {}).get(family):
+                address = elapsed
+
+        check_now()
+        while carrier is None or (family and address is None):
+            remaining = start + timeout - time.perf_counter()
+            if remaining <= 0 or (cancel is not None and cancel.is_set()):
+                break
+            # Wake up now and then to notice a cancel
+            ready, _, _ = select.select([self.sock], [], [], min(remaining, 0.1) if cancel else remaining)
+            if not ready:
+                continue
+            try:
+                data = self.sock.recv(RECV_BUFFER)
+            except OSError as e:
+                if e.errno != errno.ENOBUFS:
+                    raise
+                check_now()  # Notifications were dropped - look at the state instead
+                continue
+            elapsed = time.perf_counter() - start
+            for msg_type, _, _, body in iter_messages(data):
+                event = parse_event(msg_type, body)
+                if event is None or event["index"] != index or event["action"] != "new":
+                    continue
+                if event["kind"] == "link" and carrier is None and link_usable(event):
+                    carrier = elapsed
+                elif event["kind"] == "addr" and address is None and event["family"] == family:
+                    address = elapsed
+        return carrier, address
+
+
+def change_and_wait(netlink, interface, new_mac, timeout=10.0, metrics=None, cancel=None,
+                    open_waiter=LinkWaiter):
+    """change_mac, then wait until the link is usable again
+
+    Only what the interface had before the change is waited for: carrier
+    if it was usable, plus an address of the family it had. Returns
+    (mode, seconds from the start of the change until ready); the time is
+    None when there was nothing to wait for, timeout is 0, or the link
+    did not come back in time. Recovery steps are recorded in `metrics`.
+    open_waiter() must return a LinkWaiter in netlink's namespace.
+    """
+    usable, family = netlink.readiness(interface) if timeout else (False, None)
+    if not usable:
+        return netlink.change_mac(interface, new_mac, metrics), None
+
+    with open_waiter() as waiter:
+        start = time.perf_counter()
+        mode = netlink.change_mac(interface, new_mac, metrics)
+        changed = time.perf_counter() - start
+        carrier, address = waiter.wait(netlink, interface, family, timeout, cancel)
+
+    if metrics:
+        for step, seconds, wanted in (("carrier_regained", carrier, True), ("first_ip", address, family)):
+            if not wanted:
+                continue
+            if seconds is None:
+                metrics.timeout(step, interface)
+            else:
+                metrics.observe(step, seconds, interface)
+    if carrier is None or (family and address is None):
+        return mode, None
+    return mode, changed + max(carrier, address or 0.0)
+
+
+def start_monitor(callback, groups=DEFAULT_GROUPS):
+    """Start a NetlinkMonitor, or return None if netlink can't be used"""
+    if not is_available():
+        return None
+    try:
+        monitor = NetlinkMonitor(callback, groups)
+    except OSError:
+        return None
+    monitor.start()
+    return monitor
+
+
+def read_interfaces(netlink=None):
+    """Snapshot every interface, using a short-lived socket if none is given"""
+    if netlink is not None:
+        return netlink.snapshot()
+    with RTNetlink() as nl:
+        return nl.snapshot()
+
+
+def pick_unused_mac(generate, used, claim=False, attempts=32):
+    """Call generate() until it returns a MAC that is not in `used`
+
+    With claim=True the MAC is also reserved in `used`, so concurrent
+    callers never get the same one. Raises ValueError if every attempt
+    collided (e.g. a tiny prefix space that is already full).
+    """
+    for _ in range(attempts):
+        mac = generate()
+        if used is None or (used.claim(mac) if claim else mac not in used):
+            return mac
+    raise ValueError(f"No unused MAC found in {attempts} attempts")
+
+
+def open_backend():
+    """Return a connected RTNetlink client, or None if netlink can't be used"""
+    if not is_available():
+        return None
+    try:
+        return RTNetlink()
+    except OSError:
+        return None
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+MAC Address Spoofer - network namespaces
+Lists, reads and changes MACs inside other network namespaces
+(/run/netns/<name>, /proc/<pid>/ns/net) without `ip netns exec`: a netlink
+socket stays in the namespace it was created in, so each namespace gets one
+RTNetlink client, opened by a short-lived thread that setns()es into it,
+then kept in a pool and used from any thread
+Linux only - interfaces in a namespace are named "<netns>/<interface>"
+"""
+
+import os
+import threading
+
+import mac_netlink
+
+CLONE_NEWNET = 0x40000000
+NETNS_RUN_DIR = "/run/netns"  # Where `ip netns add` pins named namespaces
+SELF_NETNS = "/proc/self/ns/net"
+
+
+def setns(fd):
+    """Move the calling thread into the network namespace open at fd"""
+    if hasattr(os, "setns"):  # Python 3.12+
+        os.setns(fd, CLONE_NEWNET)
+        return
+    import ctypes  # Older Pythons: straight to libc
+    libc = ctypes.CDLL(None, use_errno=True)
+    if libc.setns(fd, CLONE_NEWNET) != 0:
+        err = ctypes.get_errno()
+        raise OSError(err, os.strerror(err))
+
+
+def in_namespace(path, factory):
+    """Return factory() called on a throwaway thread inside the namespace at path
+
+    setns() only moves the calling thread, and sockets created there keep
+    that namespace - so the result works from any thread while neither
+    the caller nor any pooled thread ever changes namespace.
+    """
+    outcome = {}
+
+    def run():
+        try:
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                setns(fd)
+            finally:
+                os.close(fd)
+            outcome["value"] = factory()
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=run, name="netns-enter", daemon=True)
+    thread.start()
+    thread.join()
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["value"]
+
+
+def namespace_path(namespace):
+    """Path of a namespace given as a name in /run/netns, "pid:<pid>" or an absolute path"""
+    if namespace.startswith("/"):
+        return namespace
+    if namespace.startswith("pid:"):
+        return f"/proc/{namespace[4:]}/ns/net"
+    return os.path.join(NETNS_RUN_DIR, namespace)
+
+
+def namespace_id(path):
+    """(device, inode) identifying the namespace behind a path"""
+    st = os.stat(path)
+    return st.st_dev, st.st_ino
+
+
+def list_namespaces(pids=False):
+    """Names of every named namespace, plus "pid:<pid>" ones with pids=True
+
+    A process namespace is listed once, under the first process found in
+    it, and only if it is neither ours nor already pinned under a name.
+    """
+    names = []
+    seen = set()
+    try:
+        entries = sorted(os.listdir(NETNS_RUN_DIR))
+    except OSError:
+        entries = []
+    for name in entries:
+        try:
+            seen.add(namespace_id(os.path.join(NETNS_RUN_DIR, name)))
+        except OSError:
+            continue  # Stale mount point
+        names.append(name)
+    if pids:
+        try:
+            seen.add(namespace_id(SELF_NETNS))
+        except OSError:
+            pass
+        for pid in sorted((entry for entry in os.listdir("/proc") if entry.isdigit()), key=int):
+            try:
+                ident = namespace_id(f"/proc/{pid}/ns/net")
+            except OSError:
+                continue  # Exited, or not ours to look at
+            if ident not in seen:
+                seen.add(ident)
+                names.append(f"pid:{pid}")
+    return names
+
+
+class NamespacePool:
+    """One RTNetlink client per namespace, opened on first use and then reused
+
+    Clients serialize their own requests, so any number of threads can
+    share them. A client is reopened if the path now names a different
+    namespace (deleted and re-created, or the process exited and its pid
+    was reused).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clients = {}  # namespace -> (RTNetlink, namespace_id)
+
+    def get(self, namespace):
+        """Client for a namespace (see namespace_path for the accepted forms)"""
+        path = namespace_path(namespace)
+        ident = namespace_id(path)
+        with self.lock:
+            entry = self.clients.get(namespace)
+        if entry is not None and entry[1] == ident:
+            return entry[0]
+        client = in_namespace(path, lambda: mac_netlink.RTNetlink(path))
+        with self.lock:
+            current = self.clients.get(namespace)
+            if current is not None and current[1] == ident:
+                client.close()  # Another thread opened it meanwhile
+                return current[0]
+            self.clients[namespace] = (client, ident)
+        if current is not None:
+            current[0].close()
+        return client
+
+    def waiter(self, namespace):
+        """A LinkWaiter subscribed to the namespace's link/address notifications"""
+        return in_namespace(namespace_path(namespace), mac_netlink.LinkWaiter)
+
+    def map(self, func, namespaces, jobs=16):
+        """Call func(namespace, client) for every namespace, `jobs` at a time
+
+        Returns {namespace: (result, error)} in input order; error is a
+        message (and result None) where opening or func failed.
+        """
+        from concurrent.futures import ThreadPoolExecutor  # Only fan-out needs a pool
+
+        def run(namespace):
+            try:
+                return func(namespace, self.get(namespace)), None
+            except (OSError, ValueError) as e:
+                return None, str(e)
+
+        with ThreadPoolExecutor(max_workers=max(1, jobs), thread_name_prefix="netns") as executor:
+            return dict(zip(namespaces, executor.map(run, namespaces)))
+
+    def close(self):
+        """Close every pooled client"""
+        with self.lock:
+            clients, self.clients = self.clients, {}
+        for client, _ in clients.values():
+            client.close()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+MAC Address Spoofer - Wi-Fi mode
+Listens for nl80211 notifications (disconnect, scan done, connect) and
+gives a station interface a fresh MAC in the gap where it is not
+associated and not scanning, so randomizing never costs an extra
+disconnect. Swaps are live address changes only: where mac80211 says the
+interface is busy (associating, scanning), the window is skipped instead
+of cycling the link. Every swap records how long it held the interface
+and how much of that overlapped the next scan or association attempt
+Linux only (cfg80211 drivers; test locally with mac80211_hwsim, see
+`mac_benchmark.py --wifi`)
+"""
+
+import os
+import errno
+import queue
+import socket
+import struct
+import threading
+import time
+
+import mac_netlink
+
+# Generic netlink (linux/netlink.h, linux/genetlink.h)
+NETLINK_GENERIC = 16
+NETLINK_ADD_MEMBERSHIP = 1
+GENL_ID_CTRL = 0x10
+CTRL_CMD_GETFAMILY = 3
+CTRL_ATTR_FAMILY_ID = 1
+CTRL_ATTR_FAMILY_NAME = 2
+CTRL_ATTR_MCAST_GROUPS = 7
+CTRL_ATTR_MCAST_GRP_NAME = 1
+CTRL_ATTR_MCAST_GRP_ID = 2
+GENLMSGHDR = struct.Struct("=BBH")  # cmd, version, reserved
+
+# nl80211 commands seen as notifications (linux/nl80211.h)
+NL80211_CMD_TRIGGER_SCAN = 33
+NL80211_CMD_NEW_SCAN_RESULTS = 34
+NL80211_CMD_SCAN_ABORTED = 35
+NL80211_CMD_AUTHENTICATE = 37
+NL80211_CMD_ASSOCIATE = 38
+NL80211_CMD_CONNECT = 46
+NL80211_CMD_ROAM = 47
+NL80211_CMD_DISCONNECT = 48
+NL80211_ATTR_IFINDEX = 3
+NL80211_ATTR_STATUS_CODE = 72
+
+ACTIONS = {
+    NL80211_CMD_TRIGGER_SCAN: "scan_start",
+    NL80211_CMD_NEW_SCAN_RESULTS: "scan_done",
+    NL80211_CMD_SCAN_ABORTED: "scan_aborted",
+    NL80211_CMD_AUTHENTICATE: "auth",
+    NL80211_CMD_ASSOCIATE: "assoc",
+    NL80211_CMD_CONNECT: "connect",
+    NL80211_CMD_ROAM: "roam",
+    NL80211_CMD_DISCONNECT: "disconnect",
+}
+GROUPS = ("mlme", "scan")  # Association and scan notifications
+ATTEMPTS = ("scan_start", "auth", "assoc", "connect")  # The station trying to (re)join
+
+
+def resolve_family(name):
+    """(family id, {multicast group name: id}) of a generic netlink family
+
+    Raises OSError (ENOENT) if the family is not registered, e.g. no
+    cfg80211 loaded.
+    """
+    with socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_GENERIC) as sock:
+        sock.bind((0, 0))
+        payload = GENLMSGHDR.pack(CTRL_CMD_GETFAMILY, 1, 0) + mac_netlink.pack_attr(
+            CTRL_ATTR_FAMILY_NAME, name.encode() + b"\0")
+        flags = mac_netlink.NLM_F_REQUEST | mac_netlink.NLM_F_ACK
+        sock.send(mac_netlink.NLMSGHDR.pack(mac_netlink.NLMSGHDR.size + len(payload), GENL_ID_CTRL,
+                                            flags, 1, 0) + payload)
+        family = None
+        while True:
+            for msg_type, _, _, body in mac_netlink.iter_messages(sock.recv(mac_netlink.RECV_BUFFER)):
+                if msg_type == mac_netlink.NLMSG_ERROR:
+                    error, = mac_netlink.NLMSGERR.unpack_from(body)
+                    if error:
+                        raise OSError(-error, f"generic netlink family {name}: {os.strerror(-error)}")
+                    if family is None:
+                        raise OSError(errno.ENOENT, f"generic netlink family {name} not found")
+                    return family
+                if msg_type == GENL_ID_CTRL:
+                    attrs = mac_netlink.parse_attrs(body, GENLMSGHDR.size)
+                    groups = {}
+                    for group in mac_netlink.parse_attrs(attrs.get(CTRL_ATTR_MCAST_GROUPS, b"")).values():
+                        group = mac_netlink.parse_attrs(group)
+                        groups[group[CTRL_ATTR_MCAST_GRP_NAME].rstrip(b"\0").decode()] = \
+                            struct.unpack("=I", group[CTRL_ATTR_MCAST_GRP_ID])[0]
+                    family = struct.unpack("=H", attrs[CTRL_ATTR_FAMILY_ID])[0], groups
+
+
+def parse_event(family_id, msg_type, body, stamp):
+    """Turn an nl80211 notification into an event dict (None if not interesting)"""
+    if msg_type != family_id or len(body) < GENLMSGHDR.size:
+        return None
+    action = ACTIONS.get(body[0])
+    if action is None:
+        return None
+    attrs = mac_netlink.parse_attrs(body, GENLMSGHDR.size)
+    index = attrs.get(NL80211_ATTR_IFINDEX)
+    status = attrs.get(NL80211_ATTR_STATUS_CODE)
+    return {
+        "kind": "wifi",
+        "action": action,
+        "index": struct.unpack("=I", index)[0] if index else 0,
+        "status": struct.unpack("=H", status)[0] if status else 0,
+        "time": stamp,  # time.time() when the datagram was read
+    }
+
+
+class WifiMonitor(mac_netlink.SocketMonitor):
+    """Background reader for nl80211 association and scan notifications
+
+    Same shape as mac_netlink.NetlinkMonitor: callback(event) runs on the
+    reader thread and a "resync" event means notifications were dropped.
+    """
+
+    def __init__(self, callback, groups=GROUPS):
+        self.family, available = resolve_family("nl80211")
+        sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_GENERIC)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, mac_netlink.MONITOR_RCVBUF)
+        sock.bind((0, 0))
+        for group in groups:
+            if group in available:
+                sock.setsockopt(mac_netlink.SOL_NETLINK, NETLINK_ADD_MEMBERSHIP, available[group])
+        super().__init__("nl80211-monitor", callback, sock)
+
+    def events(self, data):
+        stamp = time.time()  # Netlink sockets carry no kernel receive timestamps
+        for msg_type, _, _, body in mac_netlink.iter_messages(data):
+            event = parse_event(self.family, msg_type, body, stamp)
+            if event is not None:
+                yield event
+
+    def resync_event(self):
+        return {"kind": "resync", "action": "resync", "index": 0, "status": 0, "time": time.time()}
+
+
+class WifiRandomizer:
+    """Fresh MAC for station interfaces in the gaps between associations
+
+    A swap is queued right after a disconnect, a failed connect attempt,
+    or a finished scan while not associated - before the supplicant's
+    next scan or association - and made by one worker thread as a single
+    live RTM_NEWLINK. An interface that is busy (scanning, associating)
+    answers EBUSY; that window is counted as "busy" and skipped - the
+    link is never taken down. The monitor keeps reading meanwhile, so an
+    attempt that starts during a swap is timed against it.
+
+    Each swap is a record dict: interface, trigger, mac (None unless
+    applied), result ("ok", "busy" or an error), reaction_ms (event to
+    swap start), swap_ms, added_ms (how long the swap still ran after
+    the next scan/association attempt started - what it could have added
+    to it, 0 if it finished first) and associated_ms (disconnect to the
+    next successful connect, on the last swap before it).
+    """
+
+    def __init__(self, core, interfaces, pick=None, on_swap=None):
+        self.core = core
+        self.netlink = core.netlink
+        self.pick = pick or (lambda interface: core.generate_random_mac())
+        self.on_swap = on_swap
+        self.lock = threading.Lock()
+        self.swaps = []
+        self.state = {}
+        for name in interfaces:
+            link = self.netlink.get_link(name)
+            # A station interface has carrier exactly while it is associated
+            self.state[link["index"]] = {"name": name, "connected": link["carrier"],
+                                         "pending": None, "disconnected": None}
+        core.remember_originals(list(interfaces))  # Journal once, before the first swap
+        core.load_used_macs()  # Not on the first swap's clock
+        self.queue = queue.SimpleQueue()
+        self.worker = None
+        self.monitor = None
+
+    def start(self):
+        """Subscribe to nl80211 notifications; raises OSError without nl80211"""
+        self.monitor = WifiMonitor(self.on_event)
+        self.worker = threading.Thread(target=self.run_swaps, name="wifi-swap", daemon=True)
+        self.worker.start()
+        self.monitor.start()
+        return self
+
+    def stop(self):
+        """Stop listening; waits for a swap in progress"""
+        if self.monitor:
+            self.monitor.stop()
+            self.monitor.join(1.0)
+            self.monitor = None
+        if self.worker:
+            self.queue.put(None)
+            self.worker.join(1.0)
+            self.worker = None
+
+    def on_event(self, event):
+        """Monitor callback (reader thread)"""
+        if event["kind"] == "resync":
+            for state in self.state.values():
+                state["connected"] = self.netlink.get_link(state["name"])["carrier"]
+            return
+        state = self.state.get(event["index"])
+        if state is None:
+            return
+        action = event["action"]
+        with self.lock:
+            record = state["pending"]
+            if action in ATTEMPTS and record is not None and record["attempt"] is None:
+                record["attempt"] = event["time"]
+                if record["ended"] is not None:
+                    record["added_ms"] = 0.0  # Swap was already done
+        if action in ("connect", "roam"):
+            connected = action == "roam" or event["status"] == 0
+            if connected:
+                if state["disconnected"] is not None and record is not None:
+                    record["associated_ms"] = (event["time"] - state["disconnected"]) * 1000
+                state["pending"] = None
+                state["disconnected"] = None
+            state["connected"] = connected
+            if not connected:
+                self.queue_swap(state, "connect_failed", event)
+        elif action == "disconnect":
+            state["connected"] = False
+            state["disconnected"] = event["time"]
+            self.queue_swap(state, "disconnect", event)
+        elif action in ("scan_done", "scan_aborted") and not state["connected"]:
+            self.queue_swap(state, action, event)
+
+    def queue_swap(self, state, trigger, event):
+        """Hand a swap to the worker; its record is pending from now on"""
+        record = {"interface": state["name"], "trigger": trigger, "mac": None, "result": None,
+                  "reaction_ms": None, "swap_ms": None, "added_ms": None, "associated_ms": None,
+                  "event": event["time"], "attempt": None, "ended": None}
+        with self.lock:
+            state["pending"] = record
+        self.queue.put(record)
+
+    def run_swaps(self):
+        """Worker thread: one live address change per queued record, timed"""
+        while True:
+            record = self.queue.get()
+            if record is None:
+                return
+            try:
+                mac = self.pick(record["interface"])
+            except Exception as e:
+                # Counted as a failed swap; the worker carries on with the next one
+                mac, result = None, str(e) or repr(e)
+                self.core.log(f"Wi-Fi: no MAC for {record['interface']}: {result}")
+            started = time.time()
+            if mac is not None:
+                try:
+                    self.netlink.set_link(record["interface"], address=mac)
+                    result = "ok"
+                except OSError as e:
+                    result = "busy" if e.errno == errno.EBUSY else str(e)
+            ended = time.time()
+            with self.lock:
+                record.update(mac=mac if result == "ok" else None, result=result, ended=ended,
+                              reaction_ms=max(0.0, (started - record["event"]) * 1000),
+                              swap_ms=(ended - started) * 1000)
+                if record["attempt"] is not None:
+                    record["added_ms"] = max(0.0, (ended - max(record["attempt"], started)) * 1000)
+                self.swaps.append(record)
+            self.core.metrics.observe("wifi_swap", ended - started, record["interface"])
+            if self.on_swap:
+                self.on_swap(record)
+
+    def summary(self):
+        """Counts and latency figures over every swap so far"""
+        with self.lock:
+            swaps = list(self.swaps)
+        done = [r for r in swaps if r["result"] == "ok"]
+
+        def figures(values):
+            values = sorted(values)
+            if not values:
+                return None
+            return {"p50": values[(len(values) - 1) // 2], "max": values[-1], "count": len(values)}
+
+        return {
+            "swaps": len(done),
+            "busy": sum(1 for r in swaps if r["result"] == "busy"),
+            "failed": sum(1 for r in swaps if r["result"] not in ("ok", "busy")),
+            "swap_ms": figures(r["swap_ms"] for r in done),
+            "added_ms": figures(r["added_ms"] for r in done if r["added_ms"] is not None),
+            "associated_ms": figures(r["associated_ms"] for r in done if r["associated_ms"] is not None),
+        }
+
+
+def wireless_interfaces(states):
+    """Names of the wireless interfaces in a get_interface_states() result"""
+    return sorted(name for name, state in states.items() if state["kind"] == "wireless")
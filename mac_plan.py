@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+MAC Address Spoofer - batch plans
+Applies a set of interface -> MAC assignments as one unit. A plan file
+(JSON, YAML or CSV) names each interface with an explicit MAC, a vendor
+or "random"; the whole file is validated and normalized in one pass with
+every problem reported together, the changes then run with bounded
+parallelism, and if any of them fails the interfaces already changed are
+put back to the MACs they had before the plan started
+"""
+
+import os
+import re
+import csv
+import json
+import time
+import random
+import threading
+import subprocess
+
+import oui_index
+
+# Hex digits and separators only - anything else in a MAC field is a vendor name
+MAC_LIKE = re.compile(r"[0-9A-Fa-f:.\-]+")
+
+
+class PlanError(ValueError):
+    """A plan that failed validation; `problems` lists every issue found"""
+
+    def __init__(self, source, problems):
+        self.problems = problems
+        super().__init__(f"{source}: {len(problems)} problem(s) in plan")
+
+
+def normalize_mac(text):
+    """'AA-BB-CC-DD-EE-FF', 'aabb.ccdd.eeff', 'AABBCCDDEEFF' ... -> 'aa:bb:cc:dd:ee:ff'
+
+    Raises ValueError for anything that is not a usable unicast address.
+    """
+    digits = text.replace(':', '').replace('-', '').replace('.', '')
+    if len(digits) != 12 or not MAC_LIKE.fullmatch(digits):
+        raise ValueError(f"invalid MAC {text!r}")
+    raw = bytes.fromhex(digits)
+    if raw[0] & 0x01:
+        raise ValueError(f"{text} is a multicast MAC (first octet must be even)")
+    if not any(raw):
+        raise ValueError("00:00:00:00:00:00 is not a usable MAC")
+    return raw.hex(':')
+
+
+def load_rows(path):
+    """Raw (where, fields) pairs from a .json, .yaml/.yml or .csv plan file
+
+    JSON/YAML plans are a list of {"interface": ..., "mac": ...} objects,
+    an {interface: mac} mapping, or either of those under "interfaces".
+    CSV plans have an interface,mac header (headerless files are read as
+    those two columns). "vendor" may replace "mac" in all of them.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.reader(f)
+            rows = [(reader.line_num, row) for row in reader
+                    if any(cell.strip() for cell in row) and not row[0].lstrip().startswith('#')]
+        if rows and "interface" in (cell.strip().lower() for cell in rows[0][1]):
+            header = [cell.strip().lower() for cell in rows.pop(0)[1]]
+        else:
+            header = ["interface", "mac"]
+        return [(f"line {number}", dict(zip(header, (cell.strip() for cell in row)))) for number, row in rows]
+
+    with open(path, encoding="utf-8") as f:
+        if ext in (".yaml", ".yml"):
+            try:
+                import yaml  # Optional - only YAML plans need PyYAML
+            except ImportError:
+                raise ValueError("YAML plans need PyYAML (pip install pyyaml)") from None
+            data = yaml.safe_load(f)
+        elif ext == ".json":
+            data = json.load(f)
+        else:
+            raise ValueError(f"unknown plan format {ext or path!r} (use .json, .yaml or .csv)")
+    if isinstance(data, dict) and "interfaces" in data:
+        data = data["interfaces"]
+    if isinstance(data, dict):
+        return [(f"entry {number}", {**spec, "interface": interface} if isinstance(spec, dict)
+                 else {"interface": interface, "mac": spec})
+                for number, (interface, spec) in enumerate(data.items(), 1)]
+    if isinstance(data, list):
+        return [(f"entry {number}", entry) for number, entry in enumerate(data, 1)]
+    raise ValueError("plan must be a list of entries or an interface -> MAC mapping")
+
+
+def vendor_prefixes(name, index):
+    """MA-L prefixes for a vendor given as a registry name or a preset ("Apple", "Apple (USA)")"""
+    prefixes = oui_index.vendor_prefixes(name, index)
+    if not prefixes:
+        needle = name.casefold()
+        prefixes = [prefix for preset, preset_prefixes in oui_index.VENDOR_PRESETS.items()
+                    if preset.casefold().startswith(needle) for prefix in preset_prefixes]
+    return prefixes
+
+
+def parse_plan(path, current_mac=None, load_index=oui_index.load_default):
+    """Read, validate and normalize a plan file in one pass
+
+    Returns a list of entries in file order: {"interface", "mac" (explicit,
+    normalized) or None, "vendor", "prefixes", "where"}, plus "previous"
+    when current_mac(interface) is given to check that interfaces exist.
+    Every problem in the file (unreadable rows, missing interfaces, bad
+    MACs, unknown vendors, interfaces or MACs listed twice) is collected
+    and raised together as one PlanError. The OUI registry is only opened
+    if some entry names a vendor.
+    """
+    try:
+        rows = load_rows(path)
+    except (OSError, ValueError) as e:  # Includes json.JSONDecodeError
+        raise PlanError(path, [str(e)]) from None
+    except Exception as e:  # yaml.YAMLError - PyYAML is optional, so it can't be named here
+        raise PlanError(path, [f"cannot parse plan: {e}"]) from None
+
+    problems = []
+    entries = []
+    seen_interfaces = {}
+    seen_macs = {}
+    index = False
+    for where, fields in rows:
+        if not isinstance(fields, dict):
+            problems.append(f"{where}: expected an object with interface and mac, got {fields!r}")
+            continue
+        interface = str(fields.get("interface") or "").strip()
+        value = fields.get("mac")
+        vendor = fields.get("vendor")
+        value = str(value).strip() if value is not None else ""
+        vendor = str(vendor).strip() if vendor is not None else ""
+        if not interface:
+            problems.append(f"{where}: no interface")
+            continue
+        if isinstance(fields.get("mac"), (int, float)):
+            # YAML reads an unquoted 12:34:56:... as a base-60 number
+            problems.append(f"{where}: {interface}: quote the MAC, it was read as the number {fields['mac']}")
+            continue
+        if interface in seen_interfaces:
+            problems.append(f"{where}: {interface} already planned at {seen_interfaces[interface]}")
+            continue
+        seen_interfaces[interface] = where
+        if value and vendor:
+            problems.append(f"{where}: {interface} has both a mac and a vendor")
+            continue
+        if not value and not vendor:
+            problems.append(f"{where}: {interface} needs a MAC, a vendor or \"random\"")
+            continue
+
+        entry = {"interface": interface, "mac": None, "vendor": None, "prefixes": None, "where": where}
+        if current_mac is not None:
+            entry["previous"] = current_mac(interface)
+            if entry["previous"] is None:
+                problems.append(f"{where}: no interface {interface}")
+        if value.lower() == "random":
+            pass
+        elif value and MAC_LIKE.fullmatch(value):
+            try:
+                entry["mac"] = normalize_mac(value)
+            except ValueError as e:
+                problems.append(f"{where}: {interface}: {e}")
+                continue
+            if entry["mac"] in seen_macs:
+                problems.append(f"{where}: {interface}: {entry['mac']} also planned for {seen_macs[entry['mac']]}")
+                continue
+            seen_macs[entry["mac"]] = interface
+        else:
+            if index is False:
+                index = load_index()
+            entry["vendor"] = vendor or value
+            entry["prefixes"] = vendor_prefixes(entry["vendor"], index)
+            if not entry["prefixes"]:
+                problems.append(f"{where}: {interface}: unknown vendor {entry['vendor']!r}")
+                continue
+        entries.append(entry)
+
+    if problems:
+        raise PlanError(path, problems)
+    return entries
+
+
+def resolve_plan(core, entries):
+    """Read each interface's current MAC and pick every vendor/random MAC
+
+    Returns the entries with "previous" (current MAC, unless parse_plan
+    already read it) and "target" filled in. Raises PlanError listing
+    interfaces that don't exist and explicit MACs already in use elsewhere
+    on this host or segment (a MAC that moves between two planned
+    interfaces, e.g. a swap, is allowed).
+    """
+    problems = []
+    for entry in entries:
+        if "previous" not in entry:
+            entry["previous"] = core.get_current_mac(entry["interface"])
+        if entry["previous"] is None:
+            problems.append(f"{entry['where']}: no interface {entry['interface']}")
+    if problems:
+        raise PlanError("plan", problems)
+
+    used = core.load_used_macs()
+    moving = {entry["previous"].lower() for entry in entries}
+    for entry in entries:
+        if entry["mac"] is None:
+            prefix = random.choice(entry["prefixes"]) if entry["prefixes"] else None
+            entry["target"] = core.generate_random_mac(prefix, claim=True)
+            continue
+        entry["target"] = entry["mac"]
+        unchanged = entry["mac"] == entry["previous"].lower()
+        if used is not None and not unchanged and entry["mac"] not in moving and not used.claim(entry["mac"]):
+            problems.append(f"{entry['where']}: {entry['interface']}: {entry['mac']} is already in use "
+                            "on this host or segment")
+    if problems:
+        raise PlanError("plan", problems)
+    return entries
+
+
+def apply_plan(core, entries, jobs=16):
+    """Make every change in a resolved plan, `jobs` at a time; roll back on failure
+
+    Once one change fails, changes not yet started are skipped and every
+    interface already changed is set back to its "previous" MAC, again in
+    parallel. Interfaces already on their target MAC are left alone.
+    Returns a summary dict: results (fleet-style dicts in plan order, with
+    "skipped"), rollback ({interface: error or None}), apply and
+    rollback elapsed seconds.
+    """
+    from concurrent.futures import ThreadPoolExecutor  # Only plans and fleets need a pool
+
+    failed = threading.Event()
+    core.remember_originals([entry["interface"] for entry in entries])  # One journal write
+
+    def change(entry):
+        result = {"interface": entry["interface"], "mac": entry["target"], "mode": None, "ready": None,
+                  "latency": 0.0, "error": None, "skipped": False}
+        if entry["target"] == entry["previous"].lower():
+            result["mode"] = "unchanged"
+            return result
+        if failed.is_set():
+            result["skipped"] = True
+            return result
+        start = time.perf_counter()
+        try:
+            result["mode"], result["ready"] = core.set_mac_linux(entry["interface"], entry["target"], quiet=True)
+        except subprocess.CalledProcessError as e:
+            result["error"] = (e.stderr or b"").decode(errors="replace").strip() or str(e)
+        except (OSError, ValueError) as e:
+            result["error"] = str(e)
+        result["latency"] = time.perf_counter() - start
+        if result["error"] is not None:
+            failed.set()
+        return result
+
+    def undo(entry):
+        try:
+            core.set_mac_linux(entry["interface"], entry["previous"], quiet=True)
+        except subprocess.CalledProcessError as e:
+            return (e.stderr or b"").decode(errors="replace").strip() or str(e)
+        except (OSError, ValueError) as e:
+            return str(e)
+        return None
+
+    workers = max(1, min(jobs, len(entries)))
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="plan") as pool:
+        results = list(pool.map(change, entries))
+    applied = time.perf_counter() - start
+
+    rollback = {}
+    start = time.perf_counter()
+    if failed.is_set():
+        # A failed change may still have gone through (e.g. carrier never came back) - undo it too
+        changed = [entry for entry, result in zip(entries, results)
+                   if not result["skipped"] and result["mode"] != "unchanged"]
+        if changed:
+            with ThreadPoolExecutor(max_workers=min(workers, len(changed)), thread_name_prefix="rollback") as pool:
+                rollback = dict(zip((entry["interface"] for entry in changed), pool.map(undo, changed)))
+    core.metrics.flush()
+    return {"results": results, "rollback": rollback, "applied": applied,
+            "rolled_back": time.perf_counter() - start}
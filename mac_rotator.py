@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+MAC Address Spoofer - rotation daemon
+Re-randomizes a set of interfaces on per-interface intervals (with jitter)
+from a single asyncio scheduler. Changes go through MACSpoofer.spoof_one on
+a bounded worker pool, at most a few at a time per driver, and every late
+or missed rotation is counted. With derived MACs, rotations happen on
+wall-clock multiples of the interval instead, so every node computing
+the same MACs switches to the next epoch at the same moment
+"""
+
+import time
+import heapq
+import random
+import signal
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import mac_netlink
+import mac_generator
+
+
+class Rotation:
+    """Schedule and counters for one interface"""
+
+    def __init__(self, interface, interval, driver):
+        self.interface = interface
+        self.interval = interval
+        self.driver = driver
+        self.running = False
+        self.rotations = 0
+        self.failures = 0
+        self.late = 0
+        self.missed = 0
+        self.max_lateness = 0.0
+        self.mac = None
+        self.last_error = None
+        self.epoch = None  # Derived MACs: epoch of the next rotation
+
+
+class RotationDaemon:
+    """Rotate MACs of many interfaces from one asyncio event loop
+
+    A single scheduler coroutine keeps a heap of (due time, interface).
+    Due rotations become tasks that wait for a global slot (`jobs`) and a
+    per-driver slot (`per_driver`) before the blocking change runs on the
+    worker pool. The next due time is anchored to the schedule, not to
+    when the change finished, so slow changes don't make the period drift:
+    - late: a rotation started more than `late_after` seconds past due
+    - missed: a rotation was skipped because the previous one for that
+      interface was still running, or the loop fell whole periods behind
+
+    When the spoofer has a deriver, each interface gets its current
+    epoch's MAC right away and then the next one at every interval
+    boundary of the wall clock (no jitter).
+    """
+
+    def __init__(self, spoofer, intervals, jitter=0.1, jobs=8, per_driver=2, late_after=1.0):
+        self.spoofer = spoofer
+        self.jitter = jitter
+        self.jobs = max(1, jobs)
+        self.per_driver = max(1, per_driver)
+        self.late_after = late_after
+        self.random = random.SystemRandom()  # Rotation times shouldn't be predictable either
+        self.aligned = spoofer.deriver is not None
+        bad = sorted(name for name, interval in intervals.items() if not interval > 0)
+        if bad or not 0 <= jitter < 1:
+            # The scheduler would never get past "now" (and aligned epochs divide by the interval)
+            raise ValueError(f"intervals must be above 0 and jitter in [0, 1) ({', '.join(bad) or jitter})")
+        links = spoofer.get_interface_states() if spoofer.netlink else {}
+        self.rotations = {name: Rotation(name, interval, self.find_driver(name, links))
+                          for name, interval in intervals.items()}
+        self.started = None
+        self.stop_event = None
+        self.loop = None
+        self.monitor = None
+
+    def find_driver(self, interface, links):
+        """Driver key used to cap concurrent changes on the same driver"""
+        if interface in links:
+            return mac_netlink.driver_key(interface, links[interface]["info_kind"])
+        return interface  # Unknown driver - don't group it with anything
+
+    def next_due(self, rotation, after):
+        """Next due time one jittered interval after `after` (the next epoch boundary if aligned)"""
+        if self.aligned:
+            rotation.epoch += 1
+            return time.monotonic() + rotation.epoch * rotation.interval - time.time()
+        spread = rotation.interval * self.jitter
+        return after + rotation.interval + self.random.uniform(-spread, spread)
+
+    def on_netlink_event(self, event):
+        """Keep the spoofer's in-use MAC set current while the daemon runs"""
+        if event["kind"] == "resync":
+            self.spoofer.used_macs.load(self.spoofer.netlink)
+        else:
+            self.spoofer.used_macs.apply(event)
+
+    def stop(self):
+        """Ask the scheduler to stop (safe from signal handlers and other threads)"""
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.stop_event.set)
+
+    async def rotate(self, rotation, due, slots, driver_slots, executor, epoch=None):
+        """Run one change once a global and a per-driver slot are free"""
+        rotation.running = True
+        result = None
+        try:
+            async with slots, driver_slots[rotation.driver]:
+                lateness = time.monotonic() - due
+                if lateness > self.late_after:
+                    rotation.late += 1
+                rotation.max_lateness = max(rotation.max_lateness, lateness)
+                result = await self.loop.run_in_executor(executor, self.spoofer.spoof_one, rotation.interface, epoch)
+        except Exception as e:
+            # Failed before a change was even tried (no MAC could be picked or derived, say)
+            rotation.failures += 1
+            rotation.last_error = str(e) or repr(e)
+            return
+        finally:
+            rotation.running = False
+            if result is not None and result["claimed"]:
+                # The claim only kept parallel picks apart - held on, every rotation would leak one
+                self.spoofer.used_macs.release(result["mac"])
+
+        if result["error"] is None:
+            rotation.rotations += 1
+            rotation.mac = result["mac"]
+        else:
+            rotation.failures += 1
+            rotation.last_error = result["error"]
+
+    async def run(self, duration=None, on_stats=None, stats_every=60):
+        """Rotate until stop() (or SIGINT/SIGTERM, or `duration` seconds)"""
+        self.loop = asyncio.get_running_loop()
+        self.stop_event = asyncio.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                self.loop.add_signal_handler(signum, self.stop_event.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # Not the main thread / not supported here
+
+        if self.spoofer.load_used_macs() is not None:
+            self.monitor = mac_netlink.start_monitor(
+                self.on_netlink_event, mac_netlink.RTMGRP_LINK | mac_netlink.RTMGRP_NEIGH)
+
+        slots = asyncio.Semaphore(self.jobs)
+        driver_slots = {rotation.driver: asyncio.Semaphore(self.per_driver)
+                        for rotation in self.rotations.values()}
+        executor = ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix="rotate")
+
+        self.started = now = time.monotonic()
+        deadline = now + duration if duration else None
+        next_stats = now + stats_every if on_stats else None
+        if self.aligned:
+            # Derived MACs: the current epoch's MAC right away, then one per boundary
+            for rotation in self.rotations.values():
+                rotation.epoch = mac_generator.current_epoch(rotation.interval)
+            heap = [(now, name) for name in self.rotations]
+        else:
+            # First rotations are spread over one interval instead of all at once
+            heap = [(now + self.random.uniform(0, rotation.interval), name)
+                    for name, rotation in self.rotations.items()]
+        heapq.heapify(heap)
+        tasks = set()
+
+        try:
+            while heap:
+                due, name = heap[0]
+                wake = min(t for t in (due, deadline, next_stats) if t is not None)
+                try:
+                    await asyncio.wait_for(self.stop_event.wait(), max(0.0, wake - time.monotonic()))
+                    break
+                except asyncio.TimeoutError:
+                    pass
+
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    break
+                if next_stats is not None and now >= next_stats:
+                    on_stats(self.stats())
+                    next_stats += stats_every
+                if now < due:
+                    continue
+
+                heapq.heappop(heap)
+                rotation = self.rotations[name]
+                if self.aligned:
+                    # Whole epochs late (e.g. after a suspend): go straight to the current one
+                    behind = mac_generator.current_epoch(rotation.interval) - rotation.epoch
+                    if behind > 0:
+                        rotation.missed += behind
+                        rotation.epoch += behind
+                if rotation.running:
+                    rotation.missed += 1
+                else:
+                    task = asyncio.create_task(self.rotate(rotation, due, slots, driver_slots, executor,
+                                                           rotation.epoch))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+
+                next_due = self.next_due(rotation, due)
+                while next_due <= now:
+                    # Whole periods behind (e.g. after a suspend) - count them, don't burst
+                    rotation.missed += 1
+                    next_due = self.next_due(rotation, next_due)
+                heapq.heappush(heap, (next_due, name))
+
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            executor.shutdown(wait=True)
+            if self.monitor:
+                self.monitor.stop()
+                self.monitor = None
+        return self.stats()
+
+    def stats(self):
+        """Aggregate and per-interface counters"""
+        rotations = list(self.rotations.values())
+        elapsed = time.monotonic() - self.started if self.started else 0.0
+        total = sum(r.rotations for r in rotations)
+        return {
+            "elapsed": elapsed,
+            "interfaces": len(rotations),
+            "rotations": total,
+            "failures": sum(r.failures for r in rotations),
+            "late": sum(r.late for r in rotations),
+            "missed": sum(r.missed for r in rotations),
+            "max_lateness": max((r.max_lateness for r in rotations), default=0.0),
+            "rate": total / elapsed if elapsed else 0.0,
+            "per_interface": {r.interface: {
+                "interval": r.interval,
+                "rotations": r.rotations,
+                "failures": r.failures,
+                "late": r.late,
+                "missed": r.missed,
+                "max_lateness": r.max_lateness,
+                "mac": r.mac,
+                "last_error": r.last_error,
+            } for r in rotations},
+        }
+
+
+def format_stats(stats):
+    """One-line summary of daemon counters"""
+    return (f"[*] {stats['elapsed']:.0f}s: {stats['rotations']} rotations on {stats['interfaces']} interfaces "
+            f"({stats['rate']:.2f}/s), {stats['failures']} failed, {stats['late']} late, "
+            f"{stats['missed']} missed, max lateness {stats['max_lateness'] * 1000:.1f} ms")
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+MAC Address Spoofer - UI timer scheduler
+All periodic GUI work (status pulse, stats polling, log view flushes) runs
+from one Tk timer that is armed for the earliest due task only. Tasks due
+within a few milliseconds of each other share a wakeup, and tasks that only
+matter while the user is looking are paused, with no timer armed at all,
+when the window is hidden or unfocused
+"""
+
+import time
+
+COALESCE_MS = 25  # Tasks due this soon after the earliest one run in the same wakeup
+
+
+class Task:
+    """One scheduled callback; interval is None for one-shot tasks"""
+
+    def __init__(self, callback, due, interval=None, background=False):
+        self.callback = callback
+        self.due = due
+        self.interval = interval
+        self.background = background  # Keeps running while the window is inactive
+
+
+class Scheduler:
+    """Coalescing timer for a Tk root (Tk thread only)
+
+    Every wakeup is counted separately for the active and inactive
+    window states, so wakeups_per_second(False) shows what the GUI costs
+    while nobody is looking at it.
+    """
+
+    def __init__(self, root, coalesce_ms=COALESCE_MS):
+        self.root = root
+        self.coalesce = coalesce_ms / 1000
+        self.tasks = {}
+        self.active = True
+        self.timer = None  # Tk after() id of the one armed timer
+        self.timer_due = None
+        self.seconds = {True: 0.0, False: 0.0}  # Time spent active/inactive
+        self.wakeups = {True: 0, False: 0}
+        self.since = time.monotonic()
+
+    def every(self, name, interval_ms, callback, background=False):
+        """Run callback every interval_ms, first after one interval (replaces a task of the same name)"""
+        interval = interval_ms / 1000
+        self.tasks[name] = Task(callback, time.monotonic() + interval, interval, background)
+        self.arm()
+
+    def once(self, name, delay_ms, callback, background=False):
+        """Run callback once after delay_ms, unless a task of that name is already pending"""
+        if name not in self.tasks:
+            self.tasks[name] = Task(callback, time.monotonic() + delay_ms / 1000, background=background)
+            self.arm()
+
+    def cancel(self, name):
+        """Drop a task (no-op if it is not scheduled)"""
+        if self.tasks.pop(name, None):
+            self.arm()
+
+    def scheduled(self, name):
+        return name in self.tasks
+
+    def set_active(self, active):
+        """Window became active (mapped and focused) or inactive; True if that changed anything
+
+        Paused tasks keep their due time, so whatever fell due while
+        inactive runs once, right after the window comes back.
+        """
+        if active == self.active:
+            return False
+        now = time.monotonic()
+        self.seconds[self.active] += now - self.since
+        self.since = now
+        self.active = active
+        self.arm()
+        return True
+
+    def wakeups_per_second(self, active):
+        """Average timer wakeups per second spent in the given window state"""
+        seconds = self.seconds[active]
+        if active == self.active:
+            seconds += time.monotonic() - self.since
+        return self.wakeups[active] / seconds if seconds > 0 else 0.0
+
+    def arm(self):
+        """Point the one Tk timer at the earliest runnable task, or cancel it if there is none"""
+        due = min((task.due for task in self.tasks.values() if self.active or task.background), default=None)
+        if self.timer is not None:
+            if due == self.timer_due:
+                return
+            self.root.after_cancel(self.timer)
+            self.timer = None
+        if due is not None:
+            self.timer_due = due
+            self.timer = self.root.after(max(0, round((due - time.monotonic()) * 1000)), self.fire)
+
+    def fire(self):
+        """Timer callback: run every runnable task that is due (or nearly due)"""
+        self.timer = None
+        now = time.monotonic()
+        self.wakeups[self.active] += 1
+        try:
+            for name, task in list(self.tasks.items()):
+                if self.tasks.get(name) is not task:
+                    continue  # Cancelled or replaced by an earlier callback in this round
+                if not (self.active or task.background) or task.due > now + self.coalesce:
+                    continue
+                if task.interval is None:
+                    del self.tasks[name]
+                else:
+                    # Keep the cadence; after a pause, start counting from now
+                    task.due += task.interval
+                    if task.due <= now:
+                        task.due = now + task.interval
+                task.callback()
+        finally:
+            self.arm()
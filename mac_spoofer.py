@@ -6,108 +6,226 @@ Requires administrator/root privileges
 """
 
 import subprocess
-import re
 import random
+import atexit
 import argparse
+import os
 import sys
-import platform
+import time
+import fnmatch
+import socket
+import threading
 
-class MACSpoofer:
-    def __init__(self):
-        self.os_type = platform.system()
+import mac_core
+import oui_index
+import mac_generator
+import mac_store
+import mac_metrics
 
-    def get_current_mac(self, interface):
-        """Get the current MAC address of an interface"""
-        try:
-            if self.os_type == "Windows":
-                result = subprocess.check_output(f"getmac /v /fo list", shell=True).decode()
-                # Parse Windows output to find MAC for interface
-                lines = result.split('\n')
-                for i, line in enumerate(lines):
-                    if interface.lower() in line.lower():
-                        # Look for MAC in nearby lines
-                        for j in range(i, min(i+10, len(lines))):
-                            mac_match = re.search(r"([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})", lines[j])
-                            if mac_match:
-                                return mac_match.group(0)
-            else:
-                result = subprocess.check_output(f"ifconfig {interface}", shell=True).decode()
-                mac_search = re.search(r"([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})", result)
-                if mac_search:
-                    return mac_search.group(0)
-        except Exception as e:
-            print(f"[-] Error getting MAC address: {e}")
-        return None
-
-    def generate_random_mac(self):
-        """Generate a random MAC address"""
-        # First octet: set locally administered bit, clear multicast bit
-        first_octet = random.randint(0, 255) & 0xFE | 0x02
-        mac = [first_octet] + [random.randint(0, 255) for _ in range(5)]
-        return ':'.join(f"{octet:02x}" for octet in mac)
-
-    def change_mac_windows(self, interface, new_mac):
-        """Change MAC address on Windows"""
-        try:
-            # Remove colons/dashes from MAC
-            new_mac_clean = new_mac.replace(':', '').replace('-', '')
-
-            # Get network adapter using PowerShell
-            cmd = f'powershell "Get-NetAdapter | Where-Object {{$_.Name -like \'*{interface}*\'}} | Select-Object -First 1 | Format-List Name,MacAddress,InterfaceDescription"'
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-
-            # Use registry to change MAC (alternative method)
-            print(f"[*] Attempting to change MAC address to {new_mac}")
-            print(f"[!] On Windows, you may need to:")
-            print(f"    1. Open Device Manager")
-            print(f"    2. Find your network adapter")
-            print(f"    3. Properties > Advanced > Network Address")
-            print(f"    4. Set value to: {new_mac_clean}")
-            print(f"    5. Disable and re-enable the adapter")
+class MACSpoofer(mac_core.SpooferCore):
+    def __init__(self, store_path=None, metrics=None, ready_timeout=mac_core.READY_TIMEOUT):
+        super().__init__(store_path, metrics, ready_timeout)
+        self.oui = False  # Vendor registry, opened on first use
+        self.derive_epoch = 0  # Epoch for derived MACs outside rotation (--epoch)
 
-            return True
-        except Exception as e:
-            print(f"[-] Error changing MAC: {e}")
-            return False
+    def log(self, message):
+        print(f"[*] {message}")
+
+    def describe_mac(self, mac):
+        """Vendor of a MAC from the compiled registry (None if no registry)"""
+        if self.oui is False:
+            self.oui = oui_index.load_default()
+        return self.oui.describe(mac) if self.oui else None
+
+    def restore_all(self, deadline=10.0, jobs=16):
+        """Restore every tracked interface in parallel and print a summary"""
+        summary = mac_store.restore_all(self.original_macs, self.restore_one, deadline, jobs)
+        for interface in summary["restored"]:
+            print(f"[+] {interface:<16} restored")
+        for interface, error in summary["failed"].items():
+            print(f"[-] {interface:<16} {error}")
+        for interface in summary["timed_out"]:
+            print(f"[-] {interface:<16} not restored within {deadline:g}s")
+        total = len(summary["restored"]) + len(summary["failed"]) + len(summary["timed_out"])
+        print(f"[*] Restored {len(summary['restored'])}/{total} interfaces in {summary['elapsed']:.3f}s")
+        return summary
 
     def change_mac_linux(self, interface, new_mac):
-        """Change MAC address on Linux"""
+        """Change MAC address on Linux/macOS"""
         try:
-            subprocess.run(["sudo", "ifconfig", interface, "down"], check=True)
-            subprocess.run(["sudo", "ifconfig", interface, "hw", "ether", new_mac], check=True)
-            subprocess.run(["sudo", "ifconfig", interface, "up"], check=True)
-            print(f"[+] MAC address changed to {new_mac}")
+            mode, ready = self.set_mac_linux(interface, new_mac)
+            print(f"[+] MAC address changed to {new_mac} ({mac_core.MODE_NOTES[mode]})")
+            if self.helper and self.helper.last_ms is not None:
+                print(f"[*] Changed by the privileged helper in {self.helper.last_ms:.1f} ms")
+            if ready is not None:
+                print(f"[*] Link ready after {ready * 1000:.1f} ms")
             return True
-        except subprocess.CalledProcessError as e:
+        except (subprocess.CalledProcessError, OSError) as e:
             print(f"[-] Error changing MAC: {e}")
             return False
 
     def change_mac(self, interface, new_mac=None):
         """Change MAC address for given interface"""
         if not new_mac:
-            new_mac = self.generate_random_mac()
+            new_mac = self.generate_random_mac(claim=True)
 
         print(f"[*] Target interface: {interface}")
         current_mac = self.get_current_mac(interface)
         if current_mac:
-            print(f"[*] Current MAC: {current_mac}")
+            vendor = self.describe_mac(current_mac)
+            print(f"[*] Current MAC: {current_mac}" + (f" ({vendor})" if vendor else ""))
 
         print(f"[*] New MAC: {new_mac}")
 
-        if self.os_type == "Windows":
-            return self.change_mac_windows(interface, new_mac)
-        elif self.os_type == "Linux":
-            return self.change_mac_linux(interface, new_mac)
-        elif self.os_type == "Darwin":  # macOS
-            return self.change_mac_linux(interface, new_mac)
-        else:
+        if self.os_type not in ("Windows", "Linux", "Darwin"):
             print(f"[-] Unsupported OS: {self.os_type}")
             return False
+        return self.spoof(interface, new_mac)
+
+    def match_interfaces(self, patterns, exclude=(), up_only=False, namespaces=None):
+        """Return sorted interface names matching any glob in patterns
+
+        With `namespaces`, the interfaces inside those network namespaces
+        are matched instead (one dump per namespace, in parallel) and
+        returned as "<netns>/<interface>".
+        """
+        if namespaces:
+            names = []
+            for namespace, (states, error) in self.namespace_states(namespaces).items():
+                if error:
+                    print(f"[-] {namespace}: {error}")
+                    continue
+                names += [f"{namespace}/{name}" for name, state in states.items() if state["up"] or not up_only]
+        elif self.netlink:
+            states = self.get_interface_states()
+            names = [name for name, state in states.items() if state["up"] or not up_only]
+        else:
+            names = [name for _, name in socket.if_nameindex()]
+        return sorted(name for name in names
+                      if any(fnmatch.fnmatchcase(name.rpartition('/')[2], p) for p in patterns)
+                      and not any(fnmatch.fnmatchcase(name.rpartition('/')[2], p) for p in exclude))
+
+    def spoof_one(self, interface, epoch=None):
+        """Give one interface a random (or derived) MAC quietly; returns a result dict
+
+        With a deriver, the MAC is the interface's one for `epoch`
+        (default: --epoch). "claimed" says whether the MAC was reserved in
+        used_macs and needs release() once link events track it. Errors,
+        including not finding a MAC to use ("mac" is then None), are
+        reported in "error" rather than raised.
+        """
+        start = time.perf_counter()
+        new_mac = mode = ready = error = None
+        claimed = False
+        try:
+            self.remember_originals([interface])
+            if self.deriver is not None:
+                new_mac = self.derive_mac(interface, self.derive_epoch if epoch is None else epoch)
+                claimed = self.used_macs is not None and self.used_macs.claim(new_mac)
+            else:
+                new_mac = self.generate_random_mac(claim=True)
+                claimed = self.used_macs is not None
+            start = time.perf_counter()  # Latency of the change itself, not of picking the MAC
+            mode, ready = self.set_mac_linux(interface, new_mac, quiet=True)
+        except subprocess.CalledProcessError as e:
+            error = (e.stderr or b"").decode(errors="replace").strip() or str(e)
+        except (OSError, ValueError) as e:
+            error = str(e)
+        return {"interface": interface, "mac": new_mac, "mode": mode, "ready": ready,
+                "latency": time.perf_counter() - start, "error": error, "claimed": claimed}
+
+    def spoof_fleet(self, interfaces, jobs=16):
+        """Re-MAC many interfaces with at most `jobs` changes in flight
+
+        Returns (results, elapsed_seconds). Results keep the input order.
+        The MACs claimed while picking are released once all changes are done.
+        """
+        from concurrent.futures import ThreadPoolExecutor  # Only fleet mode needs a pool
+
+        start = time.perf_counter()
+        self.load_used_macs()  # Once, before workers start picking
+        self.remember_originals(interfaces)  # One journal write for the whole fleet
+        with ThreadPoolExecutor(max_workers=max(1, jobs), thread_name_prefix="fleet") as pool:
+            results = list(pool.map(self.spoof_one, interfaces))
+        for result in results:
+            if result["claimed"]:
+                self.used_macs.release(result["mac"])
+        return results, time.perf_counter() - start
+
+    def print_fleet_report(self, results, elapsed):
+        """Print per-interface latency, throughput and a failure summary"""
+        for result in results:
+            status = "+" if result["error"] is None else "-"
+            ready = f"ready {result['ready'] * 1000:.2f} ms" if result["ready"] is not None else ""
+            print(f"[{status}] {result['interface']:<16} {result['mac'] or '-':<17}  "
+                  f"{result['latency'] * 1000:8.2f} ms  {result['mode'] or 'failed':<8} {ready}".rstrip())
+
+        failures = [r for r in results if r["error"] is not None]
+        latencies = sorted(r["latency"] * 1000 for r in results)
+        print()
+        print(f"[*] Changed {len(results) - len(failures)}/{len(results)} interfaces in {elapsed:.3f}s "
+              f"({len(results) / elapsed if elapsed else 0:.1f} changes/s)")
+        if latencies:
+            print(f"[*] Latency ms: p50 {percentile(latencies, 50):.2f}  p90 {percentile(latencies, 90):.2f}  "
+                  f"p99 {percentile(latencies, 99):.2f}  max {latencies[-1]:.2f}")
+        if failures:
+            print(f"[-] {len(failures)} failed:")
+            for result in failures:
+                print(f"    {result['interface']}: {result['error']}")
+
+    def run_plan(self, path, jobs=16, dry_run=False):
+        """Validate a plan file, then apply it as one unit (rolled back if any change fails)
+
+        Returns True if every change went through.
+        """
+        import mac_plan  # csv/json parsing is only needed for plans
+
+        start = time.perf_counter()
+        try:
+            entries = mac_plan.parse_plan(path, self.get_current_mac)
+            mac_plan.resolve_plan(self, entries)
+        except mac_plan.PlanError as e:
+            print(f"[-] {e}")
+            for problem in e.problems:
+                print(f"    {problem}")
+            return False
+        validated = time.perf_counter() - start
+        print(f"[*] Plan: {len(entries)} interfaces validated in {validated * 1000:.1f} ms")
+        if dry_run:
+            for entry in entries:
+                source = entry["vendor"] or ("explicit" if entry["mac"] else "random")
+                print(f"    {entry['interface']:<16} {entry['previous']} -> {entry['target']}  ({source})")
+            return True
+
+        summary = mac_plan.apply_plan(self, entries, jobs)
+        results = summary["results"]
+        attempted = [r for r in results if not r["skipped"] and r["mode"] != "unchanged"]
+        self.print_fleet_report(attempted, summary["applied"])
+        unchanged = sum(1 for r in results if r["mode"] == "unchanged")
+        skipped = [r["interface"] for r in results if r["skipped"]]
+        if unchanged:
+            print(f"[*] {unchanged} interfaces already had their planned MAC")
+        if skipped:
+            print(f"[-] Not started after the first failure: {', '.join(skipped)}")
+        if summary["rollback"]:
+            for interface, error in summary["rollback"].items():
+                print(f"[{'-' if error else '+'}] {interface:<16} {error or 'rolled back'}")
+            undone = sum(1 for error in summary["rollback"].values() if error is None)
+            print(f"[*] Rolled back {undone}/{len(summary['rollback'])} interfaces in {summary['rolled_back']:.3f}s")
+        ok = not skipped and all(r["error"] is None for r in results)
+        print(f"[{'+' if ok else '-'}] Plan {'applied' if ok else 'failed'}: validate {validated * 1000:.1f} ms, "
+              f"apply {summary['applied']:.3f}s, rollback {summary['rolled_back']:.3f}s, "
+              f"total {time.perf_counter() - start:.3f}s")
+        return ok
 
     def list_interfaces(self):
         """List all network interfaces"""
         try:
-            if self.os_type == "Windows":
+            # One link dump + one address dump (or one `ifconfig -a`) covers every interface
+            states = self.get_interface_states()
+            if states:
+                print_interface_table(states)
+            elif self.os_type == "Windows":
                 result = subprocess.check_output("netsh interface show interface", shell=True).decode()
                 print(result)
             else:
@@ -116,29 +234,385 @@ class MACSpoofer:
         except Exception as e:
             print(f"[-] Error listing interfaces: {e}")
 
+    def list_namespaces(self, namespaces, jobs=16):
+        """List the interfaces inside network namespaces, one dump each, `jobs` at a time"""
+        start = time.perf_counter()
+        results = self.namespace_states(namespaces, jobs)
+        elapsed = time.perf_counter() - start
+        for namespace, (states, error) in results.items():
+            if error:
+                print(f"[-] {namespace}: {error}")
+                continue
+            print(f"[*] {namespace}:")
+            print_interface_table(states)
+        failed = sum(1 for _, error in results.values() if error)
+        print(f"[*] Read {len(results) - failed}/{len(results)} namespaces in {elapsed * 1000:.1f} ms")
+
+def print_interface_table(states):
+    """One line per interface: name, kind, MAC, operstate, addresses"""
+    for name, state in sorted(states.items()):
+        addresses = ', '.join(state["ipv4"] + state["ipv6"]) or "-"
+        print(f"    {name:<16} {state['kind']:<9} {state['mac'] or '-':<17}  "
+              f"{state['operstate']:<14} {addresses}")
+
+def positive_seconds(text):
+    """argparse type: a number of seconds above zero"""
+    try:
+        value = float(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a number of seconds: {text!r}") from None
+    if not 0 < value < float("inf"):  # Also rejects nan
+        raise argparse.ArgumentTypeError(f"must be more than 0 seconds: {text!r}")
+    return value
+
+
+def jitter_fraction(text):
+    """argparse type: a fraction in [0, 1), so a jittered interval stays positive"""
+    try:
+        value = float(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a number: {text!r}") from None
+    if not 0 <= value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 0 and below 1: {text!r}")
+    return value
+
+
+def parse_rotation_specs(specs, default_interval):
+    """Split 'GLOB[=SECONDS]' specs into [(glob, interval), ...]
+
+    Raises ValueError for an empty glob or an interval that is not a
+    number of seconds above zero.
+    """
+    parsed = []
+    for spec in specs:
+        pattern, _, interval = spec.partition('=')
+        if not pattern:
+            raise ValueError(f"no interface pattern in {spec!r}")
+        try:
+            parsed.append((pattern, positive_seconds(interval) if interval else default_interval))
+        except argparse.ArgumentTypeError as e:
+            raise ValueError(f"{spec}: {e}") from None
+    return parsed
+
+
+def rotate_interfaces(spoofer, specs, args, namespaces=None):
+    """Run the rotation daemon until Ctrl+C/SIGTERM (or --duration)"""
+    # asyncio alone costs more import time than the rest of the CLI - load it only here
+    import asyncio
+    import mac_rotator
+
+    intervals = {}
+    for pattern, interval in parse_rotation_specs(specs, args.interval):
+        for interface in spoofer.match_interfaces([pattern], args.exclude, args.up_only, namespaces):
+            intervals.setdefault(interface, interval)  # First matching spec wins
+    if not intervals:
+        print("[-] No interfaces match the given pattern(s)")
+        return
+    daemon = mac_rotator.RotationDaemon(spoofer, intervals, jitter=args.jitter,
+                                        jobs=args.jobs, per_driver=args.per_driver)
+    timing = "derived MACs, epochs on wall-clock boundaries" if daemon.aligned else f"±{args.jitter:.0%} jitter"
+    print(f"[*] Rotating {len(intervals)} interfaces ({args.jobs} in flight, {args.per_driver} per driver, "
+          f"{timing}) - Ctrl+C to stop")
+    stats = asyncio.run(daemon.run(args.duration, lambda s: print(mac_rotator.format_stats(s)), args.stats_every))
+    print(mac_rotator.format_stats(stats))
+    for interface, counters in stats["per_interface"].items():
+        status = "+" if counters["failures"] == 0 else "-"
+        print(f"[{status}] {interface:<16} every {counters['interval']:g}s  {counters['rotations']} rotated  "
+              f"{counters['late']} late  {counters['missed']} missed  {counters['mac'] or ''}")
+        if counters["last_error"]:
+            print(f"    last error: {counters['last_error']}")
+
+
+def watch_wifi(spoofer, patterns, args):
+    """Wi-Fi mode: new MAC between associations until Ctrl+C/SIGTERM (or --duration)"""
+    import mac_nl80211
+
+    interfaces = [name for name in mac_nl80211.wireless_interfaces(spoofer.get_interface_states())
+                  if any(fnmatch.fnmatchcase(name, p) for p in patterns)
+                  and not any(fnmatch.fnmatchcase(name, p) for p in args.exclude)]
+    if not interfaces:
+        print("[-] No wireless interfaces match the given pattern(s)")
+        return
+
+    def on_swap(record):
+        status = "+" if record["result"] == "ok" else "-"
+        added = f", {record['added_ms']:.1f} ms into the next attempt" if record["added_ms"] else ""
+        print(f"[{status}] {record['interface']:<16} {record['trigger']:<14} {record['mac'] or record['result']}  "
+              f"{record['swap_ms']:.1f} ms (+{record['reaction_ms']:.1f} ms after the event{added})", flush=True)
+
+    try:
+        randomizer = spoofer.watch_wifi(interfaces, on_swap)
+    except OSError as e:
+        print(f"[-] Wi-Fi mode unavailable: {e}")
+        return
+    print(f"[*] Wi-Fi mode on {', '.join(interfaces)}: new MAC after every disconnect and idle scan "
+          "- Ctrl+C to stop")
+    try:
+        if args.duration:
+            time.sleep(args.duration)
+        else:
+            threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        randomizer.stop()
+    summary = randomizer.summary()
+    print(f"[*] {summary['swaps']} swaps, {summary['busy']} skipped (interface busy), {summary['failed']} failed")
+    for key, label in (("swap_ms", "Swap"), ("added_ms", "Added to the next attempt"),
+                       ("associated_ms", "Disconnect to associated")):
+        if summary[key]:
+            print(f"[*] {label}: p50 {summary[key]['p50']:.1f} ms, max {summary[key]['max']:.1f} ms "
+                  f"({summary[key]['count']} samples)")
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+def generate_macs(count, prefix=None, vendor=None, output=None):
+    """Stream `count` unique MACs to stdout or a file; stats go to stderr"""
+    if vendor:
+        prefixes = list(oui_index.vendor_prefixes(vendor, oui_index.load_default()))
+        if not prefixes:
+            print(f"[-] Unknown vendor preset: {vendor}", file=sys.stderr)
+            return
+        random.SystemRandom().shuffle(prefixes)
+    else:
+        prefixes = [prefix]
+
+    # Spread the MACs evenly over the vendor's prefixes, one generator each
+    start = time.perf_counter()
+    written = 0
+    out = open(output, "w") if output else sys.stdout
+    try:
+        for i, vendor_prefix in enumerate(prefixes):
+            share = count // len(prefixes) + (1 if i < count % len(prefixes) else 0)
+            if share:
+                written += mac_generator.MACGenerator(vendor_prefix).stream(share, out)
+    except ValueError as e:
+        print(f"[-] {e}", file=sys.stderr)
+    finally:
+        if output:
+            out.close()
+    elapsed = time.perf_counter() - start
+    print(f"[*] Generated {written} unique MACs in {elapsed:.3f}s "
+          f"({written / elapsed if elapsed else 0:,.0f} MACs/s)", file=sys.stderr)
+
+def attribute_macs(paths, index_path, top=20, local_as_vendor=False):
+    """Print the vendor breakdown of every MAC found in the given inputs"""
+    index = oui_index.load_default(index_path)
+    if index is None:
+        print("[-] No OUI registry compiled - run with --oui-compile oui.csv first")
+        return
+    try:
+        counts = oui_index.read_mac_counts(paths)
+    except (OSError, ValueError) as e:
+        print(f"[-] Error reading input: {e}")
+        return
+
+    start = time.perf_counter()
+    audit = index.attribute(counts, local_as_vendor)
+    elapsed = time.perf_counter() - start
+
+    total = audit["total"]
+    print(f"[*] {total} MACs ({audit['unique']} unique) from {len(paths)} input(s), "
+          f"attributed in {elapsed * 1000:.1f} ms ({total / elapsed / 1e6 if elapsed else 0:.1f}M MACs/s)")
+    if not total:
+        return
+    print(f"    {'count':>10}  {'share':>6}  vendor")
+    for vendor, count in audit["vendors"].most_common(top):
+        print(f"    {count:>10}  {count * 100 / total:5.1f}%  {vendor}")
+    hidden = len(audit["vendors"]) - top
+    if hidden > 0:
+        print(f"    ... {hidden} more vendors")
+    print(f"[*] Unassigned: {audit['unassigned']}  Locally administered: {audit['local']}")
+
 def main():
     parser = argparse.ArgumentParser(description="MAC Address Spoofer")
     parser.add_argument("-i", "--interface", help="Network interface to modify")
     parser.add_argument("-m", "--mac", help="New MAC address (random if not specified)")
     parser.add_argument("-l", "--list", action="store_true", help="List network interfaces")
     parser.add_argument("-r", "--random", action="store_true", help="Generate random MAC")
+    parser.add_argument("-f", "--fleet", nargs="+", metavar="GLOB",
+                        help="Fleet mode: give every interface matching these globs a random MAC (e.g. 'veth*')")
+    parser.add_argument("-j", "--jobs", type=int, default=16, help="Fleet/rotate: changes in flight at once (default 16)")
+    parser.add_argument("--exclude", action="append", default=["lo"], metavar="GLOB",
+                        help="Fleet/rotate: skip interfaces matching GLOB (repeatable, 'lo' always skipped)")
+    parser.add_argument("--up-only", action="store_true", help="Fleet/rotate: only interfaces that are administratively up")
+    parser.add_argument("--rotate", nargs="+", metavar="GLOB[=SECONDS]",
+                        help="Rotation daemon: keep re-randomizing matching interfaces (e.g. 'wlan0=600' 'veth*')")
+    parser.add_argument("--interval", type=positive_seconds, default=300,
+                        help="Rotate: default seconds between rotations (300)")
+    parser.add_argument("--jitter", type=jitter_fraction, default=0.1,
+                        help="Rotate: random +/- fraction of the interval, 0 to below 1 (0.1)")
+    parser.add_argument("--per-driver", type=int, default=2, help="Rotate: changes in flight per driver (default 2)")
+    parser.add_argument("--stats-every", type=float, default=60, help="Rotate: seconds between counter lines (60)")
+    parser.add_argument("--duration", type=float, help="Rotate/Wi-Fi: stop after this many seconds")
+    parser.add_argument("--restore-on-exit", action="store_true",
+                        help="Rotate/Wi-Fi: restore all tracked interfaces when the daemon exits (incl. SIGTERM)")
+    parser.add_argument("--netns", nargs="+", metavar="GLOB",
+                        help="List/fleet/rotate inside these network namespaces (/run/netns names, "
+                             "'pid:*' for process namespaces); -i also takes NETNS/IFACE")
+    parser.add_argument("--plan", metavar="FILE",
+                        help="Apply a JSON/YAML/CSV plan of interface -> MAC/vendor/'random' as one unit "
+                             "(-j in flight, rolled back if any change fails)")
+    parser.add_argument("--dry-run", action="store_true", help="Plan: validate and show the changes, touch nothing")
+    parser.add_argument("--derive", metavar="CONTEXT",
+                        help="-i/fleet/rotate/Wi-Fi: compute each MAC from --key-file, the interface's hardware MAC, "
+                             "CONTEXT (e.g. an SSID or VLAN) and the epoch instead of picking it at random")
+    parser.add_argument("--key-file", metavar="PATH", default=os.environ.get("MAC_SPOOFER_KEY_FILE"),
+                        help="Derive: secret key, at least 16 bytes (e.g. head -c 32 /dev/urandom)")
+    parser.add_argument("--epoch", type=int, default=0,
+                        help="Derive: epoch for -i/fleet (0); rotate counts wall-clock intervals instead")
+    parser.add_argument("--wifi", nargs="+", metavar="GLOB",
+                        help="Wi-Fi mode: new MAC on matching wireless interfaces after every disconnect "
+                             "and idle scan, before the next association (nl80211, Linux)")
+    parser.add_argument("--restore-all", action="store_true",
+                        help="Restore every interface with a saved original MAC, in parallel")
+    parser.add_argument("--deadline", type=float, default=10, help="Restore: give up after this many seconds (10)")
+    parser.add_argument("--store", metavar="PATH", default=mac_store.default_store_path(),
+                        help="Journal of original MACs")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="Export per-step timings: Prometheus textfile if PATH ends in .prom, else JSON lines")
+    parser.add_argument("--ready-timeout", type=float, default=10,
+                        help="Seconds to wait for carrier/IP to come back after a change (10, 0 = don't wait)")
+    parser.add_argument("--oui-compile", nargs="+", metavar="FILE",
+                        help="Compile IEEE registry files (oui.csv/oui.txt, mam.csv, oui36.csv) into the vendor index")
+    parser.add_argument("--oui-index", metavar="PATH", default=oui_index.default_index_path(),
+                        help="Location of the compiled vendor index")
+    parser.add_argument("-g", "--generate", type=int, metavar="N",
+                        help="Print N unique locally administered MACs (no interface is touched)")
+    parser.add_argument("--prefix", help="Generate/derive: vendor prefix to put in front, e.g. 00:1A:11")
+    parser.add_argument("--vendor", help="Generate: vendor preset to draw prefixes from, e.g. 'Apple (USA)'")
+    parser.add_argument("-o", "--output", help="Generate: write MACs to this file instead of stdout")
+    parser.add_argument("-a", "--attribute", nargs="+", metavar="FILE",
+                        help="Vendor breakdown of MAC lists, /proc/net/arp, 'ip neigh' dumps or pcap files ('-' = stdin)")
+    parser.add_argument("--top", type=int, default=20, help="Attribute: number of vendors to show (default 20)")
+    parser.add_argument("--local-as-vendor", action="store_true",
+                        help="Attribute: look up locally administered MACs with the local bit cleared")
 
     args = parser.parse_args()
+    if args.mac and not mac_core.MAC_ADDRESS.match(args.mac):
+        # Before anything is touched - ip/ifconfig would only fail after taking the link down
+        parser.error(f"-m: invalid MAC address {args.mac!r} (expected e.g. 02:1A:2B:3C:4D:5E)")
+    if args.mac and args.derive is not None:
+        parser.error("-m and --derive both choose the MAC - use one of them")
+    if args.rotate:
+        try:
+            parse_rotation_specs(args.rotate, args.interval)
+        except ValueError as e:
+            parser.error(f"--rotate: {e}")
+
+    if args.oui_compile:
+        start = time.perf_counter()
+        count = oui_index.compile_index(args.oui_compile, args.oui_index)
+        print(f"[+] Indexed {count} assignments into {args.oui_index} "
+              f"({os.path.getsize(args.oui_index) // 1024} KiB, {time.perf_counter() - start:.2f}s)")
+        return
+
+    if args.generate:
+        generate_macs(args.generate, args.prefix, args.vendor, args.output)
+        return
+
+    if args.attribute:
+        attribute_macs(args.attribute, args.oui_index, args.top, args.local_as_vendor)
+        return
+
+    metrics = mac_metrics.Metrics(args.metrics)
+    if args.metrics:
+        atexit.register(metrics.flush, True)
+    spoofer = MACSpoofer(args.store, metrics, args.ready_timeout)
+    if args.derive is not None:
+        if not args.key_file:
+            print("[-] --derive needs a key: --key-file PATH or MAC_SPOOFER_KEY_FILE")
+            return
+        try:
+            spoofer.deriver = mac_generator.MACDeriver(mac_generator.load_key(args.key_file), args.derive,
+                                                       args.prefix)
+        except (OSError, ValueError) as e:
+            print(f"[-] {e}")
+            return
+        spoofer.derive_epoch = args.epoch
 
-    spoofer = MACSpoofer()
+    namespaces = None
+    if args.netns:
+        if spoofer.os_type != "Linux":
+            print("[-] Network namespaces only exist on Linux")
+            return
+        namespaces = spoofer.find_namespaces(args.netns)
+        if not namespaces:
+            print("[-] No network namespaces match the given pattern(s)")
+            return
 
     if args.list:
+        if namespaces:
+            spoofer.list_namespaces(namespaces, args.jobs)
+            return
         print("[*] Network Interfaces:")
         spoofer.list_interfaces()
         return
 
+    if args.restore_all:
+        if spoofer.os_type == "Windows":
+            print("[-] Restore all is only supported on Linux/macOS")
+            return
+        spoofer.restore_all(args.deadline, args.jobs)
+        return
+
+    if args.plan:
+        if spoofer.os_type == "Windows":
+            print("[-] Plans are only supported on Linux/macOS")
+            return
+        if not spoofer.run_plan(args.plan, args.jobs, args.dry_run):
+            sys.exit(1)
+        return
+
+    if args.rotate:
+        if spoofer.os_type == "Windows":
+            print("[-] Rotation is only supported on Linux/macOS")
+            return
+        if args.restore_on_exit:
+            mac_store.restore_on_exit(lambda: spoofer.restore_all(args.deadline, args.jobs))
+        rotate_interfaces(spoofer, args.rotate, args, namespaces)
+        return
+
+    if args.wifi:
+        if spoofer.os_type != "Linux":
+            print("[-] Wi-Fi mode needs nl80211 (Linux)")
+            return
+        if args.restore_on_exit:
+            mac_store.restore_on_exit(lambda: spoofer.restore_all(args.deadline, args.jobs))
+        watch_wifi(spoofer, args.wifi, args)
+        return
+
+    if args.fleet:
+        if spoofer.os_type == "Windows":
+            print("[-] Fleet mode is only supported on Linux/macOS")
+            return
+        if args.mac:
+            print("[!] Ignoring -m in fleet mode - each interface gets its own MAC")
+        interfaces = spoofer.match_interfaces(args.fleet, args.exclude, args.up_only, namespaces)
+        if not interfaces:
+            print("[-] No interfaces match the given pattern(s)")
+            return
+        where = f" in {len(namespaces)} namespaces" if namespaces else ""
+        print(f"[*] Fleet: {len(interfaces)} interfaces{where}, {args.jobs} in flight")
+        results, elapsed = spoofer.spoof_fleet(interfaces, args.jobs)
+        spoofer.print_fleet_report(results, elapsed)
+        return
+
     if not args.interface:
         print("[-] Please specify an interface with -i")
         print("[*] Use -l to list available interfaces")
         return
 
-    if args.random or not args.mac:
-        new_mac = spoofer.generate_random_mac()
+    if spoofer.deriver is not None:
+        spoofer.change_mac(args.interface, spoofer.derive_mac(args.interface, args.epoch))
+    elif args.random or not args.mac:
+        new_mac = spoofer.generate_random_mac(claim=True)
         spoofer.change_mac(args.interface, new_mac)
     else:
         spoofer.change_mac(args.interface, args.mac)
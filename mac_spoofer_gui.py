@@ -5,36 +5,92 @@ A graphical interface to spoof MAC addresses with vendor presets
 Requires administrator/root privileges on Windows
 """
 
+import time
+STARTED = time.perf_counter()  # Reference for the cold-start -> first-paint log line
+
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
-import subprocess
 import re
 import random
-import platform
-import ctypes
 import sys
-import time
+import os
+import json
+import queue
+import collections
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import mac_core
+import mac_netlink
+import oui_index
+import mac_store
+import mac_metrics
+import mac_log
+import mac_scheduler
+
+RESTORE_DEADLINE = 15  # Seconds "Restore All" may take before giving up
+LOG_VIEW_LINES = 2000  # Lines kept in the log view (the log file keeps everything)
+LOG_FLUSH_MS = 100  # Messages are written to the log view in one batch per interval
+STATS_POLL_MS = 1000  # Stats polling interval where there are no netlink events
+PULSE_MS = 50  # Status indicator animation step (20fps)
+
+
+def default_snapshot_path():
+    """Last session's interfaces and MACs, kept next to the original MAC journal"""
+    return os.path.join(os.path.dirname(mac_store.default_store_path()), "gui-snapshot.json")
 
-# Windows-only module - import conditionally for cross-platform compatibility
-try:
-    import winreg
-except ImportError:
-    winreg = None  # Linux/macOS don't have Windows Registry
 
-class MACSpooferGUI:
+def default_log_path():
+    """Full GUI log history (JSON lines, size-rotated), next to the original MAC journal"""
+    return os.path.join(os.path.dirname(mac_store.default_store_path()), "gui-log.jsonl")
+
+
+class MACSpooferGUI(mac_core.SpooferCore):
     def __init__(self, root):
+        # Per-step timings; exported when MAC_SPOOFER_METRICS names a .prom or JSON lines file
+        super().__init__(metrics=mac_metrics.Metrics(os.environ.get("MAC_SPOOFER_METRICS")))
+        # Interfaces in matching network namespaces are listed too, as "<netns>/<interface>"
+        self.netns_patterns = tuple(os.environ.get("MAC_SPOOFER_NETNS", "").split())
         self.root = root
+        # Every periodic UI callback; paused while the window is hidden or unfocused
+        self.scheduler = mac_scheduler.Scheduler(root)
         self.root.title("🎭 MAC Address Spoofer")
         self.root.geometry("800x600")
         self.root.minsize(550, 480)  # Ensure Log and System Stats always visible
         self.root.resizable(True, True)
 
-        self.os_type = platform.system()
-        self.original_macs = {}
+        # Messages waiting for the next batched write to the log view (oldest dropped past the cap)
+        self.log_lock = threading.Lock()
+        self.log_pending = collections.deque(maxlen=LOG_VIEW_LINES)
+        self.log_dropped = 0
+        self.log_flush_scheduled = False
+        # Every message also goes to a JSON lines file; MAC_SPOOFER_LOG overrides where
+        try:
+            self.file_log = mac_log.JSONLog(os.environ.get("MAC_SPOOFER_LOG") or default_log_path())
+        except OSError:
+            self.file_log = None  # Read-only/unavailable state dir - the log view still works
+
+        self.restore_at_exit = False
+        self.exit_hook = None  # atexit/SIGTERM hook, armed by "Restore all on exit"
+
         self.current_interface = None
         self.current_adapter_guid = None
         self.is_spoofed = False
 
+        self.netlink_monitor = None
+        self.probe_thread = None  # Background interface probe in flight
+
+        # Interfaces/MACs from the last session, shown until the live probe answers
+        self.snapshot_path = default_snapshot_path()
+        self.snapshot = {"selected": None, "interfaces": [], "details": {}}
+
+        # Work posted from background threads, run on the Tk thread
+        self.ui_queue = queue.Queue()
+
+        # Spoof/restore run on a single worker so the window never freezes
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="spoof-worker")
+        self.operation = None  # Future of the operation in flight
+
         # Animation state for status indicator
         self.pulse_active = False
         self.pulse_brightness = 1.0
@@ -49,64 +105,22 @@ class MACSpooferGUI:
         self.root.configure(bg=self.bg_color)
 
         # Vendor MAC prefixes (OUI - Organizationally Unique Identifier)
-        # Comprehensive list from IEEE OUI database with country information
-        self.vendor_macs = {
-            "Apple (USA)": ["00:03:93", "00:05:02", "00:0A:27", "00:0A:95", "00:0D:93", "00:10:FA", "00:11:24", "00:14:51", "00:16:CB", "00:17:F2"],
-            "Samsung (Korea)": ["00:00:F0", "00:02:78", "00:07:AB", "00:09:18", "00:0D:AE", "00:12:47", "00:13:77", "00:15:B9", "00:16:32", "00:1A:8A"],
-            "Huawei (China)": ["00:18:82", "00:1E:10", "00:25:9E", "00:46:4B", "00:66:4B", "00:E0:FC", "04:C0:6F", "08:19:A6", "10:47:80", "20:08:ED"],
-            "Cisco (USA)": ["00:00:0C", "00:01:42", "00:01:43", "00:01:63", "00:01:64", "00:01:96", "00:02:3D", "00:02:FC", "00:03:6B", "00:03:FD"],
-            "Dell (USA)": ["00:06:5B", "00:08:74", "00:0B:DB", "00:0D:56", "00:11:43", "00:12:3F", "00:13:72", "00:14:22", "00:15:C5", "00:16:F0"],
-            "HP (USA)": ["00:01:E6", "00:01:E7", "00:04:EA", "00:08:83", "00:0E:7F", "00:10:E3", "00:11:0A", "00:12:79", "00:13:21", "00:14:38"],
-            "Intel (USA)": ["00:02:B3", "00:03:47", "00:04:23", "00:07:E9", "00:0E:0C", "00:13:02", "00:13:20", "00:15:00", "00:16:6F", "00:19:D1"],
-            "Microsoft (USA)": ["00:03:FF", "00:0D:3A", "00:12:5A", "00:15:5D", "00:17:FA", "00:50:F2", "28:18:78", "7C:1E:52", "DC:B4:C4"],
-            "Google (USA)": ["00:1A:11", "3C:5A:B4", "54:60:09", "6C:AD:F8", "94:EB:2C", "F4:F5:E8", "F8:8F:CA"],
-            "Amazon (USA)": ["0C:47:C9", "44:65:0D", "68:37:E9", "74:C2:46", "84:D6:D0", "AC:63:BE", "F0:D2:F1"],
-            "Lenovo (China)": ["00:21:86", "00:23:24", "00:26:6C", "54:42:49", "68:F7:28", "70:F3:95", "A4:4E:31", "BC:30:5B"],
-            "ASUS (Taiwan)": ["00:0C:6E", "00:0E:A6", "00:11:2F", "00:13:D4", "00:15:F2", "00:17:31", "00:1A:92", "00:1D:60", "08:60:6E", "30:85:A9"],
-            "TP-Link (Hong Kong)": ["00:0A:EB", "00:27:19", "14:CF:92", "50:C7:BF", "A0:F3:C1", "C4:6E:1F", "EC:08:6B"],
-            "D-Link (Taiwan)": ["00:05:5D", "00:0D:88", "00:11:95", "00:13:46", "00:15:E9", "00:17:9A", "00:19:5B", "00:1B:11", "1C:7E:E5", "34:08:04"],
-            "Netgear (USA)": ["00:09:5B", "00:0F:B5", "00:14:6C", "00:1B:2F", "00:1E:2A", "00:1F:33", "00:22:3F", "00:24:B2", "20:E5:2A", "74:44:01"],
-            "Nokia (Finland)": ["00:02:EE", "00:0B:E1", "00:0E:ED", "00:12:62", "00:15:A0", "00:18:13", "00:19:2D", "00:1A:16", "00:1B:AF"],
-            "Sony (Japan)": ["00:00:95", "00:04:1F", "00:0A:D9", "00:0E:07", "00:13:15", "00:16:20", "00:19:63", "00:1C:A4", "00:1E:45", "00:23:45"],
-            "LG (Korea)": ["00:1C:62", "00:1E:75", "00:22:A9", "10:68:3F", "20:21:A5", "58:A2:B5", "70:05:14", "98:D6:F7", "A8:16:B2"],
-            "Motorola (USA)": ["00:0A:28", "00:0E:C7", "00:23:68", "00:24:37", "40:83:DE", "5C:0E:8B", "60:BE:B5", "C4:7D:CC", "E0:75:7D"],
-            "HTC (Taiwan)": ["00:23:76", "38:E7:D8", "50:2E:5C", "7C:61:93", "84:7A:88", "A0:F4:50", "BC:CF:CC", "E8:99:C4"],
-            "Xiaomi (China)": ["00:9E:C8", "0C:1D:AF", "34:CE:00", "64:09:80", "64:B4:73", "78:11:DC", "8C:BE:BE", "98:FA:E3", "9C:99:A0"],
-            "OPPO (China)": ["1C:77:F6", "38:29:5A", "88:D5:0C", "A0:93:47", "B8:37:65", "C0:9F:05", "D4:50:3F", "E4:47:90"],
-            "Vivo (China)": ["2C:AB:A4", "3C:F5:91", "50:76:AF", "7C:1D:D9", "A4:50:46", "BC:76:5E", "D8:55:A3", "EC:1D:8B"],
-            "ZTE (China)": ["00:19:C6", "00:25:12", "34:4B:50", "48:28:2F", "B0:75:D5", "E0:C3:F3", "F8:DF:A8"],
-            "Toshiba (Japan)": ["00:00:39", "00:08:0D", "00:15:B7", "24:2F:FA", "98:6D:C8", "E8:9D:87", "FC:00:12"],
-            "Nintendo (Japan)": ["00:09:BF", "00:16:56", "00:17:AB", "00:19:1D", "00:1A:E9", "00:1B:7A", "00:1C:BE", "00:1E:35", "18:2A:7B", "34:AF:2C"],
-            "Broadcom (USA)": ["00:05:B5", "00:0A:F7", "00:10:18", "18:C0:86", "D4:01:29"],
-            "Qualcomm (USA)": ["00:A0:C6", "64:9C:81", "88:12:4E", "8C:FD:F0"],
-            "Nvidia (USA)": ["00:04:4B"],
-            "Espressif (China)": ["18:FE:34", "24:0A:C4", "30:AE:A4", "60:01:94", "A0:20:A6", "AC:D0:74"],
-            "Texas Instruments (USA)": ["00:17:E9", "00:17:EB", "00:18:31", "00:1A:B6", "00:22:A5", "08:00:28", "10:2E:AF"],
-            "Roku (USA)": ["00:0D:4B", "08:05:81", "AC:3A:7A", "B0:A7:37", "B8:3E:59", "CC:6D:A0", "D0:4D:2C", "DC:3A:5E"],
-            "Ubiquiti (USA)": ["00:15:6D", "00:27:22", "24:A4:3C", "68:72:51", "80:2A:A8", "DC:9F:DB", "F0:9F:C2"],
-            "Aruba Networks (USA)": ["00:0B:86", "00:1A:1E", "00:24:6C", "20:4C:03", "24:DE:C6", "6C:F3:7F", "94:B4:0F", "D8:C7:C8"],
-            "Juniper Networks (USA)": ["00:05:85", "00:12:1E", "00:17:CB", "00:19:E2", "00:1F:12", "00:21:59", "00:23:9C", "00:26:88", "28:8A:1C", "54:E0:32"],
-            "Ruckus Wireless (USA)": ["00:13:92", "00:24:82", "24:C9:A1", "50:A7:33", "54:3D:37", "84:D4:7E", "C4:10:8A", "E4:5D:51"],
-            "IBM (USA)": ["00:00:81", "00:04:AC", "00:06:29", "6C:AE:8B", "74:99:75"],
-            "3Com (USA)": ["00:01:02", "00:01:03", "00:05:1A", "00:0A:04", "00:10:4B", "00:20:AF", "00:50:04", "00:60:08"],
-            "Linksys (USA)": ["00:04:5A", "00:06:25", "00:0C:41", "00:0F:66", "00:12:17", "00:13:10", "00:14:BF", "00:16:B6", "48:F8:B3", "98:FC:11"],
-            "Belkin (USA)": ["00:11:50", "00:17:3F", "00:1C:DF", "00:30:BD", "08:86:3B", "94:10:3E", "EC:1A:59"],
-            "Panasonic (Japan)": ["00:0F:12", "00:1B:D3", "04:20:9A", "30:4C:7E", "8C:C1:21", "D8:AF:F1", "E0:EE:1B"],
-            "Fujitsu (Japan)": ["00:00:0E", "00:0B:5D", "00:10:55", "00:17:42", "08:E5:DA", "50:26:90", "90:1B:0E", "B0:AC:FA"],
-            "Realme (China)": ["7E:3E:3A", "A0:15:65", "C4:06:83", "D4:6E:5C", "E8:9F:80", "F0:E3:11"],
-            "Honor (China)": ["10:2A:B3", "20:76:00", "28:D1:27", "70:66:1B", "9C:28:EF", "C0:84:7D", "E4:A7:C5"],
-        }
+        # Full IEEE registry when compiled (memory-mapped), built-in sample otherwise
+        self.oui = oui_index.load_default()
+        self.vendor_names = list(oui_index.VENDOR_PRESETS)
 
         self.setup_styles()
         self.setup_ui()
-        self.check_admin()
-        self.refresh_interfaces()
+        # Paint straight from the cached snapshot; the live probe starts once the window is up
+        self.show_snapshot()
+        self.root.after_idle(self.on_first_paint)
 
         # Bind theme switch keys
         self.root.bind('<t>', lambda event: self.cycle_theme())
         self.root.bind('<T>', lambda event: self.cycle_theme())
         self.root.bind('<s>', lambda event: self.randomize_skittles())
         self.root.bind('<S>', lambda event: self.randomize_skittles())
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def setup_themes(self):
         """Setup color themes"""
@@ -366,8 +380,7 @@ class MACSpooferGUI:
         """Check if running with admin privileges"""
         try:
             if self.os_type == "Windows":
-                is_admin = ctypes.windll.shell32.IsUserAnAdmin()
-                if not is_admin:
+                if not mac_core.is_admin():
                     messagebox.showwarning("Admin Required",
                         "This application requires administrator privileges.\n"
                         "Please run as administrator for full functionality.")
@@ -435,7 +448,7 @@ class MACSpooferGUI:
 
         ttk.Label(vendor_frame, text="Select Vendor:").grid(row=0, column=0, sticky=tk.W, padx=5)
         self.vendor_combo = ttk.Combobox(vendor_frame, state="readonly",
-                                        values=list(self.vendor_macs.keys()), width=20)
+                                        values=self.vendor_names, width=20)
         self.vendor_combo.grid(row=0, column=1, padx=5, sticky=(tk.W, tk.E))
 
         ttk.Button(vendor_frame, text="Random Vendor",
@@ -468,6 +481,24 @@ class MACSpooferGUI:
                                       command=self.toggle_spoof, width=22, style='Large.TButton')
         self.spoof_button.pack(pady=5)
 
+        # Progress of the running operation + cancel
+        progress_frame = ttk.Frame(control_frame)
+        progress_frame.pack()
+        self.progress_label = ttk.Label(progress_frame, text="", font=('Arial', 9, 'italic'))
+        self.progress_label.pack(side=tk.LEFT, padx=5)
+        self.cancel_button = ttk.Button(progress_frame, text="Cancel",
+                                       command=self.cancel_operation, state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.LEFT, padx=5)
+
+        # Restore every interface we ever changed, now or when the app exits
+        restore_frame = ttk.Frame(control_frame)
+        restore_frame.pack()
+        ttk.Button(restore_frame, text="Restore All",
+                  command=self.restore_all).pack(side=tk.LEFT, padx=5)
+        self.restore_at_exit_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(restore_frame, text="Restore all on exit", variable=self.restore_at_exit_var,
+                       command=self.toggle_restore_at_exit).pack(side=tk.LEFT, padx=5)
+
         # Bottom section container
         bottom_frame = ttk.Frame(main_frame)
         bottom_frame.grid(row=6, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), pady=5)
@@ -521,20 +552,118 @@ class MACSpooferGUI:
         self.log("MAC Spoofer initialized")
         self.log(f"Operating System: {self.os_type}")
         self.log(f"Current Theme: {self.current_theme_name}")
-
-        # Start live stats update
+        if self.oui:
+            self.log(f"OUI registry: {len(self.oui)} assignments (memory-mapped)")
+        if self.helper:
+            self.log(f"Privileged helper: {self.helper.path}")
+
+        # Background threads hand work to the UI through ui_queue
+        self.root.bind("<<UIQueue>>", self.drain_ui_queue)
+        self.root.after_idle(self.drain_ui_queue)
+
+        # Minimized/hidden or unfocused windows get no animation, polling or log view updates
+        for sequence in ("<Map>", "<Unmap>", "<FocusIn>", "<FocusOut>"):
+            self.root.bind(sequence, self.on_window_state, add="+")
+        self.activity_check_pending = False
+
+        # Start live stats update (event-driven on Linux, polled elsewhere).
+        # Link/address events keep the interface registry current, so refreshes
+        # never re-dump; neighbor events keep the in-use MAC set current for collision checks
+        self.netlink_monitor = self.watch_interfaces(
+            self.on_netlink_event, mac_netlink.DEFAULT_GROUPS | mac_netlink.RTMGRP_NEIGH)
+        if self.netlink_monitor:
+            self.log("Live stats: netlink events")
         self.update_stats_live()
 
+    def on_first_paint(self):
+        """Window is drawn - report cold-start time, then probe the real state (Tk thread)"""
+        self.root.update_idletasks()  # Flush pending geometry/redraws so the time covers them
+        source = "cached snapshot" if self.snapshot["interfaces"] else "no snapshot yet"
+        self.log(f"First paint {(time.perf_counter() - STARTED) * 1000:.0f} ms after start ({source})")
+        self.refresh_interfaces()
+        self.check_admin()
+
+    def post_ui(self, callback, *args):
+        """Run callback(*args) on the Tk thread - safe to call from any thread"""
+        self.ui_queue.put((callback, args))
+        try:
+            self.root.event_generate("<<UIQueue>>", when="tail")
+        except (tk.TclError, RuntimeError):
+            pass  # Mainloop not running (yet) - picked up by the next drain
+
+    def drain_ui_queue(self, event=None):
+        """Run everything background threads have posted"""
+        while True:
+            try:
+                callback, args = self.ui_queue.get_nowait()
+            except queue.Empty:
+                return
+            callback(*args)
+
+    def on_netlink_event(self, event):
+        """Netlink monitor callback (reader thread)"""
+        if self.used_macs is not None:
+            if event["kind"] == "resync":
+                self.load_used_macs(reload=True)
+            else:
+                self.used_macs.apply(event)
+        # Neighbor churn only matters to the in-use set, not the UI
+        if event["kind"] != "neigh":
+            self.post_ui(self.handle_netlink_event, event)
+
+    def handle_netlink_event(self, event):
+        """Refresh stats when the selected interface changes (Tk thread)"""
+        if event["kind"] == "resync" or event["name"] == self.current_interface:
+            self.refresh_stats()
+
     def update_stats_live(self):
         """Update system stats panel in real-time"""
-        if self.current_interface:
-            # Get current MAC and IP
-            current_mac = self.get_current_mac(self.current_interface)
-            ip_address = self.get_ip_address(self.current_interface)
+        self.refresh_stats()
+
+        # Netlink events drive updates on Linux; poll every 1000ms (1 second) otherwise
+        if not self.netlink_monitor:
+            self.scheduler.every("stats", STATS_POLL_MS, self.refresh_stats)
 
-            # Always display Original MAC (never changes once stored)
-            original_mac = self.original_macs.get(self.current_interface, "Not stored")
-            self.stats_original_mac.config(text=original_mac)
+    def on_window_state(self, event=None):
+        """Map/Unmap/FocusIn/FocusOut: re-check activity once the burst of events has settled"""
+        if not self.activity_check_pending:
+            self.activity_check_pending = True
+            self.root.after_idle(self.update_activity)
+
+    def update_activity(self):
+        """Pause or resume the scheduler's tasks as the window is hidden/unfocused or back"""
+        self.activity_check_pending = False
+        try:
+            focused = self.root.focus_displayof() is not None
+        except KeyError:
+            focused = True  # Combobox drop-down has the focus - Tk cannot name it
+        active = focused and bool(self.root.winfo_viewable())
+        if self.scheduler.set_active(active):
+            rate = self.scheduler.wakeups_per_second(not active)
+            state = "active" if active else "inactive"
+            if self.file_log:
+                self.file_log.log(f"Window {state}: timers {'resumed' if active else 'paused'}",
+                                  event="scheduler", window=state,
+                                  wakeups_per_second=round(rate, 3))
+
+    def refresh_stats(self):
+        """Read current MAC/IP of the selected interface into the stats panel"""
+        if self.current_interface:
+            # Get current MAC and IP (one netlink snapshot on Linux, no subprocess)
+            state = self.get_interface_states().get(self.current_interface)
+            if state:
+                current_mac = state["mac"]
+                ip_address = state["ipv4"][0] if state["ipv4"] else "N/A"
+            else:
+                current_mac = self.get_current_mac(self.current_interface)
+                ip_address = self.get_ip_address(self.current_interface)
+
+            # Journaled original if we changed it, else the hardware MAC (as read_interface does)
+            cached = self.snapshot["details"].get(self.current_interface) or {}
+            original_mac = (self.original_macs.get(self.current_interface)
+                            or (state and state["perm_mac"]) or cached.get("original") or current_mac)
+            if original_mac:
+                self.stats_original_mac.config(text=original_mac)
 
             # Update Current MAC (live, changes when spoofed)
             if current_mac:
@@ -543,304 +672,207 @@ class MACSpooferGUI:
 
             # Update IP Address (live, changes with VPN/network)
             self.stats_ip.config(text=ip_address)
-
-        # Schedule next update in 1000ms (1 second)
-        self.root.after(1000, self.update_stats_live)
+            if current_mac:
+                # Keep the startup snapshot current for the next session
+                self.snapshot["details"][self.current_interface] = {
+                    "mac": current_mac, "ip": ip_address, "original": original_mac}
 
     def log(self, message):
-        """Add message to log"""
-        self.log_text.insert(tk.END, f"{message}\n")
+        """Add message to log (safe to call from worker threads)
+
+        The file write happens on the log writer thread; the log view is
+        updated by flush_log at most once per LOG_FLUSH_MS, however many
+        messages arrive in between.
+        """
+        if self.file_log:
+            self.file_log.log(message)
+        with self.log_lock:
+            if len(self.log_pending) == self.log_pending.maxlen:
+                self.log_dropped += 1
+            self.log_pending.append(message)
+            if self.log_flush_scheduled:
+                return
+            self.log_flush_scheduled = True
+        self.post_ui(self.scheduler.once, "log", LOG_FLUSH_MS, self.flush_log)
+
+    def flush_log(self):
+        """Write queued messages to the log view in one insert and trim it to LOG_VIEW_LINES"""
+        with self.log_lock:
+            lines, dropped = list(self.log_pending), self.log_dropped
+            self.log_pending.clear()
+            self.log_dropped = 0
+            self.log_flush_scheduled = False
+        if dropped:
+            where = f"see {self.file_log.path}" if self.file_log else "no log file"
+            lines.insert(0, f"... {dropped} messages not shown ({where})")
+        self.log_text.insert(tk.END, "".join(f"{line}\n" for line in lines))
+        # The last line is the empty one after the final newline
+        excess = int(self.log_text.index("end-1c").split(".")[0]) - 1 - LOG_VIEW_LINES
+        if excess > 0:
+            self.log_text.delete("1.0", f"{excess + 1}.0")
         self.log_text.see(tk.END)
 
-    def get_interfaces(self):
-        """Get list of network interfaces (only connected/active ones)"""
-        interfaces = []
-        try:
-            if self.os_type == "Windows":
-                result = subprocess.check_output("netsh interface show interface",
-                                                shell=True, stderr=subprocess.DEVNULL).decode()
-                lines = result.split('\n')[3:]  # Skip header
-                for line in lines:
-                    if line.strip():
-                        parts = line.split()
-                        # Only include connected interfaces (filter out disconnected Wintun, etc.)
-                        if len(parts) >= 4 and parts[1] == "Connected":
-                            interface_name = ' '.join(parts[3:])
-                            interfaces.append(interface_name)
-            else:
-                result = subprocess.check_output("ip link show", shell=True).decode()
-                for line in result.split('\n'):
-                    match = re.search(r'^\d+:\s+(\S+):', line)
-                    if match:
-                        interfaces.append(match.group(1))
-        except Exception as e:
-            self.log(f"Error getting interfaces: {e}")
-        return interfaces
+    def progress(self, message):
+        """Report a step of the running operation (worker thread)"""
+        self.post_ui(self.progress_label.config, {"text": message})
 
-    def get_current_mac(self, interface):
-        """Get the current MAC address of an interface"""
-        try:
-            if self.os_type == "Windows":
-                # Use PowerShell Get-NetAdapter to get actual active MAC (including spoofed)
-                cmd = f'powershell "Get-NetAdapter -Name \'{interface}\' | Select-Object -ExpandProperty MacAddress"'
-                result = subprocess.check_output(cmd, shell=True, stderr=subprocess.DEVNULL).decode().strip()
-                # PowerShell returns MAC in format: XX-XX-XX-XX-XX-XX
-                if result and re.match(r"^([0-9A-Fa-f]{2}[-:]){5}([0-9A-Fa-f]{2})$", result):
-                    # Convert to colon format for consistency
-                    return result.replace('-', ':')
-            else:
-                result = subprocess.check_output(f"ip link show {interface}", shell=True).decode()
-                mac_match = re.search(r"link/ether\s+([0-9A-Fa-f]{2}:){5}([0-9A-Fa-f]{2})", result)
-                if mac_match:
-                    return mac_match.group(0).split()[-1]
-        except Exception as e:
-            self.log(f"Error getting MAC: {e}")
-        return None
+    def alert(self, title, message):
+        """Show an error dialog (safe to call from worker threads)"""
+        self.post_ui(messagebox.showerror, title, message)
 
-    def get_ip_address(self, interface):
-        """Get the current IP address of an interface"""
+    def run_operation(self, description, func, *args, on_success=None):
+        """Run func(*args) on the worker; on_success(result) runs on the Tk thread"""
+        if self.operation and not self.operation.done():
+            self.log("Another operation is still running - cancel it or wait")
+            return
+        self.cancel_event.clear()
+        self.spoof_button.config(state=tk.DISABLED)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.progress_label.config(text=f"{description}...")
+        self.operation = self.executor.submit(func, *args)
+        self.operation.add_done_callback(
+            lambda future: self.post_ui(self.finish_operation, future, on_success))
+
+    def finish_operation(self, future, on_success):
+        """Re-enable the controls and hand the result back (Tk thread)"""
+        self.spoof_button.config(state=tk.NORMAL)
+        self.cancel_button.config(state=tk.DISABLED)
+        self.progress_label.config(text="")
         try:
-            if self.os_type == "Windows":
-                cmd = f'netsh interface ip show addresses "{interface}"'
-                result = subprocess.check_output(cmd, shell=True, stderr=subprocess.DEVNULL).decode()
-                ip_match = re.search(r"IP Address:\s+(\d+\.\d+\.\d+\.\d+)", result)
-                if ip_match:
-                    return ip_match.group(1)
-            else:
-                result = subprocess.check_output(f"ip addr show {interface}", shell=True).decode()
-                ip_match = re.search(r"inet\s+(\d+\.\d+\.\d+\.\d+)", result)
-                if ip_match:
-                    return ip_match.group(1)
+            result = future.result()
+        except mac_core.OperationCancelled:
+            self.log("Operation cancelled")
+            return
         except Exception as e:
-            pass  # Silently fail for IP
-        return "N/A"
+            self.log(f"Error: {e}")
+            return
+        if on_success and result:
+            on_success(result)
+
+    def cancel_operation(self):
+        """Cancel the operation in flight (takes effect at the next safe step)"""
+        if self.operation and not self.operation.done():
+            self.cancel_event.set()
+            self.cancel_button.config(state=tk.DISABLED)
+            self.progress_label.config(text="Cancelling...")
+            self.log("Cancelling operation...")
+
+    def on_close(self):
+        """Stop background work and close the window"""
+        self.cancel_event.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.metrics.flush(force=True)
+        self.save_snapshot()
+        self.log(f"Timer wakeups: {self.scheduler.wakeups_per_second(True):.1f}/s while active, "
+                 f"{self.scheduler.wakeups_per_second(False):.2f}/s while hidden or unfocused")
+        if self.netlink_monitor:
+            self.netlink_monitor.stop()
+        if self.file_log:
+            self.file_log.close()  # Writes what is still queued
+        self.root.destroy()
+
+    def show_snapshot(self):
+        """Fill the interface list and stats from the last session's snapshot (Tk thread)"""
+        try:
+            with open(self.snapshot_path) as f:
+                snapshot = json.load(f)
+            interfaces, selected, details = snapshot["interfaces"], snapshot["selected"], snapshot["details"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return  # First run or unreadable - the live probe fills everything in
+        self.snapshot = snapshot
+        self.interface_combo['values'] = interfaces
+        if selected in interfaces:
+            self.interface_combo.set(selected)
+            self.current_interface = selected
+            if details.get(selected):
+                self.show_details(details[selected])
+        self.log("Showing last session's interfaces until the live probe finishes")
+
+    def save_snapshot(self):
+        """Write interfaces and MACs for the next start's first paint"""
+        self.snapshot["selected"] = self.current_interface
+        tmp = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+            with open(tmp, "w") as f:
+                json.dump(self.snapshot, f)
+            os.replace(tmp, self.snapshot_path)
+        except OSError:
+            pass  # Only a startup cache - next start just probes without it
 
     def refresh_interfaces(self):
-        """Refresh the list of network interfaces"""
+        """Re-list interfaces and re-read the selected one on a background thread"""
+        if self.probe_thread and self.probe_thread.is_alive():
+            return
+        self.probe_thread = threading.Thread(target=self.probe, args=(self.interface_combo.get(),),
+                                             name="probe", daemon=True)
+        self.probe_thread.start()
+
+    def probe(self, selected):
+        """Live interface list plus MAC/IP of the selected one (probe thread)"""
+        start = time.perf_counter()
+        if self.netlink_monitor and self.used_macs is None and self.load_used_macs() is not None:
+            self.log(f"Collision check: {len(self.used_macs)} MACs in use on host/segment")
         interfaces = self.get_interfaces()
+        if selected not in interfaces:
+            selected = interfaces[0] if interfaces else None
+        details = self.read_interface(selected) if selected else None
+        self.post_ui(self.on_probed, interfaces, selected, details, time.perf_counter() - start)
+
+    def on_probed(self, interfaces, selected, details, elapsed):
+        """Replace cached values with the probe's results (Tk thread)"""
+        self.snapshot["interfaces"] = interfaces
         self.interface_combo['values'] = interfaces
-        if interfaces:
-            self.interface_combo.current(0)
-            self.on_interface_selected(None)
-        self.log("Interfaces refreshed")
+        chosen = self.interface_combo.get()
+        if selected and not (chosen in interfaces and chosen != selected):
+            # Unless the user picked another interface while the probe ran
+            self.interface_combo.set(selected)
+            self.current_interface = selected
+            self.show_interface(selected, details)
+        self.log(f"Interfaces refreshed ({elapsed * 1000:.0f} ms)")
+        self.save_snapshot()
+
+    def read_interface(self, interface):
+        """Current MAC, IP and original MAC of one interface (any thread)"""
+        current_mac = self.get_current_mac(interface)
+        if not current_mac:
+            return None
+        # Journaled original if we changed it before, else the hardware MAC
+        original_mac = self.original_macs.get(interface) or self.hardware_mac(interface, current_mac)
+        return {"mac": current_mac, "ip": self.get_ip_address(interface), "original": original_mac}
+
+    def show_details(self, details):
+        """Put one interface's MACs and IP in the labels (Tk thread)"""
+        self.current_mac_label.config(text=f"Current MAC: {details['mac']}")
+        self.stats_original_mac.config(text=details["original"])
+        self.stats_current_mac.config(text=details["mac"])
+        self.stats_ip.config(text=details["ip"])
+
+    def show_interface(self, interface, details):
+        """Show freshly read details of the selected interface (Tk thread)"""
+        if not details:
+            return
+        self.snapshot["details"][interface] = details
+        self.show_details(details)
+        self.log(f"Selected interface: {interface} (MAC: {details['mac']})")
+        if self.oui:
+            self.log(f"Original MAC vendor: {self.oui.describe(details['original'])}")
 
     def on_interface_selected(self, event):
         """Handle interface selection"""
         self.current_interface = self.interface_combo.get()
         if self.current_interface:
-            current_mac = self.get_current_mac(self.current_interface)
-            ip_address = self.get_ip_address(self.current_interface)
-
-            if current_mac:
-                # Store original MAC if not already stored
-                if self.current_interface not in self.original_macs:
-                    self.original_macs[self.current_interface] = current_mac
-                self.current_mac_label.config(text=f"Current MAC: {current_mac}")
-                self.log(f"Selected interface: {self.current_interface} (MAC: {current_mac})")
-
-                # Update stats panel
-                original_mac = self.original_macs.get(self.current_interface, "Not stored")
-                self.stats_original_mac.config(text=original_mac)
-                self.stats_current_mac.config(text=current_mac)
-                self.stats_ip.config(text=ip_address)
-
-    def generate_random_mac(self, prefix=None):
-        """Generate a random MAC address"""
-        if prefix:
-            # Use vendor prefix, but make it locally administered for Intel compatibility
-            mac_bytes = prefix.split(':')
-            # Convert first octet to locally administered (set bit 1)
-            first_octet = int(mac_bytes[0], 16) | 0x02
-            mac_bytes[0] = f"{first_octet:02X}"
-            # Add random bytes for last 3 octets
-            mac_bytes += [f"{random.randint(0, 255):02X}" for _ in range(3)]
-        else:
-            # Generate completely random MAC (locally administered)
-            first_octet = random.randint(0, 255) & 0xFE | 0x02
-            mac_bytes = [f"{first_octet:02X}"] + [f"{random.randint(0, 255):02X}" for _ in range(5)]
-        return ':'.join(mac_bytes)
-
-    def get_adapter_guid(self, interface_name):
-        """Get the adapter GUID from the interface name"""
-        try:
-            # Use PowerShell to get adapter GUID
-            cmd = f'powershell "Get-NetAdapter | Where-Object {{$_.Name -eq \'{interface_name}\' -or $_.InterfaceDescription -like \'*{interface_name}*\'}} | Select-Object -ExpandProperty InterfaceGuid"'
-            result = subprocess.check_output(cmd, shell=True, stderr=subprocess.DEVNULL).decode().strip()
-            if result:
-                return result
-        except:
-            pass
-        return None
-
-    def find_adapter_registry_key(self, interface_name):
-        """Find the adapter registry key path"""
-        try:
-            # Network adapters registry path
-            adapters_path = r"SYSTEM\CurrentControlSet\Control\Class\{4D36E972-E325-11CE-BFC1-08002BE10318}"
-
-            # Open the network adapters key
-            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, adapters_path, 0, winreg.KEY_READ) as adapters_key:
-                # Enumerate all subkeys
-                i = 0
-                while True:
-                    try:
-                        subkey_name = winreg.EnumKey(adapters_key, i)
-                        i += 1
-
-                        # Skip non-numeric keys
-                        if not subkey_name.isdigit():
-                            continue
-
-                        # Open each adapter subkey
-                        subkey_path = f"{adapters_path}\\{subkey_name}"
-                        try:
-                            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, subkey_path, 0, winreg.KEY_READ) as adapter_key:
-                                try:
-                                    # Get DriverDesc (adapter description)
-                                    desc, _ = winreg.QueryValueEx(adapter_key, "DriverDesc")
-
-                                    # Check if this matches our interface
-                                    if interface_name.lower() in desc.lower() or desc.lower() in interface_name.lower():
-                                        return subkey_path
-
-                                    # Also check NetCfgInstanceId
-                                    try:
-                                        instance_id, _ = winreg.QueryValueEx(adapter_key, "NetCfgInstanceId")
-                                        guid = self.get_adapter_guid(interface_name)
-                                        if guid and instance_id.lower() == guid.lower():
-                                            return subkey_path
-                                    except:
-                                        pass
-                                except:
-                                    pass
-                        except:
-                            pass
-                    except OSError:
-                        break
-        except Exception as e:
-            self.log(f"Registry search error: {e}")
-        return None
-
-    def change_mac_windows(self, interface, new_mac):
-        """Change MAC address on Windows using registry method"""
-        try:
-            # Clean MAC address (remove colons/dashes)
-            new_mac_clean = new_mac.replace(':', '').replace('-', '').upper()
-
-            self.log(f"Attempting to change MAC to {new_mac}")
-            self.log("Finding adapter in registry...")
-
-            # Find the adapter's registry key
-            registry_path = self.find_adapter_registry_key(interface)
-
-            if not registry_path:
-                self.log("ERROR: Could not find adapter in registry!")
-                self.log("Try selecting a different network adapter.")
-                return False
-
-            self.log(f"Found adapter at: {registry_path}")
-
-            # STEP 1: First restore original MAC (delete registry override)
-            # This ensures Intel adapters fully reset before applying new spoof
-            self.log("Clearing previous MAC override...")
-            try:
-                with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, registry_path, 0,
-                                   winreg.KEY_SET_VALUE) as key:
-                    try:
-                        winreg.DeleteValue(key, "NetworkAddress")
-                        self.log("Previous override cleared")
-                    except FileNotFoundError:
-                        self.log("No previous override found")
-            except PermissionError:
-                self.log("ERROR: Permission denied! Run as Administrator.")
-                messagebox.showerror("Permission Denied",
-                    "Administrator privileges required to modify registry.\n"
-                    "Please run this application as Administrator.")
-                return False
-
-            # STEP 2: Restart adapter to apply original MAC
-            self.log("Resetting adapter to hardware MAC...")
-            try:
-                disable_cmd = f'netsh interface set interface "{interface}" disable'
-                result = subprocess.run(disable_cmd, shell=True, capture_output=True, text=True)
-                if result.returncode != 0:
-                    self.log(f"Warning: Could not disable adapter: {result.stderr}")
-                else:
-                    time.sleep(3)
-                    self.log("Adapter disabled")
-
-                enable_cmd = f'netsh interface set interface "{interface}" enable'
-                result = subprocess.run(enable_cmd, shell=True, capture_output=True, text=True)
-                if result.returncode != 0:
-                    self.log(f"Warning: Could not enable adapter: {result.stderr}")
-                else:
-                    time.sleep(3)
-                    self.log("Adapter reset to hardware MAC")
-            except Exception as e:
-                self.log(f"Error resetting adapter: {e}")
-
-            # STEP 3: Now apply the new spoofed MAC
-            self.log(f"Applying new MAC: {new_mac}")
-            try:
-                with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, registry_path, 0,
-                                   winreg.KEY_SET_VALUE | winreg.KEY_READ) as key:
-                    winreg.SetValueEx(key, "NetworkAddress", 0, winreg.REG_SZ, new_mac_clean)
-                    self.log(f"Registry updated with new MAC: {new_mac_clean}")
-            except PermissionError:
-                self.log("ERROR: Permission denied! Run as Administrator.")
-                return False
-
-            # STEP 4: Restart adapter again to apply new spoofed MAC
-            self.log("Restarting adapter with new MAC...")
-            try:
-                disable_cmd = f'netsh interface set interface "{interface}" disable'
-                result = subprocess.run(disable_cmd, shell=True, capture_output=True, text=True)
-                if result.returncode != 0:
-                    self.log(f"Warning: Could not disable adapter: {result.stderr}")
-                else:
-                    time.sleep(3)
-                    self.log("Adapter disabled")
-
-                enable_cmd = f'netsh interface set interface "{interface}" enable'
-                result = subprocess.run(enable_cmd, shell=True, capture_output=True, text=True)
-                if result.returncode != 0:
-                    self.log(f"Warning: Could not enable adapter: {result.stderr}")
-                else:
-                    time.sleep(3)
-                    self.log("Adapter enabled")
-                    self.log("✓ MAC address changed successfully!")
-                    return True
-            except Exception as e:
-                self.log(f"Error restarting adapter: {e}")
-                self.log("Please manually disable/enable the adapter in Network Settings.")
-                return True  # Registry was set, just adapter restart failed
-
-            return True
-        except Exception as e:
-            self.log(f"Error: {e}")
-            return False
-
-    def change_mac_linux(self, interface, new_mac):
-        """Change MAC address on Linux/macOS"""
-        try:
-            subprocess.run(["sudo", "ip", "link", "set", interface, "down"], check=True)
-            subprocess.run(["sudo", "ip", "link", "set", interface, "address", new_mac], check=True)
-            subprocess.run(["sudo", "ip", "link", "set", interface, "up"], check=True)
-            self.log(f"MAC changed to {new_mac}")
-            return True
-        except Exception as e:
-            self.log(f"Error: {e}")
-            return False
+            self.show_interface(self.current_interface, self.read_interface(self.current_interface))
 
     def use_vendor_mac(self):
         """Select a random vendor and generate MAC preview"""
         # Automatically select a random vendor
-        vendor = random.choice(list(self.vendor_macs.keys()))
+        vendor = random.choice(self.vendor_names)
         self.vendor_combo.set(vendor)  # Update dropdown to show selected vendor
 
         # Generate MAC from vendor prefix
-        prefix = random.choice(self.vendor_macs[vendor])
-        new_mac = self.generate_random_mac(prefix)
+        prefix = oui_index.random_vendor_prefix(vendor, self.oui)
+        new_mac = self.generate_random_mac(prefix, upper=True)
 
         # Display in Custom MAC field for preview
         self.custom_mac_entry.delete(0, tk.END)
@@ -858,8 +890,8 @@ class MACSpooferGUI:
             return
 
         # Generate new MAC from selected vendor prefix
-        prefix = random.choice(self.vendor_macs[vendor])
-        new_mac = self.generate_random_mac(prefix)
+        prefix = oui_index.random_vendor_prefix(vendor, self.oui)
+        new_mac = self.generate_random_mac(prefix, upper=True)
 
         # Display in Custom MAC field for preview
         self.custom_mac_entry.delete(0, tk.END)
@@ -873,68 +905,23 @@ class MACSpooferGUI:
             messagebox.showwarning("No Interface", "Please select a network interface first")
             return
 
-        new_mac = self.generate_random_mac()
+        new_mac = self.generate_random_mac(upper=True)
         self.log(f"Generated random MAC: {new_mac}")
+        self.start_spoof(new_mac)
 
-        if self.change_mac(new_mac):
-            self.is_spoofed = True
-            self.update_status()
+    def start_spoof(self, new_mac):
+        """Change the selected interface's MAC in the background"""
+        self.run_operation("Spoofing", self.change_mac, new_mac, self.current_interface,
+                           on_success=lambda result: self.set_spoofed(True))
 
-    def change_mac(self, new_mac):
-        """Change MAC address"""
-        if self.os_type == "Windows":
-            return self.change_mac_windows(self.current_interface, new_mac)
-        else:
-            return self.change_mac_linux(self.current_interface, new_mac)
+    def set_spoofed(self, spoofed):
+        """Record spoof state and update the indicator (Tk thread)"""
+        self.is_spoofed = spoofed
+        self.update_status()
 
-    def restore_original_windows(self, interface):
-        """Restore original MAC on Windows by removing registry override"""
-        try:
-            self.log("Restoring original MAC address...")
-
-            # Find the adapter's registry key
-            registry_path = self.find_adapter_registry_key(interface)
-
-            if not registry_path:
-                self.log("ERROR: Could not find adapter in registry!")
-                return False
-
-            self.log(f"Found adapter at: {registry_path}")
-
-            # Delete the NetworkAddress registry value
-            try:
-                with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, registry_path, 0,
-                                   winreg.KEY_SET_VALUE) as key:
-                    try:
-                        winreg.DeleteValue(key, "NetworkAddress")
-                        self.log("Registry override removed")
-                    except FileNotFoundError:
-                        self.log("No registry override found (already using original MAC)")
-            except PermissionError:
-                self.log("ERROR: Permission denied! Run as Administrator.")
-                return False
-
-            # Restart adapter
-            self.log("Restarting network adapter...")
-            try:
-                disable_cmd = f'netsh interface set interface "{interface}" disable'
-                subprocess.run(disable_cmd, shell=True, capture_output=True)
-                time.sleep(1)
-                self.log("Adapter disabled")
-
-                enable_cmd = f'netsh interface set interface "{interface}" enable'
-                subprocess.run(enable_cmd, shell=True, capture_output=True)
-                time.sleep(2)
-                self.log("Adapter enabled")
-                self.log("✓ Original MAC address restored!")
-                return True
-            except Exception as e:
-                self.log(f"Error restarting adapter: {e}")
-                return True
-
-        except Exception as e:
-            self.log(f"Error: {e}")
-            return False
+    def change_mac(self, new_mac, interface=None):
+        """Change MAC address (runs on the worker thread)"""
+        return self.spoof(interface or self.current_interface, new_mac)
 
     def restore_original(self):
         """Restore original MAC address"""
@@ -951,16 +938,55 @@ class MACSpooferGUI:
 
         # On Windows, remove the registry override instead of setting a value
         if self.os_type == "Windows":
-            success = self.restore_original_windows(self.current_interface)
+            task = (self.restore_original_windows, self.current_interface)
         else:
-            success = self.change_mac(original_mac)
-
-        if success:
-            self.is_spoofed = False
-            self.update_status()
-            # Refresh MAC display
-            time.sleep(1)
-            self.on_interface_selected(None)
+            task = (self.change_mac, original_mac, self.current_interface)
+        interface = self.current_interface
+        self.run_operation("Restoring", *task, on_success=lambda result: self.on_restored(interface))
+
+    def on_restored(self, interface):
+        """Update status once the original MAC is back (Tk thread)"""
+        self.original_macs.forget(interface)
+        self.set_spoofed(False)
+        # The restore only returns once the adapter is back, so refresh right away
+        self.on_interface_selected(None)
+
+    def restore_all_now(self):
+        """Restore every journaled interface in parallel and log the outcome"""
+        summary = mac_store.restore_all(self.original_macs, self.restore_one, RESTORE_DEADLINE)
+        for interface, error in summary["failed"].items():
+            self.log(f"Restore failed on {interface}: {error}")
+        for interface in summary["timed_out"]:
+            self.log(f"Restore of {interface} did not finish within {RESTORE_DEADLINE}s")
+        self.log(f"Restored {len(summary['restored'])} interface(s) in {summary['elapsed']:.2f}s")
+        self.metrics.flush()
+        return summary
+
+    def restore_all(self):
+        """Restore All button - run the parallel restore on the worker"""
+        if not len(self.original_macs):
+            messagebox.showinfo("Info", "No original MACs stored")
+            return
+        self.log(f"Restoring {len(self.original_macs)} interface(s)...")
+        self.run_operation("Restoring all", self.restore_all_now, on_success=self.on_restored_all)
+
+    def on_restored_all(self, summary):
+        """Refresh state after Restore All (Tk thread)"""
+        if self.current_interface in summary["restored"]:
+            self.set_spoofed(False)
+        self.on_interface_selected(None)
+
+    def toggle_restore_at_exit(self):
+        """Arm (once) the exit/SIGTERM hook when the checkbox is ticked"""
+        self.restore_at_exit = self.restore_at_exit_var.get()
+        if self.restore_at_exit and not self.exit_hook:
+            self.exit_hook = mac_store.restore_on_exit(self.on_exit_restore)
+
+    def on_exit_restore(self):
+        """Exit hook: restore everything if the checkbox is still ticked"""
+        if self.restore_at_exit and len(self.original_macs):
+            self.cancel_event.clear()  # Set by on_close; the restore must not be cancelled
+            self.restore_all_now()
 
     def toggle_spoof(self):
         """Toggle spoofing on/off"""
@@ -977,20 +1003,18 @@ class MACSpooferGUI:
             if custom_mac and re.match(r"^([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})$", custom_mac):
                 # Use MAC from entry field
                 self.log(f"Using MAC from entry field: {custom_mac}")
-                if self.change_mac(custom_mac):
-                    self.is_spoofed = True
-                    self.update_status()
+                if self.used_macs is not None and custom_mac in self.used_macs:
+                    self.log("WARNING: This MAC is already in use on this host or network segment")
+                self.start_spoof(custom_mac)
             else:
                 # Fall back to vendor or random
                 vendor = self.vendor_combo.get()
                 if vendor:
                     # Use selected vendor MAC
-                    prefix = random.choice(self.vendor_macs[vendor])
-                    new_mac = self.generate_random_mac(prefix)
+                    prefix = oui_index.random_vendor_prefix(vendor, self.oui)
+                    new_mac = self.generate_random_mac(prefix, upper=True)
                     self.log(f"Generated {vendor} MAC: {new_mac}")
-                    if self.change_mac(new_mac):
-                        self.is_spoofed = True
-                        self.update_status()
+                    self.start_spoof(new_mac)
                 else:
                     # No vendor selected, use completely random MAC
                     self.use_random_mac()
@@ -1006,12 +1030,13 @@ class MACSpooferGUI:
             # Start pulsing animation
             if not self.pulse_active:
                 self.pulse_active = True
-                self.pulse_status_indicator()
+                self.scheduler.every("pulse", PULSE_MS, self.pulse_status_indicator)
         else:
             self.status_label.config(text="● ORIGINAL MAC", style='StatusGreen.TLabel', foreground='#00ff00')
             self.spoof_button.config(text="⚫ SPOOF ON")
             # Stop pulsing animation
             self.pulse_active = False
+            self.scheduler.cancel("pulse")
 
     def pulse_status_indicator(self):
         """Gentle pulsing animation for SPOOFED MAC indicator"""
@@ -1036,10 +1061,6 @@ class MACSpooferGUI:
         # Update the label color directly
         self.status_label.config(foreground=color)
 
-        # Continue animation (50ms = smooth 20fps)
-        if self.pulse_active:
-            self.root.after(50, self.pulse_status_indicator)
-
 def main():
     root = tk.Tk()
     app = MACSpooferGUI(root)
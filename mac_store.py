@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+MAC Address Spoofer - original MAC store
+Keeps each interface's hardware MAC in a small append-only journal that is
+fsync'd before any change is made, so originals survive crashes and
+reboots, and puts every tracked interface back in parallel on request
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import signal
+import threading
+
+COMPACT_AFTER = 512  # Journal lines replayed before it is rewritten as a snapshot
+
+
+def default_store_path():
+    """Per-user state location of the journal"""
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA", os.path.expanduser("~"))
+    else:
+        base = os.environ.get("XDG_STATE_HOME", os.path.join(os.path.expanduser("~"), ".local", "state"))
+    return os.path.join(base, "mac-spoofer", "originals.jsonl")
+
+
+class OriginalMACStore:
+    """Journaled interface -> original MAC map
+
+    Each update is JSON lines appended with one write and fsync'd before
+    the call returns, so a crash loses at most the update in progress; a
+    torn last line is skipped on replay. Lines appended by another process
+    (CLI and GUI running at once) are replayed before every read, and a
+    long journal is compacted into a snapshot through a temp file and
+    os.replace. The first MAC recorded for an interface wins until it is
+    forgotten after a successful restore.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_store_path()
+        self.lock = threading.Lock()
+        self.macs = {}
+        self.inode = None
+        self.offset = 0
+        self.lines = 0
+        with self.lock:
+            self.replay()
+
+    def replay(self):
+        """Apply journal lines written since the last replay (lock held)"""
+        try:
+            with open(self.path, "rb") as f:
+                inode = os.fstat(f.fileno()).st_ino
+                if inode != self.inode:
+                    # First read, or compacted by another process - start over
+                    self.inode, self.offset, self.lines, self.macs = inode, 0, 0, {}
+                f.seek(self.offset)
+                data = f.read()
+        except FileNotFoundError:
+            self.inode, self.offset, self.lines, self.macs = None, 0, 0, {}
+            return
+
+        end = data.rfind(b"\n") + 1  # Leave a torn tail for the next replay
+        for line in data[:end].splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # Torn by a crash, later terminated by the next append
+            if entry.get("op") == "set":
+                self.macs[entry["interface"]] = entry["mac"]
+            elif entry.get("op") == "del":
+                self.macs.pop(entry["interface"], None)
+            self.lines += 1
+        self.offset += end
+
+    def append(self, entries):
+        """Write journal entries in one write and fsync them (lock held)"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        data = b"".join(json.dumps(entry, separators=(",", ":")).encode() + b"\n" for entry in entries)
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            size = None
+        if size:
+            with open(self.path, "rb") as f:
+                f.seek(size - 1)
+                if f.read(1) != b"\n":
+                    data = b"\n" + data  # Terminate a line torn by a crash
+        with open(self.path, "ab") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        if size is None and os.name != "nt":
+            # Make the new directory entry itself durable
+            dir_fd = os.open(os.path.dirname(self.path) or ".", os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        self.replay()
+        if self.lines > max(COMPACT_AFTER, 2 * len(self.macs)):
+            self.compact()
+
+    def compact(self):
+        """Rewrite the journal as one 'set' line per tracked interface (lock held)"""
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            for interface, mac in self.macs.items():
+                f.write(json.dumps({"op": "set", "interface": interface, "mac": mac},
+                                   separators=(",", ":")).encode() + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self.inode = None  # Re-read the snapshot we just wrote
+        self.replay()
+
+    def record_many(self, originals):
+        """Journal {interface: mac} for interfaces not tracked yet; returns the new ones"""
+        with self.lock:
+            self.replay()
+            new = {interface: mac for interface, mac in originals.items() if interface not in self.macs}
+            if new:
+                now = round(time.time(), 3)
+                self.append([{"op": "set", "interface": interface, "mac": mac, "time": now}
+                             for interface, mac in new.items()])
+            return new
+
+    def record(self, interface, mac):
+        """Journal one interface's original MAC unless it is already tracked"""
+        return bool(self.record_many({interface: mac}))
+
+    def forget_many(self, interfaces):
+        """Stop tracking interfaces (after they were restored)"""
+        with self.lock:
+            self.replay()
+            gone = [interface for interface in interfaces if interface in self.macs]
+            if gone:
+                self.append([{"op": "del", "interface": interface} for interface in gone])
+
+    def forget(self, interface):
+        self.forget_many([interface])
+
+    def items(self):
+        with self.lock:
+            self.replay()
+            return list(self.macs.items())
+
+    def get(self, interface, default=None):
+        with self.lock:
+            self.replay()
+            return self.macs.get(interface, default)
+
+    def __getitem__(self, interface):
+        mac = self.get(interface)
+        if mac is None:
+            raise KeyError(interface)
+        return mac
+
+    def __contains__(self, interface):
+        return self.get(interface) is not None
+
+    def __len__(self):
+        return len(self.items())
+
+
+def restore_all(store, restore, deadline=10.0, jobs=16, interfaces=None):
+    """Put every tracked interface back in parallel, within `deadline` seconds
+
+    `restore(interface, mac)` makes one change and raises on failure.
+    With `interfaces`, only tracked interfaces in that set are restored.
+    Restored interfaces are dropped from the store; failed and unfinished
+    ones stay tracked for the next attempt. Returns a summary dict with
+    restored, failed ({interface: error}), timed_out and elapsed.
+
+    Workers are plain daemon threads rather than an executor, so this also
+    works from atexit handlers and a stuck driver can't hold up exit.
+    """
+    originals = [(interface, mac) for interface, mac in store.items()
+                 if interfaces is None or interface in interfaces]
+    start = time.perf_counter()
+    work = iter(originals)
+    lock = threading.Lock()
+    results = {}
+
+    def worker():
+        while True:
+            with lock:
+                item = next(work, None)
+            if item is None:
+                return
+            interface, mac = item
+            try:
+                restore(interface, mac)
+                results[interface] = None
+            except Exception as e:
+                results[interface] = str(e)
+
+    threads = [threading.Thread(target=worker, name="restore", daemon=True)
+               for _ in range(max(1, min(jobs, len(originals))))]
+    for thread in threads:
+        thread.start()
+    end = time.monotonic() + deadline
+    for thread in threads:
+        thread.join(max(0.0, end - time.monotonic()))
+
+    finished = dict(results)
+    restored = sorted(interface for interface, error in finished.items() if error is None)
+    failed = {interface: error for interface, error in finished.items() if error is not None}
+    timed_out = sorted(interface for interface, _ in originals if interface not in finished)
+    store.forget_many(restored)
+    return {"restored": restored, "failed": failed, "timed_out": timed_out,
+            "elapsed": time.perf_counter() - start}
+
+
+def restore_on_exit(callback):
+    """Run callback once when the process exits, including on SIGTERM"""
+    ran = threading.Event()
+
+    def run_once():
+        if not ran.is_set():
+            ran.set()
+            callback()
+
+    def on_sigterm(signum, frame):
+        sys.exit(128 + signum)  # Unwinds normally, so atexit handlers run
+
+    atexit.register(run_once)
+    try:
+        signal.signal(signal.SIGTERM, on_sigterm)
+    except ValueError:
+        pass  # Not the main thread - atexit still covers a normal exit
+    return run_once
@@ -0,0 +1,588 @@
+#!/usr/bin/env python3
+"""
+MAC Address Spoofer - IEEE OUI registry index
+Compiles the IEEE MA-L/MA-M/MA-S registry (oui.csv / oui.txt, mam.csv,
+oui36.csv ...) once into a sorted, array-backed binary file that is
+memory-mapped at startup. Lookups are binary searches over the mapped
+arrays, so load time and memory don't grow with the registry size.
+Also attributes whole MAC populations (lists, ARP/neighbor tables, pcap
+captures) to vendors in one batched pass.
+"""
+
+import os
+import re
+import csv
+import sys
+import mmap
+import array
+import struct
+import bisect
+import random
+from operator import rshift
+from itertools import repeat
+from collections import Counter
+
+# Small built-in sample of vendor prefixes, used for the GUI presets
+# when no registry has been compiled (from the IEEE OUI database)
+VENDOR_PRESETS = {
+    "Apple (USA)": ["00:03:93", "00:05:02", "00:0A:27", "00:0A:95", "00:0D:93", "00:10:FA", "00:11:24", "00:14:51", "00:16:CB", "00:17:F2"],
+    "Samsung (Korea)": ["00:00:F0", "00:02:78", "00:07:AB", "00:09:18", "00:0D:AE", "00:12:47", "00:13:77", "00:15:B9", "00:16:32", "00:1A:8A"],
+    "Huawei (China)": ["00:18:82", "00:1E:10", "00:25:9E", "00:46:4B", "00:66:4B", "00:E0:FC", "04:C0:6F", "08:19:A6", "10:47:80", "20:08:ED"],
+    "Cisco (USA)": ["00:00:0C", "00:01:42", "00:01:43", "00:01:63", "00:01:64", "00:01:96", "00:02:3D", "00:02:FC", "00:03:6B", "00:03:FD"],
+    "Dell (USA)": ["00:06:5B", "00:08:74", "00:0B:DB", "00:0D:56", "00:11:43", "00:12:3F", "00:13:72", "00:14:22", "00:15:C5", "00:16:F0"],
+    "HP (USA)": ["00:01:E6", "00:01:E7", "00:04:EA", "00:08:83", "00:0E:7F", "00:10:E3", "00:11:0A", "00:12:79", "00:13:21", "00:14:38"],
+    "Intel (USA)": ["00:02:B3", "00:03:47", "00:04:23", "00:07:E9", "00:0E:0C", "00:13:02", "00:13:20", "00:15:00", "00:16:6F", "00:19:D1"],
+    "Microsoft (USA)": ["00:03:FF", "00:0D:3A", "00:12:5A", "00:15:5D", "00:17:FA", "00:50:F2", "28:18:78", "7C:1E:52", "DC:B4:C4"],
+    "Google (USA)": ["00:1A:11", "3C:5A:B4", "54:60:09", "6C:AD:F8", "94:EB:2C", "F4:F5:E8", "F8:8F:CA"],
+    "Amazon (USA)": ["0C:47:C9", "44:65:0D", "68:37:E9", "74:C2:46", "84:D6:D0", "AC:63:BE", "F0:D2:F1"],
+    "Lenovo (China)": ["00:21:86", "00:23:24", "00:26:6C", "54:42:49", "68:F7:28", "70:F3:95", "A4:4E:31", "BC:30:5B"],
+    "ASUS (Taiwan)": ["00:0C:6E", "00:0E:A6", "00:11:2F", "00:13:D4", "00:15:F2", "00:17:31", "00:1A:92", "00:1D:60", "08:60:6E", "30:85:A9"],
+    "TP-Link (Hong Kong)": ["00:0A:EB", "00:27:19", "14:CF:92", "50:C7:BF", "A0:F3:C1", "C4:6E:1F", "EC:08:6B"],
+    "D-Link (Taiwan)": ["00:05:5D", "00:0D:88", "00:11:95", "00:13:46", "00:15:E9", "00:17:9A", "00:19:5B", "00:1B:11", "1C:7E:E5", "34:08:04"],
+    "Netgear (USA)": ["00:09:5B", "00:0F:B5", "00:14:6C", "00:1B:2F", "00:1E:2A", "00:1F:33", "00:22:3F", "00:24:B2", "20:E5:2A", "74:44:01"],
+    "Nokia (Finland)": ["00:02:EE", "00:0B:E1", "00:0E:ED", "00:12:62", "00:15:A0", "00:18:13", "00:19:2D", "00:1A:16", "00:1B:AF"],
+    "Sony (Japan)": ["00:00:95", "00:04:1F", "00:0A:D9", "00:0E:07", "00:13:15", "00:16:20", "00:19:63", "00:1C:A4", "00:1E:45", "00:23:45"],
+    "LG (Korea)": ["00:1C:62", "00:1E:75", "00:22:A9", "10:68:3F", "20:21:A5", "58:A2:B5", "70:05:14", "98:D6:F7", "A8:16:B2"],
+    "Motorola (USA)": ["00:0A:28", "00:0E:C7", "00:23:68", "00:24:37", "40:83:DE", "5C:0E:8B", "60:BE:B5", "C4:7D:CC", "E0:75:7D"],
+    "HTC (Taiwan)": ["00:23:76", "38:E7:D8", "50:2E:5C", "7C:61:93", "84:7A:88", "A0:F4:50", "BC:CF:CC", "E8:99:C4"],
+    "Xiaomi (China)": ["00:9E:C8", "0C:1D:AF", "34:CE:00", "64:09:80", "64:B4:73", "78:11:DC", "8C:BE:BE", "98:FA:E3", "9C:99:A0"],
+    "OPPO (China)": ["1C:77:F6", "38:29:5A", "88:D5:0C", "A0:93:47", "B8:37:65", "C0:9F:05", "D4:50:3F", "E4:47:90"],
+    "Vivo (China)": ["2C:AB:A4", "3C:F5:91", "50:76:AF", "7C:1D:D9", "A4:50:46", "BC:76:5E", "D8:55:A3", "EC:1D:8B"],
+    "ZTE (China)": ["00:19:C6", "00:25:12", "34:4B:50", "48:28:2F", "B0:75:D5", "E0:C3:F3", "F8:DF:A8"],
+    "Toshiba (Japan)": ["00:00:39", "00:08:0D", "00:15:B7", "24:2F:FA", "98:6D:C8", "E8:9D:87", "FC:00:12"],
+    "Nintendo (Japan)": ["00:09:BF", "00:16:56", "00:17:AB", "00:19:1D", "00:1A:E9", "00:1B:7A", "00:1C:BE", "00:1E:35", "18:2A:7B", "34:AF:2C"],
+    "Broadcom (USA)": ["00:05:B5", "00:0A:F7", "00:10:18", "18:C0:86", "D4:01:29"],
+    "Qualcomm (USA)": ["00:A0:C6", "64:9C:81", "88:12:4E", "8C:FD:F0"],
+    "Nvidia (USA)": ["00:04:4B"],
+    "Espressif (China)": ["18:FE:34", "24:0A:C4", "30:AE:A4", "60:01:94", "A0:20:A6", "AC:D0:74"],
+    "Texas Instruments (USA)": ["00:17:E9", "00:17:EB", "00:18:31", "00:1A:B6", "00:22:A5", "08:00:28", "10:2E:AF"],
+    "Roku (USA)": ["00:0D:4B", "08:05:81", "AC:3A:7A", "B0:A7:37", "B8:3E:59", "CC:6D:A0", "D0:4D:2C", "DC:3A:5E"],
+    "Ubiquiti (USA)": ["00:15:6D", "00:27:22", "24:A4:3C", "68:72:51", "80:2A:A8", "DC:9F:DB", "F0:9F:C2"],
+    "Aruba Networks (USA)": ["00:0B:86", "00:1A:1E", "00:24:6C", "20:4C:03", "24:DE:C6", "6C:F3:7F", "94:B4:0F", "D8:C7:C8"],
+    "Juniper Networks (USA)": ["00:05:85", "00:12:1E", "00:17:CB", "00:19:E2", "00:1F:12", "00:21:59", "00:23:9C", "00:26:88", "28:8A:1C", "54:E0:32"],
+    "Ruckus Wireless (USA)": ["00:13:92", "00:24:82", "24:C9:A1", "50:A7:33", "54:3D:37", "84:D4:7E", "C4:10:8A", "E4:5D:51"],
+    "IBM (USA)": ["00:00:81", "00:04:AC", "00:06:29", "6C:AE:8B", "74:99:75"],
+    "3Com (USA)": ["00:01:02", "00:01:03", "00:05:1A", "00:0A:04", "00:10:4B", "00:20:AF", "00:50:04", "00:60:08"],
+    "Linksys (USA)": ["00:04:5A", "00:06:25", "00:0C:41", "00:0F:66", "00:12:17", "00:13:10", "00:14:BF", "00:16:B6", "48:F8:B3", "98:FC:11"],
+    "Belkin (USA)": ["00:11:50", "00:17:3F", "00:1C:DF", "00:30:BD", "08:86:3B", "94:10:3E", "EC:1A:59"],
+    "Panasonic (Japan)": ["00:0F:12", "00:1B:D3", "04:20:9A", "30:4C:7E", "8C:C1:21", "D8:AF:F1", "E0:EE:1B"],
+    "Fujitsu (Japan)": ["00:00:0E", "00:0B:5D", "00:10:55", "00:17:42", "08:E5:DA", "50:26:90", "90:1B:0E", "B0:AC:FA"],
+    "Realme (China)": ["7E:3E:3A", "A0:15:65", "C4:06:83", "D4:6E:5C", "E8:9F:80", "F0:E3:11"],
+    "Honor (China)": ["10:2A:B3", "20:76:00", "28:D1:27", "70:66:1B", "9C:28:EF", "C0:84:7D", "E4:A7:C5"],
+}
+
+# Presets whose organisations are registered under other names ("Apple (USA)" -> "Apple" otherwise)
+PRESET_ORGANIZATIONS = {
+    "HP (USA)": ("HP", "Hewlett Packard"),
+    "OPPO (China)": ("OPPO", "Guangdong Oppo"),
+    "Xiaomi (China)": ("Xiaomi", "Beijing Xiaomi"),
+    "Aruba Networks (USA)": ("Aruba",),
+}
+
+# Registry source files looked for next to the scripts / in the working directory
+SOURCE_NAMES = ("oui.csv", "mam.csv", "oui36.csv", "oui.txt", "mam.txt", "oui36.txt")
+
+# Block sizes, longest first so lookups return the most specific owner
+PREFIX_BITS = (36, 28, 24)
+MAC_BITS = 48
+LOCAL_BIT = 0x02 << 40  # Locally administered bit of the first octet
+
+# MACs in text input: aa:bb:cc:dd:ee:ff, aa-bb-..., or Cisco aabb.ccdd.eeff
+MAC_PATTERN = re.compile(
+    rb"(?<![0-9A-Fa-f:.-])([0-9A-Fa-f]{2}(?:[:-][0-9A-Fa-f]{2}){5}|[0-9A-Fa-f]{4}\.[0-9A-Fa-f]{4}\.[0-9A-Fa-f]{4})(?![0-9A-Fa-f:.-])")
+
+# Capture file magics (first 4 bytes as stored on disk)
+PCAP_MAGICS = {
+    b"\xd4\xc3\xb2\xa1": "<", b"\x4d\x3c\xb2\xa1": "<",  # little-endian (us / ns)
+    b"\xa1\xb2\xc3\xd4": ">", b"\xa1\xb2\x3c\x4d": ">",  # big-endian
+}
+PCAPNG_MAGIC = b"\x0a\x0d\x0d\x0a"
+LINKTYPE_ETHERNET = 1
+
+# File layout: header, then 8-byte aligned sections
+#   keys      entry_count  x uint64  (bits << 48 | block start), sorted
+#   vendors   entry_count  x uint32  vendor id of each key
+#   by_vendor entry_count  x uint32  key positions grouped by vendor id
+#   first     vendor_count+1 x uint32  start of each vendor in by_vendor
+#   names     vendor_count+1 x uint32  offsets into the string blob
+#   strings   UTF-8 vendor names, sorted case-insensitively
+MAGIC = b"OUIIDX1" + (b"L" if sys.byteorder == "little" else b"B")
+HEADER = struct.Struct("=8sIII4x")  # magic, entry_count, vendor_count, strings_size
+
+TXT_HEX_LINE = re.compile(r"^\s*([0-9A-Fa-f]{2})-([0-9A-Fa-f]{2})-([0-9A-Fa-f]{2})\s+\(hex\)\s*(.*)$")
+TXT_BASE16_LINE = re.compile(r"^\s*([0-9A-Fa-f]{6})(?:-([0-9A-Fa-f]{6}))?\s+\(base 16\)\s*(.*)$")
+
+
+class OUIIndexError(Exception):
+    """The index file is missing, corrupt or from another platform"""
+
+
+def mac_to_int(mac):
+    """Convert a MAC string in ':', '-', '.' or bare hex notation to an int"""
+    digits = mac.replace(':', '').replace('-', '').replace('.', '')
+    if len(digits) != 12:
+        raise ValueError(f"Invalid MAC address: {mac}")
+    return int(digits, 16)
+
+
+def format_prefix(start, bits):
+    """Render a block start as 'AA:BB:CC' (24), 'AA:BB:CC:D' (28) or 'AA:BB:CC:DD:E' (36)"""
+    digits = f"{start >> (MAC_BITS - bits):0{bits // 4}X}"
+    return ':'.join(digits[i:i + 2] for i in range(0, len(digits), 2))
+
+
+def _block_key(start, bits):
+    return (bits << MAC_BITS) | start
+
+
+def parse_csv(path):
+    """Yield (start, bits, vendor) from an IEEE registry CSV (oui/mam/oui36.csv)"""
+    with open(path, newline='', encoding='utf-8', errors='replace') as f:
+        for row in csv.reader(f):
+            if len(row) < 3 or row[0] == "Registry":
+                continue
+            registry, assignment, vendor = row[0].strip(), row[1].strip(), row[2].strip()
+            if registry == "CID" or not re.fullmatch(r"[0-9A-Fa-f]{6,9}", assignment):
+                continue  # Company IDs are not MAC address blocks
+            bits = len(assignment) * 4
+            yield int(assignment, 16) << (MAC_BITS - bits), bits, vendor
+
+
+def parse_txt(path):
+    """Yield (start, bits, vendor) from an IEEE registry text file (oui/mam/oui36.txt)"""
+    oui = hex_vendor = None
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            match = TXT_HEX_LINE.match(line)
+            if match:
+                oui = int(''.join(match.group(1, 2, 3)), 16)
+                hex_vendor = match.group(4).strip()
+                continue
+            match = TXT_BASE16_LINE.match(line)
+            if not match:
+                continue
+            vendor = match.group(3).strip() or hex_vendor or "Private"
+            low = int(match.group(1), 16)
+            if match.group(2) is None:
+                # MA-L: the base-16 column is the OUI itself
+                yield low << 24, 24, vendor
+            elif oui is not None:
+                # MA-M/MA-S: a range of the low 24 bits under the last OUI seen
+                size = int(match.group(2), 16) - low + 1
+                bits = MAC_BITS - (size.bit_length() - 1)
+                yield (oui << 24) | low, bits, vendor
+
+
+def parse_source(path):
+    """Pick the parser from the file extension"""
+    if path.lower().endswith(".csv"):
+        return parse_csv(path)
+    return parse_txt(path)
+
+
+def _align8(data):
+    data += b"\0" * (-len(data) % 8)
+    return data
+
+
+def compile_index(sources, index_path):
+    """Compile registry source files into a memory-mappable index
+
+    Returns the number of assignments written. Duplicate blocks keep
+    the first vendor seen. The file is replaced atomically.
+    """
+    blocks = {}
+    for path in sources:
+        for start, bits, vendor in parse_source(path):
+            if bits in PREFIX_BITS:
+                blocks.setdefault(_block_key(start, bits), vendor)
+
+    names = sorted(set(blocks.values()), key=lambda name: (name.casefold(), name))
+    vendor_ids = {name: i for i, name in enumerate(names)}
+
+    keys = array.array('Q', sorted(blocks))
+    vendors = array.array('I', (vendor_ids[blocks[key]] for key in keys))
+
+    # Reverse lookup: key positions grouped by vendor
+    by_vendor = array.array('I', sorted(range(len(keys)), key=lambda i: vendors[i]))
+    first = array.array('I', [0] * (len(names) + 1))
+    for i in by_vendor:
+        first[vendors[i] + 1] += 1
+    for i in range(len(names)):
+        first[i + 1] += first[i]
+
+    strings = bytearray()
+    name_offsets = array.array('I')
+    for name in names:
+        name_offsets.append(len(strings))
+        strings += name.encode('utf-8')
+    name_offsets.append(len(strings))
+
+    body = bytearray(HEADER.pack(MAGIC, len(keys), len(names), len(strings)))
+    for section in (keys, vendors, by_vendor, first, name_offsets):
+        _align8(body)
+        body += section.tobytes()
+    _align8(body)
+    body += strings
+
+    os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+    tmp_path = f"{index_path}.tmp{os.getpid()}"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(body)
+            f.flush()
+            os.fsync(f.fileno())  # Never a renamed-but-empty index after a crash
+        os.replace(tmp_path, index_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return len(keys)
+
+
+class _NameView:
+    """Sequence of casefolded vendor names, decoded on demand for bisect"""
+
+    def __init__(self, index):
+        self.index = index
+
+    def __len__(self):
+        return self.index.vendor_count
+
+    def __getitem__(self, i):
+        return self.index.vendor_name(i).casefold()
+
+
+class OUIIndex:
+    """Memory-mapped OUI index - nothing is read until a lookup touches it"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            try:
+                self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise OUIIndexError(f"Empty OUI index: {path}")
+        if len(self.map) < HEADER.size:
+            raise OUIIndexError(f"Truncated OUI index: {path}")
+        magic, self.count, self.vendor_count, strings_size = HEADER.unpack_from(self.map)
+        if magic != MAGIC:
+            raise OUIIndexError(f"Not an OUI index for this platform: {path}")
+
+        view = memoryview(self.map)
+        offset = HEADER.size
+
+        def section(fmt, length, itemsize):
+            nonlocal offset
+            offset += -offset % 8
+            data = view[offset:offset + length * itemsize]
+            if len(data) != length * itemsize:
+                raise OUIIndexError(f"Truncated OUI index: {path}")
+            offset += length * itemsize
+            return data.cast(fmt)
+
+        self.keys = section('Q', self.count, 8)
+        self.vendors = section('I', self.count, 4)
+        self.by_vendor = section('I', self.count, 4)
+        self.first = section('I', self.vendor_count + 1, 4)
+        self.name_offsets = section('I', self.vendor_count + 1, 4)
+        offset += -offset % 8
+        self.strings = view[offset:offset + strings_size]
+        if len(self.strings) != strings_size:
+            raise OUIIndexError(f"Truncated OUI index: {path}")
+        # Cheap cross-checks so a corrupt header fails here, not in the first lookup
+        if self.first[self.vendor_count] != self.count or self.name_offsets[self.vendor_count] != strings_size:
+            raise OUIIndexError(f"Corrupt OUI index: {path}")
+
+    def __len__(self):
+        return self.count
+
+    def vendor_name(self, vendor_id):
+        """Name of a vendor id"""
+        start, end = self.name_offsets[vendor_id], self.name_offsets[vendor_id + 1]
+        return bytes(self.strings[start:end]).decode('utf-8')
+
+    def lookup_int(self, value):
+        """Vendor id owning a 48-bit MAC value (longest block wins), or None"""
+        for bits in PREFIX_BITS:
+            key = _block_key(value >> (MAC_BITS - bits) << (MAC_BITS - bits), bits)
+            i = bisect.bisect_left(self.keys, key)
+            if i < self.count and self.keys[i] == key:
+                return self.vendors[i]
+        return None
+
+    def lookup(self, mac):
+        """Vendor name owning a MAC address, or None"""
+        vendor_id = self.lookup_int(mac_to_int(mac))
+        return None if vendor_id is None else self.vendor_name(vendor_id)
+
+    def find_vendors(self, name_prefix, whole_word=False):
+        """Vendor ids whose name starts with name_prefix (case-insensitive)
+
+        With whole_word, the prefix must end at a word boundary, so
+        "Intel" finds "Intel Corporate" but not "Intelligent ...".
+        """
+        names = _NameView(self)
+        needle = name_prefix.casefold()
+        i = bisect.bisect_left(names, needle)
+        while i < self.vendor_count and names[i].startswith(needle):
+            rest = names[i][len(needle):]
+            if not (whole_word and rest[:1].isalnum()):
+                yield i
+            i += 1
+
+    def vendor_blocks(self, vendor_id):
+        """(start, bits) of every block assigned to a vendor id"""
+        for position in self.by_vendor[self.first[vendor_id]:self.first[vendor_id + 1]]:
+            key = self.keys[position]
+            yield key & ((1 << MAC_BITS) - 1), key >> MAC_BITS
+
+    def split_ouis(self):
+        """24-bit OUIs that are carved into MA-M/MA-S blocks (computed once)"""
+        if getattr(self, "_split_ouis", None) is None:
+            start = bisect.bisect_left(self.keys, _block_key(0, 28))
+            self._split_ouis = {(self.keys[i] & ((1 << MAC_BITS) - 1)) >> 24
+                                for i in range(start, self.count)}
+        return self._split_ouis
+
+    def attribute(self, counts, local_as_vendor=False):
+        """Attribute a {mac_value: count} population to vendors in one batched pass
+
+        MACs are grouped by their 24-bit OUI first, so the registry is
+        searched once per distinct OUI instead of once per MAC; only
+        MACs under OUIs split into MA-M/MA-S blocks are resolved one by
+        one.
+        Locally administered MACs are counted separately, or attributed
+        with the local bit cleared when local_as_vendor is set (that's
+        how this tool builds vendor-looking MACs).
+        Returns {"vendors": Counter(name -> count), "total", "unique",
+        "unassigned", "local"}.
+        """
+        split = self.split_ouis()
+        local_oui_bit = LOCAL_BIT >> 24
+        # Per-OUI totals: count distinct MACs in C, then add the repeats
+        oui_counts = Counter(map(rshift, counts, repeat(24)))
+        for value, count in {v: c for v, c in counts.items() if c > 1}.items():
+            oui_counts[value >> 24] += count - 1
+
+        vendor_counts = Counter()
+        unassigned = local = 0
+        split_hits = set()
+        for oui, count in oui_counts.items():
+            if oui & local_oui_bit:
+                local += count
+                if not local_as_vendor:
+                    continue
+                oui &= ~local_oui_bit
+            if oui in split:
+                split_hits.add(oui)  # Resolved MAC by MAC below
+                continue
+            vendor_id = self.lookup_int(oui << 24)
+            if vendor_id is None:
+                unassigned += count
+            else:
+                vendor_counts[self.vendor_name(vendor_id)] += count
+
+        if split_hits:
+            mask = ~LOCAL_BIT if local_as_vendor else -1
+            for value in [v for v in counts if (v & mask) >> 24 in split_hits]:
+                vendor_id = self.lookup_int(value & mask)
+                if vendor_id is None:
+                    unassigned += counts[value]
+                else:
+                    vendor_counts[self.vendor_name(vendor_id)] += counts[value]
+
+        return {
+            "vendors": vendor_counts,
+            "total": sum(counts.values()),
+            "unique": len(counts),
+            "unassigned": unassigned,
+            "local": local,
+        }
+
+    def describe(self, mac):
+        """Short owner description of one MAC for display"""
+        value = mac_to_int(mac)
+        if value & LOCAL_BIT:
+            vendor_id = self.lookup_int(value & ~LOCAL_BIT)
+            if vendor_id is None:
+                return "locally administered"
+            return f"locally administered, {self.vendor_name(vendor_id)} prefix"
+        vendor_id = self.lookup_int(value)
+        return "unassigned" if vendor_id is None else self.vendor_name(vendor_id)
+
+    def close(self):
+        """Release the mapping"""
+        for name in ("keys", "vendors", "by_vendor", "first", "name_offsets", "strings"):
+            getattr(self, name).release()
+        self.map.close()
+
+
+def _count_text_macs(data, counts):
+    """Count every MAC in text (MAC lists, /proc/net/arp, `ip neigh` dumps)"""
+    # Strip separators from all tokens at once, then let Counter count in C
+    digits = b" ".join(MAC_PATTERN.findall(data)).translate(None, b":-.").split()
+    counts.update(map(int, digits, repeat(16)))
+
+
+def _count_pcap_macs(data, counts):
+    """Count source MACs of every Ethernet frame in a classic pcap capture
+
+    A capture cut short (tcpdump killed mid-write) is read up to its last
+    complete record.
+    """
+    if len(data) < 24:
+        raise ValueError("Truncated capture (incomplete pcap header)")
+    endian = PCAP_MAGICS[bytes(data[:4])]
+    linktype, = struct.unpack_from(endian + "I", data, 20)
+    if linktype & 0xFFFF != LINKTYPE_ETHERNET:
+        raise ValueError(f"Unsupported pcap link type {linktype} (Ethernet only)")
+    record = struct.Struct(endian + "8xII")  # ts, incl_len, orig_len
+    sources = []
+    offset = 24
+    while offset + record.size <= len(data):
+        incl_len, _ = record.unpack_from(data, offset)
+        offset += record.size
+        if offset + incl_len > len(data):
+            break  # Last record is incomplete
+        if incl_len >= 12:
+            sources.append(data[offset + 6:offset + 12])
+        offset += incl_len
+    counts.update(int.from_bytes(raw, "big") for raw in sources)
+
+
+def _count_pcapng_macs(data, counts):
+    """Count source MACs of Ethernet frames in a pcapng capture
+
+    Like pcap, a capture cut short is read up to its last complete block.
+    """
+    sources = []
+    linktypes = []
+    endian = "<"
+    offset = 0
+    while offset + 12 <= len(data):
+        if bytes(data[offset:offset + 4]) == PCAPNG_MAGIC:
+            # Section header: byte-order magic decides the endianness of the section
+            endian = "<" if bytes(data[offset + 8:offset + 12]) == b"\x4d\x3c\x2b\x1a" else ">"
+            linktypes = []
+        block_type, block_len = struct.unpack_from(endian + "II", data, offset)
+        if block_len < 12:
+            raise ValueError("Corrupt pcapng block")
+        if offset + block_len > len(data):
+            break  # Last block is incomplete
+        body = offset + 8
+        # Header and trailer take 12 bytes; the fixed fields read below must fit in the rest
+        if (block_type == 1 and block_len < 12 + 8) or (block_type == 6 and block_len < 12 + 20):
+            raise ValueError("Corrupt pcapng block")
+        if block_type == 1:  # Interface description
+            linktypes.append(struct.unpack_from(endian + "H", data, body)[0])
+        elif block_type == 6:  # Enhanced packet
+            interface, _, _, cap_len = struct.unpack_from(endian + "IIII", data, body)
+            if cap_len > block_len - 12 - 20:
+                raise ValueError("Corrupt pcapng block")
+            if interface < len(linktypes) and linktypes[interface] == LINKTYPE_ETHERNET and cap_len >= 12:
+                sources.append(data[body + 20 + 6:body + 20 + 12])
+        elif block_type == 3:  # Simple packet (always interface 0)
+            if linktypes and linktypes[0] == LINKTYPE_ETHERNET and block_len >= 16 + 12:
+                sources.append(data[body + 4 + 6:body + 4 + 12])
+        offset += block_len
+    counts.update(int.from_bytes(raw, "big") for raw in sources)
+
+
+def read_mac_counts(paths):
+    """Collect {mac_value: count} from MAC lists, ARP/neighbor dumps and captures
+
+    Each path may be a text file (one MAC per line, /proc/net/arp,
+    `ip neigh` output...), a pcap/pcapng capture, or '-' for stdin.
+    """
+    counts = Counter()
+    for path in paths:
+        if path == "-":
+            _count_text_macs(sys.stdin.buffer.read(), counts)
+            continue
+        with open(path, 'rb') as f:
+            head = f.read(4)
+            if head in PCAP_MAGICS or head == PCAPNG_MAGIC:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    if head == PCAPNG_MAGIC:
+                        _count_pcapng_macs(data, counts)
+                    else:
+                        _count_pcap_macs(data, counts)
+            else:
+                # /proc files report a size of 0, so read instead of mapping
+                f.seek(0)
+                _count_text_macs(f.read(), counts)
+    counts.pop(0, None)  # 00:00:00:00:00:00 = incomplete ARP entry
+    return counts
+
+
+def default_index_path():
+    """Per-user cache location of the compiled index"""
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA", os.path.expanduser("~"))
+    else:
+        base = os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+    return os.path.join(base, "mac-spoofer", "oui.idx")
+
+
+def find_sources():
+    """Registry files the user dropped next to the scripts or in the working directory"""
+    found = []
+    for folder in dict.fromkeys((os.path.dirname(os.path.abspath(__file__)), os.getcwd())):
+        for name in SOURCE_NAMES:
+            path = os.path.join(folder, name)
+            if os.path.isfile(path):
+                found.append(path)
+    return found
+
+
+def load_default(index_path=None):
+    """Open the compiled index, (re)compiling it if a newer source file exists
+
+    Returns None when there is no usable registry - callers fall back to
+    VENDOR_PRESETS. If recompiling fails (unreadable or malformed source,
+    cache folder not writable) the existing index is used, if any.
+    """
+    index_path = index_path or default_index_path()
+    sources = find_sources()
+    try:
+        index_mtime = os.path.getmtime(index_path)
+    except OSError:
+        index_mtime = None
+    try:
+        if sources and (index_mtime is None or any(os.path.getmtime(p) > index_mtime for p in sources)):
+            compile_index(sources, index_path)
+        elif index_mtime is None:
+            return None
+    except (OSError, csv.Error, ValueError):
+        if index_mtime is None:
+            return None
+    try:
+        return OUIIndex(index_path)
+    except (OSError, OUIIndexError, TypeError, ValueError, IndexError, struct.error):
+        return None  # Unreadable or corrupt - the built-in presets still work
+
+
+def vendor_prefixes(preset, index=None):
+    """Prefixes for a GUI vendor preset like "Apple (USA)"
+
+    With a compiled registry every MA-L block of every matching
+    organisation is used; otherwise the built-in sample.
+    """
+    if index is not None:
+        # "Apple (USA)" -> every registry name that is "Apple" followed by a word boundary
+        names = PRESET_ORGANIZATIONS.get(preset) or (preset.split(" (")[0],)
+        prefixes = list(dict.fromkeys(format_prefix(start, bits)
+                                      for name in names
+                                      for vendor_id in index.find_vendors(name, whole_word=True)
+                                      for start, bits in index.vendor_blocks(vendor_id) if bits == 24))
+        if prefixes:
+            return prefixes
+    return VENDOR_PRESETS.get(preset, [])
+
+
+def random_vendor_prefix(preset, index=None):
+    """Pick one prefix of a vendor preset at random"""
+    return random.choice(vendor_prefixes(preset, index))
@@ -0,0 +1,9 @@
+"""
+Shared setup for the unit tests: the modules live flat in the repository
+root, next to this folder
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
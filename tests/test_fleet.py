@@ -0,0 +1,34 @@
+"""Fleet mode: per-interface errors and MAC claims"""
+
+import mac_netlink
+import mac_spoofer
+
+
+def test_fleet_reports_each_interface_and_releases_claims(tmp_path):
+    spoofer = mac_spoofer.MACSpoofer(str(tmp_path / "originals.jsonl"))
+    spoofer.used_macs = mac_netlink.UsedMACs()
+    spoofer.remember_originals = lambda interfaces: None
+    changed, picked = [], []
+
+    def set_mac_linux(interface, mac, quiet=False):
+        if interface == "eth1":
+            raise OSError("driver said no")
+        changed.append(interface)
+        return "live", None
+
+    def generate_random_mac(claim=False):
+        if len(picked) == 2:
+            raise ValueError("No unused MAC found in 32 attempts")
+        picked.append(f"02:00:00:00:00:{len(picked) + 1:02x}")
+        return mac_netlink.pick_unused_mac(lambda: picked[-1], spoofer.used_macs, claim)
+
+    spoofer.set_mac_linux = set_mac_linux
+    spoofer.generate_random_mac = generate_random_mac
+    results, _ = spoofer.spoof_fleet(["eth0", "eth1", "eth2"], jobs=1)
+
+    assert [r["interface"] for r in results] == ["eth0", "eth1", "eth2"]
+    assert results[0]["error"] is None and results[0]["mac"] == "02:00:00:00:00:01"
+    assert results[1]["error"] == "driver said no"
+    assert results[2]["mac"] is None and "No unused MAC" in results[2]["error"]
+    assert changed == ["eth0"]
+    assert len(spoofer.used_macs) == 0
@@ -0,0 +1,38 @@
+"""Bulk generation and single random MACs"""
+
+import pytest
+
+import mac_generator
+
+
+def is_local_unicast(mac):
+    first = int(mac[:2], 16)
+    return first & 0x02 and not first & 0x01
+
+
+def test_generated_macs_are_unique_local_unicast():
+    macs = mac_generator.format_macs(mac_generator.MACGenerator().generate(20000)).split("\n")
+    assert len(macs) == len(set(macs)) == 20000
+    assert all(is_local_unicast(mac) for mac in macs)
+
+
+def test_prefix_is_kept_and_made_local():
+    macs = mac_generator.format_macs(mac_generator.MACGenerator("00:1A:11").generate(100)).split("\n")
+    assert all(mac.startswith("02:1a:11:") for mac in macs)
+
+
+def test_prefix_space_runs_out():
+    generator = mac_generator.MACGenerator("00:1A:11:22:33")  # One free octet: 256 MACs
+    assert len(generator.generate(256)) == 256
+    with pytest.raises(ValueError):
+        generator.generate(1)
+
+
+def test_prefix_too_long():
+    with pytest.raises(ValueError):
+        mac_generator.MACGenerator("00:11:22:33:44:55")
+
+
+def test_random_mac():
+    mac = mac_generator.random_mac("00:1A:11")
+    assert mac.startswith("02:1a:11:") and len(mac) == 17
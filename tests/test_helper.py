@@ -0,0 +1,54 @@
+"""Privileged helper: interface names from clients"""
+
+import pytest
+
+import mac_helper
+import mac_netns
+
+
+@pytest.mark.parametrize("name", ["eth0", "wlp2s0", "veth-a.100", "br0:1", "tun@x", "pid:1/eth0"])
+def test_plain_names_pass(name):
+    mac_helper.check_interface(name)
+
+
+@pytest.mark.parametrize("name", [
+    "x;id>/tmp/p", "eth0 up", "$(id)", "..", ".", "../../etc", "", "a" * 16, None, 7,
+    "/etc/passwd/eth0", "../../tmp/ns/eth0",
+])
+def test_bad_names_are_refused(name):
+    with pytest.raises(ValueError):
+        mac_helper.check_interface(name)
+
+
+def test_only_known_namespaces(monkeypatch):
+    monkeypatch.setattr(mac_netns, "list_namespaces", lambda pids=False: ["ct-web"])
+    mac_helper.check_interface("ct-web/eth0")
+    with pytest.raises(ValueError):
+        mac_helper.check_interface("ct-db/eth0")
+
+
+@pytest.mark.parametrize("request_", [
+    {"op": "set", "interface": "eth0", "mac": "02:00:00:00:00:01"},
+    {"op": "set", "interface": "eth0", "mac": ""},
+    {"op": "set", "interface": "eth0"},
+    {"op": "restore", "deadline": 2.5, "jobs": 4},
+    {"op": "batch", "requests": [{"op": "get", "interface": "eth0"}]},
+])
+def test_well_formed_requests_pass(request_):
+    mac_helper.check_request(request_)
+
+
+@pytest.mark.parametrize("request_", [
+    {"op": "set", "interface": "eth0", "mac": 7},
+    {"op": "set", "interface": "eth0", "mac": "02 00 00 00 00 01"},
+    {"op": "set", "interface": "eth0", "mac": "02:00:00:00:00"},
+    {"op": "restore", "jobs": "4"},
+    {"op": "restore", "jobs": True},
+    {"op": "restore", "deadline": -1},
+    {"op": "batch", "requests": "get"},
+    {"op": "batch", "requests": [7]},
+    {"op": "batch"},
+])
+def test_malformed_requests_are_refused(request_):
+    with pytest.raises(ValueError):
+        mac_helper.check_request(request_)
@@ -0,0 +1,17 @@
+"""Step metrics: export file errors"""
+
+import pytest
+
+import mac_metrics
+
+
+@pytest.mark.parametrize("name", ["metrics.prom", "metrics.jsonl"])
+def test_unwritable_path_is_logged_once(tmp_path, name):
+    logged = []
+    metrics = mac_metrics.Metrics(str(tmp_path / "missing" / name), log=logged.append)
+    for _ in range(3):
+        metrics.observe("address_set", 0.01, "eth0")
+        metrics.flush(force=True)  # Must not raise
+    assert len(logged) == 1 and "missing" in logged[0]
+    assert metrics.histograms["address_set"].count == 3
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,48 @@
+"""Netlink helpers: readiness waits fed from notifications"""
+
+import contextlib
+import socket
+
+import mac_netlink
+
+INDEX = 4242
+
+
+class FakeNetlink:
+    """Usable link with no address yet; notifications bring the rest"""
+
+    def get_link(self, interface):
+        return {"index": INDEX, "up": True, "carrier": True, "operstate": "up"}
+
+    def dump_addresses(self, index=None):
+        return {}
+
+
+def new_addr(family, address):
+    raw = socket.inet_pton(family, address)
+    body = mac_netlink.IFADDRMSG.pack(family, 24, 0, 0, INDEX) + mac_netlink.pack_attr(mac_netlink.IFA_LOCAL, raw)
+    return mac_netlink.NLMSGHDR.pack(mac_netlink.NLMSGHDR.size + len(body), mac_netlink.RTM_NEWADDR, 0, 0, 0) + body
+
+
+@contextlib.contextmanager
+def waiter_fed(*messages):
+    # A datagram socketpair stands in for the netlink socket
+    ours, theirs = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+    for message in messages:
+        theirs.send(message)
+    waiter = mac_netlink.LinkWaiter.__new__(mac_netlink.LinkWaiter)
+    waiter.sock = ours
+    with theirs, waiter:
+        yield waiter
+
+
+def test_address_notification_ends_the_wait():
+    with waiter_fed(new_addr(socket.AF_INET, "192.0.2.7")) as waiter:
+        carrier, address = waiter.wait(FakeNetlink(), "eth0", "ipv4", timeout=2.0)
+    assert carrier is not None and address is not None
+
+
+def test_other_family_is_not_enough():
+    with waiter_fed(new_addr(socket.AF_INET6, "2001:db8::7")) as waiter:
+        carrier, address = waiter.wait(FakeNetlink(), "eth0", "ipv4", timeout=0.2)
+    assert carrier is not None and address is None
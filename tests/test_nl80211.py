@@ -0,0 +1,52 @@
+"""Wi-Fi randomizer: swaps queued from nl80211 events"""
+
+import mac_metrics
+import mac_nl80211
+
+
+class FakeNetlink:
+    def __init__(self):
+        self.addresses = []
+
+    def get_link(self, name):
+        return {"index": 3, "carrier": True}
+
+    def set_link(self, name, address=None):
+        self.addresses.append(address)
+
+
+class FakeCore:
+    def __init__(self):
+        self.netlink = FakeNetlink()
+        self.metrics = mac_metrics.Metrics()
+        self.logged = []
+
+    def remember_originals(self, interfaces):
+        pass
+
+    def load_used_macs(self):
+        return None
+
+    def log(self, message):
+        self.logged.append(message)
+
+
+def test_failed_pick_is_counted_and_the_worker_keeps_going():
+    core = FakeCore()
+    picks = iter([ValueError("No unused MAC found in 32 attempts"), "02:00:00:00:00:01"])
+
+    def pick(interface):
+        mac = next(picks)
+        if isinstance(mac, Exception):
+            raise mac
+        return mac
+
+    randomizer = mac_nl80211.WifiRandomizer(core, ["wlan0"], pick=pick)
+    for _ in range(2):
+        randomizer.on_event({"kind": "wifi", "action": "disconnect", "index": 3, "status": 0, "time": 0.0})
+    randomizer.queue.put(None)
+    randomizer.run_swaps()  # Returns at the None, on this thread
+
+    assert [swap["result"] for swap in randomizer.swaps] == ["No unused MAC found in 32 attempts", "ok"]
+    assert core.netlink.addresses == ["02:00:00:00:00:01"]
+    assert randomizer.summary()["failed"] == 1 and len(core.logged) == 1
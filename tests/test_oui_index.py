@@ -0,0 +1,125 @@
+"""OUI index: compile, lookups, vendor presets and damaged index files"""
+
+import struct
+
+import pytest
+
+import oui_index
+
+REGISTRY = """Registry,Assignment,Organization Name,Organization Address
+MA-L,0002B3,Intel Corporation,Santa Clara US
+MA-L,AABBCC,Intelligent Widgets Ltd,Nowhere
+MA-L,001122,HP Inc.,Palo Alto US
+MA-L,0C1D02,Hewlett Packard,Palo Alto US
+MA-L,334455,HPE Foo Systems,Nowhere
+MA-L,0C1D00,LG Electronics,Seoul KR
+MA-L,0C1D01,LGS Innovations,Nowhere
+MA-L,70B3D5,IEEE Registration Authority,Piscataway US
+"""
+MAM = """Registry,Assignment,Organization Name,Organization Address
+MA-M,70B3D51,Tiny Sensors Inc,Nowhere
+"""
+
+
+@pytest.fixture
+def index(tmp_path):
+    (tmp_path / "oui.csv").write_text(REGISTRY)
+    (tmp_path / "mam.csv").write_text(MAM)
+    path = str(tmp_path / "oui.idx")
+    assert oui_index.compile_index([str(tmp_path / "oui.csv"), str(tmp_path / "mam.csv")], path) == 9
+    return oui_index.OUIIndex(path)
+
+
+def test_lookup_longest_block_wins(index):
+    assert index.lookup("00:02:B3:12:34:56") == "Intel Corporation"
+    assert index.lookup("70:B3:D5:1F:00:00") == "Tiny Sensors Inc"
+    assert index.lookup("70:B3:D5:20:00:00") == "IEEE Registration Authority"
+    assert index.lookup("02:00:00:00:00:01") is None
+
+
+@pytest.mark.parametrize("preset, expected", [
+    ("Intel (USA)", ["00:02:B3"]),
+    ("HP (USA)", ["00:11:22", "0C:1D:02"]),
+    ("LG (Korea)", ["0C:1D:00"]),
+])
+def test_presets_match_whole_names(index, preset, expected):
+    # Used to pick up "Intelligent Widgets", "HPE Foo" and "LGS Innovations" too
+    assert sorted(oui_index.vendor_prefixes(preset, index)) == expected
+
+
+def test_preset_without_registry_match_uses_builtin(index):
+    assert oui_index.vendor_prefixes("Apple (USA)", index) == oui_index.VENDOR_PRESETS["Apple (USA)"]
+    assert oui_index.vendor_prefixes("Apple (USA)") == oui_index.VENDOR_PRESETS["Apple (USA)"]
+
+
+def test_damaged_index_is_rejected(index, tmp_path):
+    data = open(index.path, "rb").read()
+    damaged = tmp_path / "damaged.idx"
+    for size in range(len(data)):
+        damaged.write_bytes(data[:size])
+        with pytest.raises(oui_index.OUIIndexError):
+            oui_index.OUIIndex(str(damaged))
+
+
+def test_load_default_falls_back_on_corrupt_index(index, tmp_path, monkeypatch):
+    monkeypatch.setattr(oui_index, "find_sources", lambda: [])
+    magic, count, vendors, strings = oui_index.HEADER.unpack_from(open(index.path, "rb").read())
+    corrupt = tmp_path / "corrupt.idx"
+    corrupt.write_bytes(oui_index.HEADER.pack(magic, count * 1000, vendors, strings)
+                        + open(index.path, "rb").read()[oui_index.HEADER.size:])
+    assert oui_index.load_default(str(corrupt)) is None
+    assert oui_index.load_default(index.path) is not None
+
+
+def test_load_default_survives_a_failed_compile(index, tmp_path, monkeypatch):
+    bad = tmp_path / "broken.csv"
+    bad.write_text(REGISTRY + 'MA-L,"' + "x" * 200_000)  # Unterminated quote: csv.Error, field too large
+    monkeypatch.setattr(oui_index, "find_sources", lambda: [str(bad)])
+    assert oui_index.load_default(str(tmp_path / "none.idx")) is None
+    # A newer source that fails to compile leaves the existing index in use
+    assert oui_index.load_default(index.path).lookup("00:02:B3:12:34:56") == "Intel Corporation"
+
+
+def frame(source):
+    """Minimal Ethernet frame (ARP ethertype) from `source`"""
+    return bytes.fromhex("ffffffffffff" + source.replace(":", "") + "0806") + b"\0" * 28
+
+
+FRAMES = [frame("00:02:b3:00:00:01"), frame("00:02:b3:00:00:02")]
+
+
+def pcap():
+    """Capture of FRAMES and the offsets where each record ends"""
+    data = struct.pack("<IHHiIII", 0xA1B2C3D4, 2, 4, 0, 0, 65535, oui_index.LINKTYPE_ETHERNET)
+    ends = []
+    for f in FRAMES:
+        data += struct.pack("<IIII", 0, 0, len(f), len(f)) + f
+        ends.append(len(data))
+    return data, ends
+
+
+def pcapng():
+    data = struct.pack("<II4sHHqI", 0x0A0D0D0A, 28, b"\x4d\x3c\x2b\x1a", 1, 0, -1, 28)
+    data += struct.pack("<IIHHII", 1, 20, oui_index.LINKTYPE_ETHERNET, 0, 0, 20)
+    ends = []
+    for f in FRAMES:
+        length = 32 + len(f)
+        data += struct.pack("<IIIIIII", 6, length, 0, 0, 0, len(f), len(f)) + f + struct.pack("<I", length)
+        ends.append(len(data))
+    return data, ends
+
+
+@pytest.mark.parametrize("build", [pcap, pcapng])
+def test_truncated_capture_counts_complete_frames_only(tmp_path, build):
+    # Cut at every length - used to raise struct.error or count a partial MAC
+    data, ends = build()
+    path = tmp_path / "capture"
+    for size in range(4, len(data) + 1):
+        path.write_bytes(data[:size])
+        try:
+            counts = oui_index.read_mac_counts([str(path)])
+        except ValueError:
+            assert size < 24  # Only a file too short for its own header is refused
+            continue
+        assert set(counts) <= {0x0002B3000001, 0x0002B3000002}
+        assert sum(counts.values()) == sum(size >= end for end in ends)
@@ -0,0 +1,122 @@
+"""Plan files: parsing and validation of every format, apply and rollback"""
+
+import json
+import threading
+
+import pytest
+
+import mac_plan
+
+CURRENT = {"eth0": "aa:aa:aa:aa:aa:00", "eth1": "aa:aa:aa:aa:aa:01", "eth2": "aa:aa:aa:aa:aa:02"}
+
+
+def no_registry():
+    return None
+
+
+def parse(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return mac_plan.parse_plan(str(path), CURRENT.get, no_registry)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("02:00:00:00:AA:01", "02:00:00:00:aa:01"),
+    ("02-00-00-00-aa-01", "02:00:00:00:aa:01"),
+    ("0200.0000.aa01", "02:00:00:00:aa:01"),
+])
+def test_normalize_mac(text, expected):
+    assert mac_plan.normalize_mac(text) == expected
+
+
+@pytest.mark.parametrize("text", ["01:00:5e:00:00:01", "00:00:00:00:00:00", "02:00:00:00:aa", "zz:00:00:00:00:01"])
+def test_normalize_mac_rejects(text):
+    with pytest.raises(ValueError):
+        mac_plan.normalize_mac(text)
+
+
+def test_csv_with_and_without_header(tmp_path):
+    entries = parse(tmp_path, "p.csv", "interface,mac\n# comment\neth0,02-00-00-00-aa-01\neth1,random\n")
+    assert [(e["interface"], e["mac"]) for e in entries] == [("eth0", "02:00:00:00:aa:01"), ("eth1", None)]
+    assert entries[0]["previous"] == CURRENT["eth0"]
+    entries = parse(tmp_path, "q.csv", "eth2,02:00:00:00:aa:02\n")
+    assert entries[0]["mac"] == "02:00:00:00:aa:02"
+
+
+def test_json_mapping_and_list(tmp_path):
+    mapping = parse(tmp_path, "p.json", json.dumps({"interfaces": {"eth0": "02:00:00:00:aa:01"}}))
+    listed = parse(tmp_path, "q.json", json.dumps([{"interface": "eth0", "mac": "02:00:00:00:aa:01"}]))
+    assert mapping[0]["mac"] == listed[0]["mac"] == "02:00:00:00:aa:01"
+
+
+def test_yaml(tmp_path):
+    pytest.importorskip("yaml")
+    entries = parse(tmp_path, "p.yaml", 'eth0: "02:00:00:00:aa:01"\neth1: random\n')
+    assert [e["mac"] for e in entries] == ["02:00:00:00:aa:01", None]
+    with pytest.raises(mac_plan.PlanError) as error:
+        parse(tmp_path, "q.yaml", "eth0: 12:34:56:12:34:56\n")  # Unquoted: YAML reads a number
+    assert "quote the MAC" in error.value.problems[0]
+
+
+def test_every_problem_reported_at_once(tmp_path):
+    text = ("interface,mac\neth0,01:00:5e:00:00:01\neth1,02:00:00:00:aa:01\neth2,02:00:00:00:aa:01\n"
+            "eth0,random\nwlan9,random\n")
+    with pytest.raises(mac_plan.PlanError) as error:
+        parse(tmp_path, "p.csv", text)
+    problems = error.value.problems
+    assert len(problems) == 4
+    assert any("multicast" in p for p in problems)
+    assert any("also planned for eth1" in p for p in problems)
+    assert any("already planned" in p for p in problems)
+    assert any("no interface wlan9" in p for p in problems)
+
+
+def test_unknown_format(tmp_path):
+    with pytest.raises(mac_plan.PlanError):
+        parse(tmp_path, "p.txt", "eth0 random")
+
+
+class FakeMetrics:
+    def flush(self, force=False):
+        pass
+
+
+class FakeCore:
+    """Just enough of SpooferCore for apply_plan"""
+
+    def __init__(self, fail=()):
+        self.macs = dict(CURRENT)
+        self.fail = set(fail)
+        self.lock = threading.Lock()
+        self.metrics = FakeMetrics()
+
+    def remember_originals(self, interfaces):
+        pass
+
+    def set_mac_linux(self, interface, mac, quiet=False):
+        if interface in self.fail and mac != CURRENT[interface]:
+            raise OSError(f"{interface}: refused")
+        with self.lock:
+            self.macs[interface] = mac
+        return "live", None
+
+
+def planned(**targets):
+    return [{"interface": name, "previous": CURRENT[name], "target": mac, "where": name}
+            for name, mac in targets.items()]
+
+
+def test_apply_plan():
+    core = FakeCore()
+    summary = mac_plan.apply_plan(core, planned(eth0="02:00:00:00:aa:01", eth1="02:00:00:00:aa:02"), jobs=2)
+    assert all(r["error"] is None for r in summary["results"]) and not summary["rollback"]
+    assert core.macs["eth0"] == "02:00:00:00:aa:01" and core.macs["eth1"] == "02:00:00:00:aa:02"
+
+
+def test_failed_plan_rolls_back():
+    core = FakeCore(fail={"eth2"})
+    summary = mac_plan.apply_plan(core, planned(eth0="02:00:00:00:aa:01", eth1="02:00:00:00:aa:02",
+                                                eth2="02:00:00:00:aa:03"), jobs=1)
+    assert summary["results"][2]["error"]
+    assert summary["rollback"] and all(error is None for error in summary["rollback"].values())
+    assert core.macs == CURRENT
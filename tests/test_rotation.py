@@ -0,0 +1,77 @@
+"""Rotation specs, interval/jitter validation, wall-clock epochs and daemon error handling"""
+
+import argparse
+import asyncio
+
+import pytest
+
+import mac_generator
+import mac_netlink
+import mac_rotator
+import mac_spoofer
+
+
+def test_specs_use_default_interval_unless_given():
+    assert mac_spoofer.parse_rotation_specs(["wlan0=600", "veth*"], 300) == [("wlan0", 600.0), ("veth*", 300)]
+
+
+@pytest.mark.parametrize("spec", ["eth*=0", "eth*=-5", "eth*=abc", "eth*=nan", "eth*=inf", "=60"])
+def test_bad_specs_are_rejected(spec):
+    # An interval of 0 used to spin the scheduler forever
+    with pytest.raises(ValueError):
+        mac_spoofer.parse_rotation_specs([spec], 300)
+
+
+@pytest.mark.parametrize("text", ["0", "-1", "x"])
+def test_interval_must_be_positive(text):
+    with pytest.raises(argparse.ArgumentTypeError):
+        mac_spoofer.positive_seconds(text)
+
+
+@pytest.mark.parametrize("text, ok", [("0", True), ("0.5", True), ("1", False), ("-0.1", False)])
+def test_jitter_range(text, ok):
+    if ok:
+        assert mac_spoofer.jitter_fraction(text) == float(text)
+    else:
+        with pytest.raises(argparse.ArgumentTypeError):
+            mac_spoofer.jitter_fraction(text)
+
+
+def test_current_epoch():
+    assert mac_generator.current_epoch(3600, now=7200.0) == 2
+    assert mac_generator.current_epoch(3600, now=7199.9) == 1
+    with pytest.raises(ValueError):
+        mac_generator.current_epoch(0, now=1.0)
+
+
+class FakeSpoofer:
+    """spoof_one raises for "bad", claims and succeeds for anything else"""
+
+    deriver = None
+    netlink = None
+
+    def __init__(self):
+        self.used_macs = mac_netlink.UsedMACs()
+        self.count = 0
+
+    def load_used_macs(self):
+        return None  # No netlink monitor while rotating
+
+    def spoof_one(self, interface, epoch=None):
+        if interface == "bad":
+            raise ValueError("No unused MAC found in 32 attempts")
+        self.count += 1
+        mac = f"02:00:00:00:00:{self.count:02x}"
+        self.used_macs.claim(mac)
+        return {"interface": interface, "mac": mac, "mode": "live", "ready": None,
+                "latency": 0.0, "error": None, "claimed": True}
+
+
+def test_rotation_errors_are_counted_and_claims_released():
+    spoofer = FakeSpoofer()
+    daemon = mac_rotator.RotationDaemon(spoofer, {"good": 0.02, "bad": 0.02}, jitter=0)
+    stats = asyncio.run(daemon.run(duration=0.2))
+    assert stats["per_interface"]["good"]["rotations"] > 1
+    assert stats["per_interface"]["bad"]["failures"] > 1
+    assert "No unused MAC" in stats["per_interface"]["bad"]["last_error"]
+    assert len(spoofer.used_macs) == 0
@@ -0,0 +1,60 @@
+"""Original MAC journal: replay, torn lines, other writers, compaction, restore_all"""
+
+import mac_store
+
+
+def test_first_mac_wins_and_survives_reopen(tmp_path):
+    path = str(tmp_path / "originals.jsonl")
+    store = mac_store.OriginalMACStore(path)
+    assert store.record("eth0", "aa:aa:aa:aa:aa:01")
+    assert not store.record("eth0", "02:00:00:00:00:99")
+    store.record_many({"eth1": "aa:aa:aa:aa:aa:02", "eth2": "aa:aa:aa:aa:aa:03"})
+    store.forget("eth1")
+    assert dict(mac_store.OriginalMACStore(path).items()) == {"eth0": "aa:aa:aa:aa:aa:01",
+                                                              "eth2": "aa:aa:aa:aa:aa:03"}
+
+
+def test_torn_line_is_skipped(tmp_path):
+    path = tmp_path / "originals.jsonl"
+    path.write_bytes(b'{"op":"set","interface":"eth0","mac":"aa:aa:aa:aa:aa:01"}\n{"op":"set","interf')
+    store = mac_store.OriginalMACStore(str(path))
+    assert dict(store.items()) == {"eth0": "aa:aa:aa:aa:aa:01"}
+    store.record("eth1", "aa:aa:aa:aa:aa:02")  # Terminates the torn line first
+    assert dict(mac_store.OriginalMACStore(str(path)).items()) == {"eth0": "aa:aa:aa:aa:aa:01",
+                                                                   "eth1": "aa:aa:aa:aa:aa:02"}
+
+
+def test_sees_other_writers(tmp_path):
+    path = str(tmp_path / "originals.jsonl")
+    gui, cli = mac_store.OriginalMACStore(path), mac_store.OriginalMACStore(path)
+    cli.record("wlan0", "aa:aa:aa:aa:aa:01")
+    assert gui.get("wlan0") == "aa:aa:aa:aa:aa:01"
+
+
+def test_compaction_keeps_state(tmp_path, monkeypatch):
+    monkeypatch.setattr(mac_store, "COMPACT_AFTER", 4)
+    path = tmp_path / "originals.jsonl"
+    store = mac_store.OriginalMACStore(str(path))
+    for i in range(10):
+        store.record(f"veth{i}", f"aa:aa:aa:aa:aa:{i:02x}")
+        if i % 2:
+            store.forget(f"veth{i}")
+    expected = {f"veth{i}": f"aa:aa:aa:aa:aa:{i:02x}" for i in range(0, 10, 2)}
+    assert dict(mac_store.OriginalMACStore(str(path)).items()) == expected
+    assert len(path.read_bytes().splitlines()) < 20
+
+
+def test_restore_all_subset_and_failures(tmp_path):
+    store = mac_store.OriginalMACStore(str(tmp_path / "originals.jsonl"))
+    store.record_many({"a": "aa:aa:aa:aa:aa:01", "b": "aa:aa:aa:aa:aa:02", "c": "aa:aa:aa:aa:aa:03"})
+    done = {}
+
+    def restore(interface, mac):
+        if interface == "b":
+            raise OSError("driver said no")
+        done[interface] = mac
+
+    summary = mac_store.restore_all(store, restore, interfaces={"a", "b"})
+    assert summary["restored"] == ["a"] and list(summary["failed"]) == ["b"]
+    assert done == {"a": "aa:aa:aa:aa:aa:01"}
+    assert dict(store.items()) == {"b": "aa:aa:aa:aa:aa:02", "c": "aa:aa:aa:aa:aa:03"}